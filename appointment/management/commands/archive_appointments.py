@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from appointment.services.archive import (
+    ARCHIVE_BATCH_SIZE,
+    archive_finished_appointments,
+)
+
+
+class Command(BaseCommand):
+    """
+    Move finished appointments booked long ago, with their payments,
+    out of the live tables, the same job the nightly beat task runs.
+    Safe to rerun.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.APPOINTMENT_ARCHIVE_AFTER_DAYS,
+            help="Archive appointments booked more than this many days ago",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=ARCHIVE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_finished_appointments(
+            days=options["days"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} appointment(s) booked more than "
+            f"{options['days']} day(s) ago"
+        ))
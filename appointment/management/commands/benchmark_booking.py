@@ -0,0 +1,199 @@
+import statistics
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, connection, transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from appointment.models import Appointment
+from appointment.services.booking import (
+    book_slot,
+    BookingError,
+    PatientHasDebt,
+    SlotAlreadyBooked,
+    SlotInPast,
+)
+from appointment.signals import appointment_saved_signal_handler
+from doctor.models import Doctor, DoctorSlot
+
+User = get_user_model()
+
+
+def legacy_book(slot, patient):
+    """
+    The booking path used before the engine: locking EXISTS check,
+    two penalty aggregates and a separate INSERT transaction.
+    """
+    if slot.start < timezone.now():
+        raise SlotInPast()
+
+    with transaction.atomic():
+        is_taken = Appointment.objects.select_for_update().filter(
+            doctor_slot=slot
+        ).exclude(status="CANCELLED").exists()
+    if is_taken:
+        raise SlotAlreadyBooked()
+
+    if patient.has_penalty:
+        raise PatientHasDebt(patient.has_penalty)
+
+    try:
+        with transaction.atomic():
+            return Appointment.objects.create(doctor_slot=slot, patient=patient)
+    except IntegrityError:
+        raise SlotAlreadyBooked()
+
+
+def engine_book(slot, patient):
+    return book_slot(slot_id=slot.pk, patient=patient)
+
+
+@contextmanager
+def muted_appointment_signals():
+    """Benchmark the database work only, not the post_save side effects"""
+    post_save.disconnect(appointment_saved_signal_handler, sender=Appointment)
+    try:
+        yield
+    finally:
+        post_save.connect(appointment_saved_signal_handler, sender=Appointment)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100)[pct - 1]
+
+
+class Command(BaseCommand):
+    """
+    Races concurrent bookings on the same slots and compares
+    the legacy validate-then-save path with the booking engine
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--slots",
+            type=int,
+            default=50,
+            help="How many slots are raced for",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="How many patients try to book every slot at once",
+        )
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        doctor, slots, patients = self.prepare(options["slots"], threads)
+
+        try:
+            with muted_appointment_signals():
+                for name, book in (("legacy", legacy_book),
+                                   ("engine", engine_book)):
+                    Appointment.objects.filter(doctor_slot__in=slots).delete()
+                    stats = self.race(book, slots, patients)
+                    self.report(name, stats, len(slots))
+        finally:
+            doctor.delete()
+            User.objects.filter(pk__in=[p.pk for p in patients]).delete()
+
+    def prepare(self, total_slots, threads):
+        tag = uuid.uuid4().hex[:8]
+        doctor = Doctor.objects.create(
+            first_name="Benchmark",
+            last_name=f"Booking {tag}",
+            price_per_visit=100,
+        )
+        base = timezone.now() + timedelta(days=3650)
+        slots = DoctorSlot.objects.bulk_create(
+            DoctorSlot(
+                doctor=doctor,
+                start=base + timedelta(minutes=30 * i),
+                end=base + timedelta(minutes=30 * (i + 1)),
+            )
+            for i in range(total_slots)
+        )
+        patients = User.objects.bulk_create(
+            User(
+                email=f"bench-{tag}-{i}@example.com",
+                first_name="Bench",
+                last_name=f"Patient {i}",
+                password="!",
+            )
+            for i in range(threads)
+        )
+        return doctor, slots, patients
+
+    def race(self, book, slots, patients):
+        barrier = threading.Barrier(len(patients))
+        results = []
+        lock = threading.Lock()
+
+        def worker(patient):
+            local = []
+            try:
+                for slot in slots:
+                    barrier.wait()
+                    started = time.perf_counter()
+                    try:
+                        book(slot, patient)
+                        outcome = "booked"
+                    except SlotAlreadyBooked:
+                        outcome = "conflict"
+                    except BookingError:
+                        outcome = "error"
+                    local.append((outcome, time.perf_counter() - started))
+            finally:
+                connection.close()
+                with lock:
+                    results.extend(local)
+
+        workers = [
+            threading.Thread(target=worker, args=(patient,))
+            for patient in patients
+        ]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        return {"elapsed": time.perf_counter() - started, "results": results}
+
+    def report(self, name, stats, total_slots):
+        results = stats["results"]
+        booked = [t * 1000 for outcome, t in results if outcome == "booked"]
+        conflicts = [t * 1000 for outcome, t in results if outcome == "conflict"]
+        errors = len(results) - len(booked) - len(conflicts)
+
+        self.stdout.write(self.style.SUCCESS(f"[{name}]"))
+        self.stdout.write(
+            f"  attempts: {len(results)} in {stats['elapsed']:.2f}s "
+            f"({len(results) / stats['elapsed']:.1f} attempts/s)"
+        )
+        self.stdout.write(
+            f"  booked: {len(booked)}/{total_slots} | "
+            f"conflicts: {len(conflicts)} | errors: {errors}"
+        )
+        self.stdout.write(
+            f"  booking latency ms: p50={percentile(booked, 50):.2f} "
+            f"p95={percentile(booked, 95):.2f}"
+        )
+        self.stdout.write(
+            f"  conflict latency ms: p50={percentile(conflicts, 50):.2f} "
+            f"p95={percentile(conflicts, 95):.2f}"
+        )
+        if len(booked) != total_slots:
+            self.stdout.write(self.style.ERROR(
+                "  double booking or lost booking detected!"
+            ))
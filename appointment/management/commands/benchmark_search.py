@@ -0,0 +1,182 @@
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from appointment.models import Appointment
+from controller.filters import TrigramSearchFilter
+from doctor.models import Doctor, DoctorSlot
+
+User = get_user_model()
+
+SYLLABLES = [
+    "ko", "val", "shev", "chen", "bon", "dar", "mel", "nyk", "tar", "sor",
+    "lys", "hor", "pet", "ren", "zak", "bil", "mor", "vin", "dan", "lev",
+]
+SUFFIXES = ["enko", "chuk", "ov", "sky", "yak", "son", "man", "ets"]
+
+TRIGRAM_INDEXES = ("user_last_name_trgm", "doctor_last_name_trgm")
+
+
+def make_names(count, rng):
+    return [
+        "".join(rng.choices(SYLLABLES, k=rng.randint(1, 3))).capitalize()
+        + rng.choice(SUFFIXES)
+        for _ in range(count)
+    ]
+
+
+def with_typo(term, rng):
+    position = rng.randrange(1, len(term))
+    return term[:position] + term[position + 1:]
+
+
+class SearchView:
+    search_fields = [
+        "patient__last_name",
+        "doctor_slot__doctor__last_name",
+    ]
+
+
+class Command(BaseCommand):
+    """
+    Appointment search the way AppointmentViewSet runs it (first page
+    and count): DRF SearchFilter (icontains) against TrigramSearchFilter,
+    with and without the trigram indexes. Fixture data lives in a
+    transaction that is rolled back.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--appointments", type=int, default=1_000_000)
+        parser.add_argument("--patients", type=int, default=50_000)
+        parser.add_argument("--doctors", type=int, default=500)
+        parser.add_argument("--terms", type=int, default=10)
+        parser.add_argument("--page-size", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            names = self.prepare(options, rng)
+            terms = [
+                term
+                for name in rng.sample(names, options["terms"])
+                for term in (name[:5], with_typo(name, rng))
+            ]
+
+            self.measure("trigram", TrigramSearchFilter(), terms, options)
+            self.measure("icontains", SearchFilter(), terms, options)
+            with connection.cursor() as cursor:
+                for index in TRIGRAM_INDEXES:
+                    cursor.execute(f"DROP INDEX {index}")
+            self.measure(
+                "icontains, no index", SearchFilter(), terms, options
+            )
+
+            transaction.set_rollback(True)
+
+    def prepare(self, options, rng):
+        tag = uuid.uuid4().hex[:8]
+        started = time.perf_counter()
+
+        patient_names = make_names(options["patients"], rng)
+        patients = User.objects.bulk_create(
+            User(
+                email=f"bench-{tag}-{i}@example.com",
+                first_name="Bench",
+                last_name=last_name,
+            )
+            for i, last_name in enumerate(patient_names)
+        )
+        doctors = Doctor.objects.bulk_create(
+            Doctor(first_name="Bench", last_name=last_name,
+                   price_per_visit=100)
+            for last_name in make_names(options["doctors"], rng)
+        )
+
+        per_doctor = -(-options["appointments"] // len(doctors))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {DoctorSlot._meta.db_table}
+                    (doctor_id, start, "end", created_at, is_booked)
+                SELECT doctor.id,
+                       now() + n * interval '30 minutes',
+                       now() + (n + 1) * interval '30 minutes',
+                       now(),
+                       true
+                FROM unnest(%(doctor_ids)s::bigint[]) AS doctor(id)
+                CROSS JOIN generate_series(0, %(per_doctor)s - 1) AS n
+                """,
+                {
+                    "doctor_ids": [doctor.id for doctor in doctors],
+                    "per_doctor": per_doctor,
+                },
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {Appointment._meta.db_table}
+                    (doctor_slot_id, patient_id, status, booked_at)
+                SELECT slot.id,
+                       (%(patient_ids)s::bigint[])[
+                           1 + floor(random() * %(patients)s)::int
+                       ],
+                       'BOOKED',
+                       now()
+                FROM {DoctorSlot._meta.db_table} AS slot
+                WHERE slot.doctor_id = ANY(%(doctor_ids)s::bigint[])
+                LIMIT %(appointments)s
+                """,
+                {
+                    "doctor_ids": [doctor.id for doctor in doctors],
+                    "patient_ids": [patient.id for patient in patients],
+                    "patients": len(patients),
+                    "appointments": options["appointments"],
+                },
+            )
+            total = cursor.rowcount
+            for model in (User, Doctor, DoctorSlot, Appointment):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+        self.stdout.write(
+            f"Prepared {len(patients)} patients, {len(doctors)} doctors, "
+            f"{total} appointments in {time.perf_counter() - started:.1f}s"
+        )
+        return patient_names
+
+    def search(self, backend, term, page_size):
+        request = Request(APIRequestFactory().get("/", {"search": term}))
+        queryset = backend.filter_queryset(
+            request,
+            Appointment.objects.select_related(
+                "patient", "doctor_slot__doctor"
+            ),
+            SearchView(),
+        )
+        return queryset.count(), list(queryset[:page_size])
+
+    def measure(self, name, backend, terms, options):
+        timings = []
+        found = []
+        for term in terms:
+            started = time.perf_counter()
+            count, page = self.search(backend, term, options["page_size"])
+            timings.append((time.perf_counter() - started) * 1000)
+            found.append(count)
+
+        self.stdout.write(self.style.SUCCESS(f"[{name}]"))
+        self.stdout.write(
+            f"  ms per search (count + first page): "
+            f"median={statistics.median(timings):.2f} "
+            f"min={min(timings):.2f} max={max(timings):.2f}"
+        )
+        self.stdout.write(
+            f"  matches per term: {dict(zip(terms, found))}"
+        )
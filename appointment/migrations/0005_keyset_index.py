@@ -0,0 +1,25 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:20
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The index is built without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ("appointment", "0004_appointment_unique_active_slot_booking"),
+        ("doctor", "0010_slot_archive"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="appointment",
+            index=models.Index(
+                fields=["booked_at", "id"], name="appointment_booked_at_id"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The index is built without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ("appointment", "0005_keyset_index"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="appointment",
+            index=models.Index(
+                condition=models.Q(("status", "BOOKED")),
+                fields=["doctor_slot"],
+                name="appointment_booked_slot",
+            ),
+        ),
+    ]
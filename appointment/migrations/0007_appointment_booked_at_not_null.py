@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-17 03:10
+
+from django.db import migrations, models
+
+# Appointments saved without a booking time get the start of their
+# slot, as Appointment.save() does for new ones.
+BACKFILL_BOOKED_AT_SQL = """
+UPDATE appointment_appointment appointment
+SET booked_at = slot.start
+FROM doctor_doctorslot slot
+WHERE slot.id = appointment.doctor_slot_id
+  AND appointment.booked_at IS NULL
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointment", "0006_no_show_index"),
+        ("doctor", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunSQL(BACKFILL_BOOKED_AT_SQL, migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name="appointment",
+            name="booked_at",
+            field=models.DateTimeField(blank=True),
+        ),
+    ]
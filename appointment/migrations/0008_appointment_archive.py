@@ -0,0 +1,58 @@
+# Generated by Django 5.2.10 on 2026-10-17 02:42
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointment", "0007_appointment_booked_at_not_null"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedAppointment",
+            fields=[
+                (
+                    "appointment_id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("doctor_slot_id", models.BigIntegerField()),
+                ("patient_id", models.BigIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("BOOKED", "Booked"),
+                            ("COMPLETED", "Completed"),
+                            ("CANCELLED", "Cancelled"),
+                            ("NO_SHOW", "No Show"),
+                        ],
+                        max_length=15,
+                    ),
+                ),
+                ("booked_at", models.DateTimeField()),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "price",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=8, null=True
+                    ),
+                ),
+                ("archived_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["-booked_at"],
+                "indexes": [
+                    django.contrib.postgres.indexes.BrinIndex(
+                        fields=["booked_at"], name="archivedappt_booked_brin"
+                    ),
+                    models.Index(
+                        fields=["patient_id", "booked_at"],
+                        name="archivedappt_patient_booked",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-17 03:05
+
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The indexes are built and dropped without locking the table
+    # against writes.
+    atomic = False
+
+    dependencies = [
+        ("appointment", "0008_appointment_archive"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="appointment",
+            index=models.Index(
+                condition=models.Q(("status", "BOOKED")),
+                fields=["booked_at"],
+                name="appointment_booked_start",
+            ),
+        ),
+        RemoveIndexConcurrently(
+            model_name="appointment",
+            name="appointment_booked_slot",
+        ),
+    ]
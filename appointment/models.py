@@ -1,11 +1,13 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.contrib.postgres.indexes import BrinIndex
 from django.db.models import Q
 
+from controller.tracking import FieldTrackerMixin
 from doctor.models import DoctorSlot
 
 
-class Appointment(models.Model):
+class Appointment(FieldTrackerMixin, models.Model):
     """
     Appointment model - core of the project,
     here described how booking should work
@@ -17,6 +19,9 @@ class Appointment(models.Model):
         CANCELLED = ("CANCELLED", "Cancelled")
         NO_SHOW = ("NO_SHOW", "No Show")
 
+    # the post_save pipeline reacts to status transitions
+    tracked_fields = ("status",)
+
     doctor_slot = models.ForeignKey(
         DoctorSlot, on_delete=models.CASCADE, related_name="appointment"
     )
@@ -28,7 +33,8 @@ class Appointment(models.Model):
     status = models.CharField(
         max_length=15, choices=Status.choices, default=Status.BOOKED
     )
-    booked_at = models.DateTimeField(null=True, blank=True)
+    # filled from the slot start on save; a keyset pagination key
+    booked_at = models.DateTimeField(blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     price = models.DecimalField(
         max_digits=8, decimal_places=2, editable=False, null=True, blank=True
@@ -44,6 +50,7 @@ class Appointment(models.Model):
         """
         Redefined method to automatically fill
         - price and booking time
+        - booking state of the slot (in the same transaction)
         """
         if self.doctor_slot:
             if not self.price:
@@ -51,7 +58,31 @@ class Appointment(models.Model):
             if not self.booked_at:
                 self.booked_at = self.doctor_slot.start
 
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_slot_state()
+        self.reset_tracking(kwargs.get("update_fields"))
+
+    def sync_slot_state(self):
+        """
+        Active (not cancelled) appointment occupies the slot,
+        cancelled one frees it only if it is still the active one
+        """
+        slots = DoctorSlot.objects.filter(pk=self.doctor_slot_id)
+        if self.status == self.Status.CANCELLED:
+            freed = slots.filter(active_appointment_id=self.pk).update(
+                is_booked=False, active_appointment=None
+            )
+            is_booked = False if freed else None
+        else:
+            slots.update(is_booked=True, active_appointment_id=self.pk)
+            is_booked = True
+
+        if is_booked is not None and Appointment.doctor_slot.is_cached(self):
+            self.doctor_slot.is_booked = is_booked
+            self.doctor_slot.active_appointment_id = (
+                self.pk if is_booked else None
+            )
 
     class Meta:
         """
@@ -63,6 +94,18 @@ class Appointment(models.Model):
         ordering = [
             "-booked_at",
         ]
+        indexes = [
+            # keyset pagination key
+            models.Index(
+                fields=["booked_at", "id"], name="appointment_booked_at_id"
+            ),
+            # no-show sweep: booked appointments by slot start
+            models.Index(
+                fields=["booked_at"],
+                condition=Q(status="BOOKED"),
+                name="appointment_booked_start",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["doctor_slot"],
@@ -70,3 +113,39 @@ class Appointment(models.Model):
                 name="unique_active_slot_booking"
             )
         ]
+
+
+class ArchivedAppointment(models.Model):
+    """
+    Finished appointments moved out of Appointment by the archival job,
+    together with their payments (ArchivedPayment), so the live tables
+    only hold what the booking and payment flows can still change.
+    Rows are keyed by their Appointment id and have no foreign keys.
+    """
+
+    appointment_id = models.BigIntegerField(primary_key=True)
+    doctor_slot_id = models.BigIntegerField()
+    patient_id = models.BigIntegerField()
+    status = models.CharField(max_length=15, choices=Appointment.Status.choices)
+    booked_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    price = models.DecimalField(
+        max_digits=8, decimal_places=2, null=True, blank=True
+    )
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-booked_at"]
+        indexes = [
+            BrinIndex(fields=["booked_at"], name="archivedappt_booked_brin"),
+            models.Index(
+                fields=["patient_id", "booked_at"],
+                name="archivedappt_patient_booked",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"Archived appointment #{self.appointment_id} | "
+            f"Patient #{self.patient_id} | {self.status}"
+        )
@@ -1,9 +1,15 @@
 from django.contrib.auth import get_user_model
-from django.db import transaction
-from django.utils import timezone
-from rest_framework import serializers
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
 
 from appointment.models import Appointment
+from appointment.services.booking import (
+    book_slot,
+    PatientHasDebt,
+    SlotAlreadyBooked,
+    SlotInPast,
+    SlotNotFound,
+)
 from doctor.models import DoctorSlot
 from doctor.serializers import DoctorSlotDetailSerializer
 from payment.serializers import PaymentSerializer
@@ -13,18 +19,24 @@ from user.serializers import UserSerializer
 User = get_user_model()
 
 
+class SlotConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = {
+        "doctor_slot": "This slot is already booked by another patient."
+    }
+    default_code = "slot_conflict"
+
+
 class AppointmentSerializer(serializers.ModelSerializer):
     patient = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), required=False
     )
     """
-    Excluding all appointments in the past and with status booked,
-    completed, no show to better user-friendly design
+    Excluding slots with active (booked, completed, no show) appointment
+    to better user-friendly design, past slots are rejected by booking
     """
     doctor_slot = serializers.PrimaryKeyRelatedField(
-        queryset=DoctorSlot.objects.filter(
-            start__gt=timezone.now(),
-        ).exclude(appointment__status__in=["BOOKED", "COMPLETED", "NO_SHOW"]),
+        queryset=DoctorSlot.objects.filter(is_booked=False),
         label="Free slot",
     )
 
@@ -59,57 +71,41 @@ class AppointmentSerializer(serializers.ModelSerializer):
                 self.fields["patient"].read_only = True
                 self.fields["patient"].queryset = None
 
-    def validate(self, attrs):
+    def create(self, validated_data):
         """
-        Complex validation - debt, slot, time
-        Users can book only for themselves
+        Booking goes through the single-statement engine: slot start,
+        pending debt and the active booking constraint are all checked
+        by the same INSERT. Staff booking for themselves skip the debt
+        check, patients and staff booking for a patient do not.
         """
-
-        slot = attrs.get("doctor_slot")
         user = self.context["request"].user
-        patient = attrs.get("patient")
-
-        if slot.start < timezone.now():
+        patient = validated_data.get("patient", user)
+        slot = validated_data["doctor_slot"]
+
+        try:
+            return book_slot(
+                slot_id=slot.pk,
+                patient=patient,
+                check_debt=not (user.is_staff and patient == user),
+            )
+        except SlotInPast:
             raise serializers.ValidationError(
                 {"doctor_slot": "You cannot book a slot in the past."}
             )
-
-        with transaction.atomic():
-            is_taken = Appointment.objects.select_for_update().filter(
-                doctor_slot=slot
-            ).exclude(status="CANCELLED").exists()
-
-            if is_taken:
-                raise serializers.ValidationError(
-                    {"doctor_slot":
-                        "This slot is already booked by another patient."}
+        except PatientHasDebt as debt:
+            if patient == user:
+                message = (
+                    "You cannot book a new appointment "
+                    f"until you pay pending invoices. Total {debt.total}"
                 )
-
-        if (
-            user.is_authenticated
-            and not user.is_staff
-            and getattr(user, "has_penalty", False)
-        ):
-            raise serializers.ValidationError(
-                {
-                    "detail": "You cannot book a new appointment "
-                    f"until you pay pending invoices. Total {user.has_penalty}"
-                }
-            )
-
-        if (
-            user.is_authenticated
-            and patient
-            and getattr(patient, "has_penalty", False)
-        ):
-            raise serializers.ValidationError(
-                {
-                    "detail": "You cannot book a new appointment "
-                    f"until user will pay the loan. Total {patient.has_penalty}"
-                }
-            )
-
-        return attrs
+            else:
+                message = (
+                    "You cannot book a new appointment "
+                    f"until user will pay the loan. Total {debt.total}"
+                )
+            raise serializers.ValidationError({"detail": message})
+        except (SlotAlreadyBooked, SlotNotFound):
+            raise SlotConflict()
 
 
 class AppointmentDetailSerializer(AppointmentSerializer):
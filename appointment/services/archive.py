@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from appointment.models import Appointment, ArchivedAppointment
+from doctor.models import DoctorSlot
+from doctor.services.heatmap import invalidate_doctor_slots
+from payment.models import ArchivedPayment, Payment
+
+ARCHIVE_BATCH_SIZE = 5000
+
+FINISHED_STATUSES = [
+    Appointment.Status.COMPLETED,
+    Appointment.Status.CANCELLED,
+    Appointment.Status.NO_SHOW,
+]
+
+# Finished appointments are moved with their payments in one statement;
+# one with a pending payment stays until it is settled, so the balance
+# ledger never refers to an archived payment. The slot keeps its booked
+# flag but no longer points at the appointment. Rows locked by someone
+# else are skipped and picked up by the next run.
+ARCHIVE_BATCH_SQL = """
+WITH expired AS (
+    SELECT appointment.id
+    FROM {appointment_table} appointment
+    WHERE appointment.booked_at < %(before)s
+      AND appointment.status = ANY(%(statuses)s)
+      AND NOT EXISTS (
+          SELECT 1
+          FROM {payment_table} payment
+          WHERE payment.appointment_id = appointment.id
+            AND payment.status = %(pending)s
+      )
+    LIMIT %(limit)s
+    FOR UPDATE SKIP LOCKED
+), released AS (
+    UPDATE {slot_table} slot
+    SET active_appointment_id = NULL
+    FROM expired
+    WHERE slot.active_appointment_id = expired.id
+), moved_payments AS (
+    DELETE FROM {payment_table} payment
+    USING expired
+    WHERE payment.appointment_id = expired.id
+    RETURNING payment.id, payment.appointment_id, payment.status,
+              payment.payment_type, payment.money_to_pay, payment.session_id,
+              payment.stripe_payment_intent_id, payment.created_at
+), archived_payments AS (
+    INSERT INTO {archived_payment_table}
+        (payment_id, appointment_id, status, payment_type, money_to_pay,
+         session_id, stripe_payment_intent_id, created_at, archived_at)
+    SELECT id, appointment_id, status, payment_type, money_to_pay,
+           session_id, stripe_payment_intent_id, created_at, now()
+    FROM moved_payments
+), moved AS (
+    DELETE FROM {appointment_table} appointment
+    USING expired
+    WHERE appointment.id = expired.id
+    RETURNING appointment.id, appointment.doctor_slot_id,
+              appointment.patient_id, appointment.status,
+              appointment.booked_at, appointment.completed_at,
+              appointment.price
+), archived AS (
+    INSERT INTO {archived_appointment_table}
+        (appointment_id, doctor_slot_id, patient_id, status, booked_at,
+         completed_at, price, archived_at)
+    SELECT id, doctor_slot_id, patient_id, status, booked_at,
+           completed_at, price, now()
+    FROM moved
+    RETURNING doctor_slot_id
+)
+SELECT slot.doctor_id
+FROM archived
+JOIN {slot_table} slot ON slot.id = archived.doctor_slot_id
+"""
+
+
+def _archive_batch_sql():
+    return ARCHIVE_BATCH_SQL.format(
+        appointment_table=Appointment._meta.db_table,
+        payment_table=Payment._meta.db_table,
+        slot_table=DoctorSlot._meta.db_table,
+        archived_appointment_table=ArchivedAppointment._meta.db_table,
+        archived_payment_table=ArchivedPayment._meta.db_table,
+    )
+
+
+def archive_batch(before, limit):
+    """Move up to `limit` finished appointments; returns their doctor ids"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _archive_batch_sql(),
+            {
+                "before": before,
+                "statuses": FINISHED_STATUSES,
+                "pending": Payment.Status.PENDING,
+                "limit": limit,
+            },
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def archive_finished_appointments(days, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move finished appointments booked more than `days` days ago, and
+    their payments, into ArchivedAppointment / ArchivedPayment, each
+    batch in its own transaction. Appointment and payment signals are
+    bypassed, so the slot caches of the affected doctors are
+    invalidated per batch. Returns the number of archived appointments.
+    """
+    before = timezone.now() - timedelta(days=days)
+    archived = 0
+    while True:
+        with transaction.atomic():
+            doctor_ids = archive_batch(before, batch_size)
+            invalidate_doctor_slots(*doctor_ids)
+        archived += len(doctor_ids)
+        if len(doctor_ids) < batch_size:
+            return archived
@@ -0,0 +1,146 @@
+import logging
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from appointment.models import Appointment
+from doctor.models import Doctor, DoctorSlot
+from payment.models import BalanceAccount
+
+logger = logging.getLogger(__name__)
+
+
+class BookingError(Exception):
+    """Base class for every reason the booking engine refuses a slot."""
+
+
+class SlotNotFound(BookingError):
+    pass
+
+
+class SlotInPast(BookingError):
+    pass
+
+
+class SlotAlreadyBooked(BookingError):
+    pass
+
+
+class PatientHasDebt(BookingError):
+    def __init__(self, total: Decimal):
+        super().__init__(f"Patient has pending invoices: {total}")
+        self.total = total
+
+
+# One statement does the whole booking:
+# - `slot` reads the slot start and the doctor price,
+# - `debt` reads the outstanding balance of the patient from the ledger
+#   by primary key (skipped on request),
+# - `booked` inserts the appointment only if the slot is in the future and
+#   there is no debt; a conflict on the `unique_active_slot_booking`
+#   partial index turns a concurrent booking into an empty RETURNING,
+# - `occupied` marks the slot as booked only if the insert happened.
+# The final SELECT reports every input so the caller can tell why
+# nothing was inserted.
+BOOK_SLOT_SQL = """
+WITH slot AS (
+    SELECT s.id, s.start, d.price_per_visit
+    FROM {slot_table} s
+    JOIN {doctor_table} d ON d.id = s.doctor_id
+    WHERE s.id = %(slot_id)s
+), debt AS (
+    SELECT COALESCE((
+        SELECT balance
+        FROM {account_table}
+        WHERE user_id = %(patient_id)s AND %(check_debt)s
+    ), 0) AS total
+), booked AS (
+    INSERT INTO {appointment_table}
+        (doctor_slot_id, patient_id, status, booked_at, price)
+    SELECT slot.id, %(patient_id)s, %(booked)s, slot.start,
+           slot.price_per_visit
+    FROM slot, debt
+    WHERE slot.start > %(now)s AND debt.total <= 0
+    ON CONFLICT (doctor_slot_id) WHERE status <> %(cancelled)s DO NOTHING
+    RETURNING id, booked_at, price
+), occupied AS (
+    UPDATE {slot_table}
+    SET is_booked = TRUE, active_appointment_id = booked.id
+    FROM booked
+    WHERE {slot_table}.id = %(slot_id)s
+)
+SELECT slot.start, debt.total, booked.id, booked.booked_at, booked.price
+FROM debt
+LEFT JOIN slot ON TRUE
+LEFT JOIN booked ON TRUE
+"""
+
+
+def _book_slot_sql():
+    return BOOK_SLOT_SQL.format(
+        slot_table=DoctorSlot._meta.db_table,
+        doctor_table=Doctor._meta.db_table,
+        account_table=BalanceAccount._meta.db_table,
+        appointment_table=Appointment._meta.db_table,
+    )
+
+
+def book_slot(*, slot_id, patient, check_debt=True, send_signals=True):
+    """
+    Reserve `slot_id` for `patient` with a single conditional INSERT.
+
+    Raises a BookingError subclass instead of inserting when the slot
+    is missing, already started, taken by a concurrent booking or the
+    patient has pending invoices. post_save is sent manually so payment
+    and notification handlers behave as for Appointment.objects.create.
+    """
+    using = router.db_for_write(Appointment)
+    params = {
+        "slot_id": slot_id,
+        "patient_id": patient.pk,
+        "check_debt": check_debt,
+        "booked": Appointment.Status.BOOKED,
+        "cancelled": Appointment.Status.CANCELLED,
+        "now": timezone.now(),
+    }
+
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(_book_slot_sql(), params)
+            start, debt, appointment_id, booked_at, price = cursor.fetchone()
+
+        if start is None:
+            raise SlotNotFound(f"Slot {slot_id} does not exist")
+        if start <= params["now"]:
+            raise SlotInPast(f"Slot {slot_id} has already started")
+        if debt > 0:
+            raise PatientHasDebt(debt)
+        if appointment_id is None:
+            raise SlotAlreadyBooked(f"Slot {slot_id} is already booked")
+
+        appointment = Appointment(
+            id=appointment_id,
+            doctor_slot_id=slot_id,
+            patient=patient,
+            status=Appointment.Status.BOOKED,
+            booked_at=booked_at,
+            price=price,
+        )
+        appointment._state.adding = False
+        appointment._state.db = using
+
+        if send_signals:
+            post_save.send(
+                sender=Appointment,
+                instance=appointment,
+                created=True,
+                update_fields=None,
+                raw=False,
+                using=using,
+            )
+        appointment.reset_tracking()
+
+    logger.info(f"Slot {slot_id} booked by patient {patient.pk}")
+    return appointment
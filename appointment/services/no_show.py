@@ -0,0 +1,84 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from appointment.models import Appointment
+from controller.outbox import enqueue_task
+from doctor.models import DoctorSlot
+from doctor.services.heatmap import invalidate_doctor_slots
+from payment.models import Payment
+from payment.tasks import create_stripe_payments_task
+
+NO_SHOW_BATCH_SIZE = 1000
+
+# booked_at is the slot start, so only booked appointments that have
+# started are read, from the appointment_booked_start partial index;
+# their slot end is then checked by primary key. Rows locked by a
+# concurrent change (a cancellation, a completion) are skipped and
+# picked up by the next run.
+NO_SHOW_BATCH_SQL = """
+WITH overdue AS (
+    SELECT appointment.id, slot.doctor_id
+    FROM {appointment_table} appointment
+    JOIN {slot_table} slot ON slot.id = appointment.doctor_slot_id
+    WHERE appointment.status = %(booked)s
+      AND appointment.booked_at < %(now)s
+      AND slot."end" < %(now)s
+    LIMIT %(limit)s
+    FOR UPDATE OF appointment SKIP LOCKED
+)
+UPDATE {appointment_table} appointment
+SET status = %(no_show)s
+FROM overdue
+WHERE appointment.id = overdue.id
+RETURNING appointment.id, overdue.doctor_id
+"""
+
+
+def _no_show_batch_sql():
+    return NO_SHOW_BATCH_SQL.format(
+        appointment_table=Appointment._meta.db_table,
+        slot_table=DoctorSlot._meta.db_table,
+    )
+
+
+def mark_no_show_batch(now, limit):
+    """
+    Mark up to `limit` overdue booked appointments as NO_SHOW;
+    returns (appointment_id, doctor_id) pairs
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _no_show_batch_sql(),
+            {
+                "booked": Appointment.Status.BOOKED,
+                "no_show": Appointment.Status.NO_SHOW,
+                "now": now,
+                "limit": limit,
+            },
+        )
+        return cursor.fetchall()
+
+
+def mark_no_shows(batch_size=NO_SHOW_BATCH_SIZE):
+    """
+    Mark every booked appointment whose slot has ended as NO_SHOW, each
+    batch in its own transaction. Appointment signals are bypassed: the
+    slot caches are invalidated and the no-show fees are written to the
+    outbox as one task per batch. Returns the marked appointment ids.
+    """
+    now = timezone.now()
+    marked = []
+    while True:
+        with transaction.atomic():
+            rows = mark_no_show_batch(now, batch_size)
+            appointment_ids = [appointment_id for appointment_id, _ in rows]
+            invalidate_doctor_slots(*(doctor_id for _, doctor_id in rows))
+            if appointment_ids:
+                enqueue_task(
+                    create_stripe_payments_task,
+                    appointment_ids,
+                    Payment.Type.NO_SHOW_FEE,
+                )
+        marked += appointment_ids
+        if len(rows) < batch_size:
+            return marked
@@ -1,74 +1,90 @@
 import logging
 
-from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from appointment.models import Appointment
+from controller.outbox import enqueue_task
+from doctor.models import DoctorSlot
+from doctor.services.heatmap import invalidate_doctor_slots
+from notifications.signals import send_appointment_msg
 from payment.models import Payment
 from payment.tasks import create_stripe_payment_task
 
 logger = logging.getLogger(__name__)
 
 
+# Payment created when an appointment reaches the status; a new
+# booking is charged the consultation, a status change back to BOOKED
+# is not charged at all
+PAYMENT_TYPE_BY_STATUS = {
+    Appointment.Status.COMPLETED: Payment.Type.CONSULTATION,
+    Appointment.Status.NO_SHOW: Payment.Type.NO_SHOW_FEE,
+    Appointment.Status.CANCELLED: Payment.Type.CANCELLATION_FEE,
+}
+
+
 @receiver(post_save, sender=Appointment)
-def create_payment_signal_handler(sender, instance, created, **kwargs):
+def appointment_saved_signal_handler(sender, instance, created, **kwargs):
     """
-    If we created appointment we call create_stripe_payment_task
+    Side effects of a booking or a status transition, decided from the
+    status tracked since the appointment was loaded (no old row lookup):
     ----------------------------------------------------------------
-    block else:
-    If we patched appointment to status=COMPLETED
-    and payment "CONSULTATION" exists - we do nothing,
-    if payment doesn't exist - we will call
-    create_stripe_payment_task with CONSULTATION
+    created as BOOKED - create_stripe_payment_task with CONSULTATION
     ----------------------------------------------------------------
-    If we patched appointment to status=NO_SHOW and payment
-    with NO_SHOW_FEE exists - we do nothing,
-    if payment doesn't exist - we will call
-    create_stripe_payment_task with NO_SHOW_FEE
+    changed to COMPLETED / NO_SHOW / CANCELLED -
+    create_stripe_payment_task with CONSULTATION / NO_SHOW_FEE /
+    CANCELLATION_FEE; the task skips the appointment if a payment of
+    that type already exists
     ----------------------------------------------------------------
-    If we patched appointment to status=CANCELLED and payment
-    with CANCELLATION_FEE exists - we do nothing,
-    if payment doesn't exist AND there is less than 24 hours left
-    until the doctor's appointment
-    we will call create_stripe_payment_task with CANCELLATION_FEE
+    Every booking and transition is also reported to the admin chat.
+    A save that does not change the status does nothing.
     """
-    if created and instance.status == "BOOKED":
-        transaction.on_commit(
-            lambda: create_stripe_payment_task.delay(
-                instance.id, Payment.Type.CONSULTATION
-            )
+    if not created and not instance.has_changed("status"):
+        return
+
+    if created:
+        payment_type = (
+            Payment.Type.CONSULTATION
+            if instance.status == Appointment.Status.BOOKED
+            else None
         )
     else:
-        if instance.status == Appointment.Status.COMPLETED:
-            has_payment = instance.payments.filter(
-                payment_type=Payment.Type.CONSULTATION
-            ).exists()
+        payment_type = PAYMENT_TYPE_BY_STATUS.get(instance.status)
+
+    if payment_type is not None:
+        enqueue_task(create_stripe_payment_task, instance.id, payment_type)
+
+    send_appointment_msg(instance, "created" if created else "updated")
+
+
+@receiver(post_delete, sender=Appointment)
+def free_slot_on_delete_signal_handler(sender, instance, **kwargs):
+    """
+    active_appointment is already nulled by SET_NULL,
+    here we only drop the booked flag of the slot
+    """
+    if instance.status != Appointment.Status.CANCELLED:
+        DoctorSlot.objects.filter(
+            pk=instance.doctor_slot_id,
+            is_booked=True,
+            active_appointment__isnull=True,
+        ).update(is_booked=False)
 
-            if not has_payment:
-                transaction.on_commit(
-                    lambda: create_stripe_payment_task.delay(
-                        instance.id, Payment.Type.CONSULTATION
-                    )
-                )
-        elif instance.status == Appointment.Status.NO_SHOW:
-            has_penalty = instance.payments.filter(
-                payment_type=Payment.Type.NO_SHOW_FEE
-            ).exists()
 
-            if not has_penalty:
-                transaction.on_commit(
-                    lambda: create_stripe_payment_task.delay(
-                        instance.id, Payment.Type.NO_SHOW_FEE
-                    )
-                )
-        elif instance.status == Appointment.Status.CANCELLED:
-            has_penalty = instance.payments.filter(
-                payment_type=Payment.Type.CANCELLATION_FEE
-            ).exists()
-            if not has_penalty:
-                transaction.on_commit(
-                    lambda: create_stripe_payment_task.delay(
-                        instance.id, Payment.Type.CANCELLATION_FEE
-                    )
-                )
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_slot_cache_signal_handler(sender, instance, **kwargs):
+    """
+    Booking state of the slot is changed with queryset updates,
+    so the slot's own signals do not fire
+    """
+    if Appointment.doctor_slot.is_cached(instance):
+        doctor_id = instance.doctor_slot.doctor_id
+    else:
+        doctor_id = DoctorSlot.objects.filter(
+            pk=instance.doctor_slot_id
+        ).values_list("doctor_id", flat=True).first()
+
+    if doctor_id is not None:
+        invalidate_doctor_slots(doctor_id)
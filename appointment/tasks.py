@@ -0,0 +1,17 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from appointment.services.archive import archive_finished_appointments
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def archive_finished_appointments_task(days=None):
+    if days is None:
+        days = settings.APPOINTMENT_ARCHIVE_AFTER_DAYS
+    archived = archive_finished_appointments(days=days)
+    logger.info(f"Appointment archive: {archived} appointment(s) archived")
+    return archived
@@ -0,0 +1,86 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from appointment.models import Appointment, ArchivedAppointment
+from appointment.services.archive import archive_finished_appointments
+from doctor.models import ArchivedDoctorSlot, Doctor, DoctorSlot
+from doctor.services.archive import archive_expired_slots
+from payment.models import ArchivedPayment, BalanceAccount, Payment
+
+
+class AppointmentArchiveTests(TestCase):
+    def setUp(self):
+        self.doctor = Doctor.objects.create(
+            first_name="Gregory", last_name="House", price_per_visit=100
+        )
+        self.patient = get_user_model().objects.create_user(
+            email="patient@example.com", password="password123"
+        )
+
+    def book(self, days, status, payment_status=None):
+        start = timezone.now() + timedelta(days=days)
+        slot = DoctorSlot.objects.create(
+            doctor=self.doctor, start=start, end=start + timedelta(hours=1)
+        )
+        appointment = Appointment.objects.create(
+            doctor_slot=slot, patient=self.patient, status=status
+        )
+        if payment_status:
+            Payment.objects.create(
+                appointment=appointment,
+                payment_type=Payment.Type.CONSULTATION,
+                money_to_pay=100,
+                status=payment_status,
+            )
+        return appointment
+
+    def test_moves_finished_appointments_with_their_payments(self):
+        completed = self.book(
+            -200, Appointment.Status.COMPLETED, Payment.Status.PAID
+        )
+        cancelled = self.book(-190, Appointment.Status.CANCELLED)
+        unpaid = self.book(
+            -199, Appointment.Status.NO_SHOW, Payment.Status.PENDING
+        )
+        booked = self.book(-198, Appointment.Status.BOOKED)
+        recent = self.book(-10, Appointment.Status.COMPLETED)
+
+        self.assertEqual(archive_finished_appointments(days=180), 2)
+
+        self.assertCountEqual(
+            Appointment.objects.values_list("id", flat=True),
+            [unpaid.id, booked.id, recent.id],
+        )
+        self.assertCountEqual(
+            ArchivedAppointment.objects.values_list(
+                "appointment_id", flat=True
+            ),
+            [completed.id, cancelled.id],
+        )
+        archived_payment = ArchivedPayment.objects.get()
+        self.assertEqual(archived_payment.appointment_id, completed.id)
+        self.assertEqual(archived_payment.status, Payment.Status.PAID)
+        self.assertEqual(
+            BalanceAccount.objects.get(user=self.patient).balance, 100
+        )
+
+        slot = DoctorSlot.objects.get(pk=completed.doctor_slot_id)
+        self.assertIsNone(slot.active_appointment_id)
+        self.assertEqual(archive_expired_slots(days=30), 2)
+        self.assertCountEqual(
+            ArchivedDoctorSlot.objects.values_list("slot_id", flat=True),
+            [completed.doctor_slot_id, cancelled.doctor_slot_id],
+        )
+
+    def test_command_reports_archived_appointments(self):
+        self.book(-400, Appointment.Status.COMPLETED)
+        out = StringIO()
+
+        call_command("archive_appointments", days=365, stdout=out)
+
+        self.assertIn("Archived 1 appointment(s)", out.getvalue())
@@ -0,0 +1,30 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.test import TransactionTestCase
+
+from appointment.models import Appointment
+from appointment.signals import appointment_saved_signal_handler
+
+
+class BenchmarkBookingCommandTests(TransactionTestCase):
+    """
+    Smoke test of the booking benchmark; its threads use their own
+    connections, so the rows they race for have to be committed
+    """
+
+    def test_races_both_paths_with_signals_muted(self):
+        out = StringIO()
+
+        call_command("benchmark_booking", slots=2, threads=2, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn("[legacy]", output)
+        self.assertIn("[engine]", output)
+        self.assertEqual(output.count("booked: 2/2"), 2)
+        # the handler is connected again afterwards
+        self.assertTrue(post_save.disconnect(
+            appointment_saved_signal_handler, sender=Appointment
+        ))
+        post_save.connect(appointment_saved_signal_handler, sender=Appointment)
@@ -0,0 +1,124 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from appointment.models import Appointment
+from appointment.services.booking import (
+    book_slot,
+    PatientHasDebt,
+    SlotAlreadyBooked,
+    SlotInPast,
+)
+from controller.models import OutboxMessage
+from doctor.models import Doctor, DoctorSlot
+from notifications.tasks import notify_admin_task
+from payment.models import Payment
+
+User = get_user_model()
+
+
+class BookSlotTests(TestCase):
+    """
+    Tests for the single-statement booking engine
+    """
+
+    def setUp(self):
+        self.patient = User.objects.create_user(
+            email="patient@example.com", password="password123"
+        )
+        self.doctor = Doctor.objects.create(
+            first_name="Gregory",
+            last_name="House",
+            price_per_visit=500.00,
+        )
+        start = timezone.now() + timezone.timedelta(days=1)
+        self.slot = DoctorSlot.objects.create(
+            doctor=self.doctor,
+            start=start,
+            end=start + timezone.timedelta(minutes=30),
+        )
+
+    def test_book_slot_creates_appointment_and_sends_signals(self):
+        appointment = book_slot(slot_id=self.slot.id, patient=self.patient)
+
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.status, Appointment.Status.BOOKED)
+        self.assertEqual(appointment.price, self.doctor.price_per_visit)
+        self.assertEqual(appointment.booked_at, self.slot.start)
+        self.assertEqual(
+            OutboxMessage.objects.filter(
+                task=notify_admin_task.name
+            ).count(),
+            1,
+        )
+
+    def test_book_slot_conflict_on_active_booking(self):
+        book_slot(slot_id=self.slot.id, patient=self.patient)
+
+        with self.assertRaises(SlotAlreadyBooked):
+            book_slot(slot_id=self.slot.id, patient=self.patient)
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_book_slot_allowed_after_cancellation(self):
+        appointment = book_slot(slot_id=self.slot.id, patient=self.patient)
+        Appointment.objects.filter(pk=appointment.pk).update(
+            status=Appointment.Status.CANCELLED
+        )
+
+        book_slot(slot_id=self.slot.id, patient=self.patient)
+
+        self.assertEqual(
+            Appointment.objects.filter(status=Appointment.Status.BOOKED).count(),
+            1,
+        )
+
+    def test_book_slot_rejects_past_slot(self):
+        start = timezone.now() - timezone.timedelta(hours=2)
+        past_slot = DoctorSlot.objects.create(
+            doctor=self.doctor,
+            start=start,
+            end=start + timezone.timedelta(minutes=30),
+        )
+
+        with self.assertRaises(SlotInPast):
+            book_slot(slot_id=past_slot.id, patient=self.patient)
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_book_slot_rejects_patient_with_debt(self):
+        appointment = book_slot(slot_id=self.slot.id, patient=self.patient)
+        Payment.objects.create(
+            appointment=appointment,
+            status=Payment.Status.PENDING,
+            money_to_pay="120.00",
+        )
+        start = self.slot.end + timezone.timedelta(hours=1)
+        other_slot = DoctorSlot.objects.create(
+            doctor=self.doctor,
+            start=start,
+            end=start + timezone.timedelta(minutes=30),
+        )
+
+        with self.assertRaises(PatientHasDebt) as cm:
+            book_slot(slot_id=other_slot.id, patient=self.patient)
+        self.assertEqual(str(cm.exception.total), "120.00")
+
+        book_slot(slot_id=other_slot.id, patient=self.patient, check_debt=False)
+        self.assertEqual(Appointment.objects.count(), 2)
+
+    @patch("appointment.serializers.book_slot")
+    def test_concurrent_booking_returns_conflict(self, mock_book):
+        mock_book.side_effect = SlotAlreadyBooked()
+        client = APIClient()
+        client.force_authenticate(user=self.patient)
+
+        response = client.post(
+            reverse("appointment-list"), {"doctor_slot": self.slot.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertIn("already booked", str(response.data))
@@ -4,15 +4,22 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase
 from rest_framework.test import APIClient
 from rest_framework import status
-from unittest.mock import patch
 
 from appointment.models import Appointment
+from controller.models import OutboxMessage
 from doctor.models import Doctor, DoctorSlot
 from payment.models import Payment
+from payment.tasks import create_stripe_payment_task
 
 User = get_user_model()
 
 
+def queued_payment_tasks():
+    return list(OutboxMessage.objects.filter(
+        task=create_stripe_payment_task.name
+    ).values_list("args", flat=True))
+
+
 class AppointmentActionTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -48,8 +55,7 @@ class AppointmentActionTests(TestCase):
             status="BOOKED",
         )
 
-    @patch("payment.tasks.create_stripe_payment_task.delay")
-    def test_cancel_appointment_action(self, mock_payment_task):
+    def test_cancel_appointment_action(self):
         """
         Checking:
         1. Status changes to CANCELLED.
@@ -61,17 +67,16 @@ class AppointmentActionTests(TestCase):
 
         url_cancel = reverse("appointment-cancel-appointment", args=[self.appointment.id])
 
-        with self.captureOnCommitCallbacks(execute=True):
-            response = self.client.post(url_cancel)
+        response = self.client.post(url_cancel)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         self.appointment.refresh_from_db()
         self.assertEqual(self.appointment.status, Appointment.Status.CANCELLED)
 
-        mock_payment_task.assert_called_with(
-            self.appointment.id,
-            Payment.Type.CANCELLATION_FEE
+        self.assertEqual(
+            queued_payment_tasks()[-1],
+            [self.appointment.id, Payment.Type.CANCELLATION_FEE],
         )
 
         self.client.force_authenticate(user=self.other_patient)
@@ -101,8 +106,7 @@ class AppointmentActionTests(TestCase):
         self.assertEqual(active_appointments.count(), 1)
         self.assertEqual(active_appointments.first().patient, self.other_patient)
 
-    @patch("payment.tasks.create_stripe_payment_task.delay")
-    def test_completed_appointment_action(self, mock_payment_task):
+    def test_completed_appointment_action(self):
         """
         Checking:
         1. Status changed to COMPLETED.
@@ -112,21 +116,19 @@ class AppointmentActionTests(TestCase):
 
         url = reverse("appointment-completed-appointment", args=[self.appointment.id])
 
-        with self.captureOnCommitCallbacks(execute=True):
-            response = self.client.post(url)
+        response = self.client.post(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         self.appointment.refresh_from_db()
         self.assertEqual(self.appointment.status, Appointment.Status.COMPLETED)
 
-        mock_payment_task.assert_called_with(
-            self.appointment.id,
-            Payment.Type.CONSULTATION
+        self.assertEqual(
+            queued_payment_tasks()[-1],
+            [self.appointment.id, Payment.Type.CONSULTATION],
         )
 
-    @patch("payment.tasks.create_stripe_payment_task.delay")
-    def test_no_show_fail_if_future(self, mock_payment_task):
+    def test_no_show_fail_if_future(self):
         """
         Checking that we can't mark future appointment as no-show
         """
@@ -141,11 +143,13 @@ class AppointmentActionTests(TestCase):
         self.appointment.refresh_from_db()
         self.assertNotEqual(self.appointment.status, Appointment.Status.NO_SHOW)
 
-        # Task shouldn't be called
-        mock_payment_task.assert_not_called()
+        # Task shouldn't be queued
+        self.assertNotIn(
+            [self.appointment.id, Payment.Type.NO_SHOW_FEE],
+            queued_payment_tasks(),
+        )
 
-    @patch("payment.tasks.create_stripe_payment_task.delay")
-    def test_no_show_success_if_past(self, mock_payment_task):
+    def test_no_show_success_if_past(self):
         """
         Checking success no-show action with payment creation
         """
@@ -163,15 +167,14 @@ class AppointmentActionTests(TestCase):
         self.client.force_authenticate(user=self.admin_user)
         url = reverse("appointment-no-show-appointment", args=[past_appointment.id])
 
-        with self.captureOnCommitCallbacks(execute=True):
-            response = self.client.post(url)
+        response = self.client.post(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         past_appointment.refresh_from_db()
         self.assertEqual(past_appointment.status, Appointment.Status.NO_SHOW)
 
-        mock_payment_task.assert_called_with(
-            past_appointment.id,
-            Payment.Type.NO_SHOW_FEE
+        self.assertEqual(
+            queued_payment_tasks()[-1],
+            [past_appointment.id, Payment.Type.NO_SHOW_FEE],
         )
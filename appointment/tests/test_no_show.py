@@ -0,0 +1,96 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from appointment.models import Appointment
+from appointment.services.no_show import mark_no_shows
+from controller.models import OutboxMessage
+from doctor.models import Doctor, DoctorSlot
+from payment.models import Payment
+from payment.tasks import create_stripe_payments_task
+
+User = get_user_model()
+
+
+class NoShowSweepTests(TestCase):
+    """
+    Tests for the set-based no-show sweep
+    """
+
+    def setUp(self):
+        self.patient = User.objects.create(email="patient@example.com")
+        self.doctor = Doctor.objects.create(
+            first_name="Gregory",
+            last_name="House",
+            price_per_visit=100,
+        )
+
+    def book(self, hours_ago, status=Appointment.Status.BOOKED):
+        start = timezone.now() - timezone.timedelta(hours=hours_ago)
+        return Appointment.objects.create(
+            patient=self.patient,
+            status=status,
+            doctor_slot=DoctorSlot.objects.create(
+                doctor=self.doctor,
+                start=start,
+                end=start + timezone.timedelta(minutes=30),
+            ),
+        )
+
+    def test_marks_overdue_booked_appointments_in_batches(self):
+        overdue = [self.book(hours_ago=hours) for hours in (2, 3, 4)]
+        upcoming = self.book(hours_ago=-2)
+        in_progress = self.book(hours_ago=0.25)
+        completed = self.book(
+            hours_ago=5, status=Appointment.Status.COMPLETED
+        )
+        OutboxMessage.objects.all().delete()
+
+        marked = mark_no_shows(batch_size=2)
+
+        self.assertCountEqual(marked, [item.id for item in overdue])
+        self.assertEqual(
+            set(Appointment.objects.filter(
+                status=Appointment.Status.NO_SHOW
+            ).values_list("id", flat=True)),
+            {item.id for item in overdue},
+        )
+        for appointment, expected in (
+            (upcoming, Appointment.Status.BOOKED),
+            (in_progress, Appointment.Status.BOOKED),
+            (completed, Appointment.Status.COMPLETED),
+        ):
+            appointment.refresh_from_db()
+            self.assertEqual(appointment.status, expected)
+
+        # one fee task per batch, no per-appointment notification
+        queued = OutboxMessage.objects.values_list("task", "args")
+        self.assertEqual(
+            {task for task, _ in queued}, {create_stripe_payments_task.name}
+        )
+        self.assertEqual(len(queued), 2)
+        self.assertCountEqual(
+            [pk for _, (ids, _) in queued for pk in ids], marked
+        )
+
+        self.assertEqual(mark_no_shows(), [])
+
+    @patch("payment.tasks.process_appointment_payment")
+    def test_fee_task_skips_appointments_already_charged(self, mock_process):
+        charged, missing = self.book(hours_ago=2), self.book(hours_ago=3)
+        Payment.objects.create(
+            appointment=charged,
+            payment_type=Payment.Type.NO_SHOW_FEE,
+            money_to_pay=50,
+        )
+
+        create_stripe_payments_task(
+            [charged.id, missing.id], Payment.Type.NO_SHOW_FEE
+        )
+
+        mock_process.assert_called_once()
+        self.assertEqual(
+            mock_process.call_args.kwargs["appointment"], missing
+        )
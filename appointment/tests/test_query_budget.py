@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from appointment.models import Appointment
+from doctor.models import Doctor, DoctorSlot
+from payment.models import Payment
+from specializations.models import Specialization
+
+User = get_user_model()
+
+
+class AppointmentQueryBudgetTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email="admin@example.com", password="adminpass"
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.cardio = Specialization.objects.create(
+            name="Cardiology", code="cardio"
+        )
+        self.start = timezone.now() + timezone.timedelta(days=1)
+
+    def create_appointments(self, count):
+        appointments = []
+        for i in range(count):
+            doctor = Doctor.objects.create(
+                first_name="Gregory", last_name=f"House {i}",
+                price_per_visit=100,
+            )
+            doctor.specializations.add(self.cardio)
+            patient = User.objects.create_user(
+                email=f"patient{i}@example.com"
+            )
+            appointment = Appointment.objects.create(
+                patient=patient,
+                doctor_slot=DoctorSlot.objects.create(
+                    doctor=doctor,
+                    start=self.start,
+                    end=self.start + timezone.timedelta(minutes=30),
+                ),
+            )
+            Payment.objects.create(
+                appointment=appointment, money_to_pay=Decimal("25.00")
+            )
+            appointments.append(appointment)
+        return appointments
+
+    def test_list_page_is_one_query_whatever_its_size(self):
+        self.create_appointments(50)
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/appointments/", {"limit": 50})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 50)
+        self.assertTrue(response.data["results"][0]["doctor_slot"])
+        self.assertEqual(response.data["results"][0]["payment_status"], "PENDING")
+
+    def test_detail_has_a_fixed_query_budget(self):
+        appointment, = self.create_appointments(1)
+
+        # appointment with slot and doctor, specializations, payments,
+        # patient with the pending total
+        with self.assertNumQueries(4):
+            response = self.client.get(f"/api/appointments/{appointment.id}/")
+
+        self.assertEqual(response.data["patient"]["has_penalty"], Decimal("25.00"))
+        self.assertEqual(len(response.data["payment"]), 1)
+        self.assertEqual(
+            response.data["doctor_slot"]["doctor"]["specializations"],
+            ["Cardiology"],
+        )
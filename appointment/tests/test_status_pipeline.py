@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from appointment.models import Appointment
+from controller.models import OutboxMessage
+from doctor.models import Doctor, DoctorSlot
+from notifications.tasks import notify_admin_task
+from payment.models import Payment
+from payment.tasks import create_stripe_payment_task
+
+User = get_user_model()
+
+
+class StatusPipelineTests(TestCase):
+    """
+    Tests for the post_save pipeline driven by the tracked status
+    """
+
+    def setUp(self):
+        self.patient = User.objects.create(email="patient@example.com")
+        doctor = Doctor.objects.create(
+            first_name="Gregory", last_name="House", price_per_visit=100
+        )
+        start = timezone.now() - timezone.timedelta(hours=2)
+        self.slot = DoctorSlot.objects.create(
+            doctor=doctor,
+            start=start,
+            end=start + timezone.timedelta(minutes=30),
+        )
+        self.appointment = Appointment.objects.create(
+            patient=self.patient, doctor_slot=self.slot
+        )
+        OutboxMessage.objects.all().delete()
+
+    def queued(self, task):
+        return list(OutboxMessage.objects.filter(
+            task=task.name
+        ).values_list("args", flat=True))
+
+    def test_transition_reads_neither_old_row_nor_payments(self):
+        appointment = Appointment.objects.get(pk=self.appointment.pk)
+        appointment.status = Appointment.Status.NO_SHOW
+
+        with CaptureQueriesContext(connection) as queries:
+            appointment.save()
+
+        selects = [
+            query["sql"] for query in queries
+            if query["sql"].startswith("SELECT")
+        ]
+        for table in (Appointment._meta.db_table, Payment._meta.db_table):
+            self.assertFalse(
+                [sql for sql in selects if f'FROM "{table}"' in sql], table
+            )
+        self.assertEqual(
+            self.queued(create_stripe_payment_task),
+            [[appointment.id, Payment.Type.NO_SHOW_FEE]],
+        )
+        self.assertEqual(len(self.queued(notify_admin_task)), 1)
+
+    def test_save_without_status_change_has_no_side_effects(self):
+        appointment = Appointment.objects.get(pk=self.appointment.pk)
+        appointment.completed_at = timezone.now()
+
+        appointment.save()
+        appointment.status = Appointment.Status.COMPLETED
+        appointment.save(update_fields=["status"])
+        appointment.save(update_fields=["status"])
+
+        self.assertEqual(
+            self.queued(create_stripe_payment_task),
+            [[appointment.id, Payment.Type.CONSULTATION]],
+        )
+        self.assertEqual(len(self.queued(notify_admin_task)), 1)
@@ -1,4 +1,5 @@
-from django.db.models import Subquery, OuterRef
+from django.contrib.auth import get_user_model
+from django.db.models import OuterRef, Prefetch, Subquery
 
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.types import OpenApiTypes
@@ -7,12 +8,12 @@ from drf_spectacular.utils import (
     extend_schema_view,
     OpenApiParameter,
 )
-from rest_framework import viewsets, filters, serializers
-from rest_framework.pagination import PageNumberPagination
+from rest_framework import viewsets, serializers
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
 
 from appointment.filters import AppointmentFilter
+from controller.filters import TrigramSearchFilter
+from controller.pagination import KeysetPagination
 from appointment.models import Appointment
 from appointment.serializers import (
     AppointmentSerializer,
@@ -22,25 +23,7 @@ from appointment.serializers import (
 from appointment.actions import AppointmentActionsMixin
 from payment.models import Payment
 
-
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = "limit"
-    max_page_size = 50
-
-    def get_paginated_response(self, data):
-        return Response(
-            {
-                "links": {
-                    "next": self.get_next_link(),
-                    "previous": self.get_previous_link(),
-                },
-                "count": self.page.paginator.count,
-                "total_pages": self.page.paginator.num_pages,
-                "current_page": self.page.number,
-                "results": data,
-            }
-        )
+User = get_user_model()
 
 
 @extend_schema_view(
@@ -95,7 +78,8 @@ class StandardResultsSetPagination(PageNumberPagination):
         summary="Booking appointment",
         description="Creating new appointment. Patient field "
         "substituted automatically, admin can book "
-        "for anyone",
+        "for anyone. Returns 409 if the slot was taken "
+        "by a concurrent booking",
     ),
     retrieve=extend_schema(
         summary="Retrieving appointment",
@@ -115,13 +99,14 @@ class AppointmentViewSet(AppointmentActionsMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     queryset = Appointment.objects.all()
     serializer_class = AppointmentSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-booked_at", "-id")
     action_serializers = {
         "retrieve": AppointmentDetailSerializer,
         "list": AppointmentListSerializer,
     }
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, TrigramSearchFilter]
     search_fields = [
         "patient__last_name",
         "doctor_slot__doctor__last_name",
@@ -142,16 +127,28 @@ class AppointmentViewSet(AppointmentActionsMixin, viewsets.ModelViewSet):
         """
         User can only see own appointments.
         Staff can see all appointments.
+        Relations are loaded per action, so serializing a page or
+        a detail costs a fixed number of queries.
         """
-        last_payment_status = Payment.objects.filter(
-            appointment=OuterRef("pk")
-        ).order_by("-created_at").values("status")[:1]
+        query = Appointment.objects.all()
+        if self.action == "list":
+            last_payment_status = Payment.objects.filter(
+                appointment=OuterRef("pk")
+            ).order_by("-created_at").values("status")[:1]
+            query = query.annotate(
+                last_payment_status_annotated=Subquery(last_payment_status)
+            ).select_related("patient", "doctor_slot__doctor")
+        elif self.action == "retrieve":
+            query = query.select_related(
+                "doctor_slot__doctor"
+            ).prefetch_related(
+                "doctor_slot__doctor__specializations",
+                "payments",
+                Prefetch("patient", queryset=User.objects.with_penalty()),
+            )
+        else:
+            query = query.select_related("patient", "doctor_slot")
 
-        query = (
-            Appointment.objects.all()
-            .annotate(last_payment_status_annotated=Subquery(last_payment_status))
-            .select_related("patient", "doctor_slot")
-        )
         user = self.request.user
         if user.is_staff:
             return query
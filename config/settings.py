@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "django_filters",
     "drf_spectacular",
@@ -138,6 +139,28 @@ SPECTACULAR_SETTINGS = {
     "SERVE_PERMISSIONS": [],
 }
 
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                # a cache outage degrades to database reads, not errors
+                "IGNORE_EXCEPTIONS": True,
+            },
+            "KEY_PREFIX": "clinic",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND")
 CELERY_TIMEZONE = "Europe/Kiev"
@@ -146,17 +169,67 @@ CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+# Seconds between outbox relay runs: tasks written by requests and
+# signals reach the broker at most this late
+OUTBOX_RELAY_INTERVAL = float(os.getenv("OUTBOX_RELAY_INTERVAL", 2))
+
+# Seconds between runs of the consumer of stored Stripe webhook events
+STRIPE_EVENT_PROCESS_INTERVAL = float(
+    os.getenv("STRIPE_EVENT_PROCESS_INTERVAL", 2)
+)
+
 CELERY_BEAT_SCHEDULE = {
-    "map-no-shows-every-midnight": {
-        "task": "notifications.tasks.check_no_shows_daily",
-        "schedule": crontab(hour=19, minute=0),
+    "relay-outbox-messages": {
+        "task": "controller.tasks.relay_outbox_messages",
+        "schedule": OUTBOX_RELAY_INTERVAL,
+    },
+    "sweep-no-shows-every-5-min": {
+        "task": "notifications.tasks.sweep_no_shows",
+        "schedule": 5 * 60.0,
+    },
+    "process-stripe-webhook-events": {
+        "task": "payment.tasks.process_stripe_events_task",
+        "schedule": STRIPE_EVENT_PROCESS_INTERVAL,
+    },
+    "sync-stripe-events-every-minute": {
+        "task": "payment.tasks.sync_stripe_events_task",
+        "schedule": 60.0,
     },
-    "sync-stripe-payments-every-30-min": {
+    # backstop for sessions the event stream did not settle
+    "sync-stripe-payments-every-night": {
         "task": "payment.tasks.sync_pending_payments",
-        "schedule": 30 * 60.0,
+        "schedule": crontab(hour=4, minute=0),
+    },
+    "materialize-schedule-horizon-every-night": {
+        "task": "doctor.tasks.materialize_schedule_horizon",
+        "schedule": crontab(hour=2, minute=0),
+    },
+    "archive-expired-slots-every-night": {
+        "task": "doctor.tasks.archive_expired_doctor_slots",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    # before the slot archive, which then takes the freed slots
+    "archive-finished-appointments-every-night": {
+        "task": "appointment.tasks.archive_finished_appointments_task",
+        "schedule": crontab(hour=2, minute=30),
     },
 }
 
+# Days ahead the rolling job keeps DoctorSlot rows materialized
+# from schedule templates
+SCHEDULE_HORIZON_DAYS = int(os.getenv("SCHEDULE_HORIZON_DAYS", 14))
+
+# Slots no live appointment references that ended this many days ago
+# are moved to the slot archive by the nightly job
+SLOT_ARCHIVE_AFTER_DAYS = int(os.getenv("SLOT_ARCHIVE_AFTER_DAYS", 30))
+
+# Finished appointments booked this many days ago, with no pending
+# payment, are moved with their payments to the archive by the
+# nightly job
+APPOINTMENT_ARCHIVE_AFTER_DAYS = int(
+    os.getenv("APPOINTMENT_ARCHIVE_AFTER_DAYS", 180)
+)
+
 AUTH_USER_MODEL = "user.User"
 
 SIMPLE_JWT = {
@@ -171,6 +244,28 @@ STRIPE_SUCCESS_URL = os.getenv("STRIPE_SUCCESS_URL", "http://127.0.0.1/")
 STRIPE_CANCEL_URL = os.getenv("STRIPE_CANCEL_URL", "http://127.0.0.1/")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 
+# Reconciliation of pending payments with Stripe: sessions are fetched
+# by this many threads, at most STRIPE_SYNC_RATE_LIMIT requests
+# per second, and a run stops after STRIPE_SYNC_TIME_BUDGET seconds
+# (the next one resumes from where it stopped)
+STRIPE_SYNC_WORKERS = int(os.getenv("STRIPE_SYNC_WORKERS", 8))
+STRIPE_SYNC_RATE_LIMIT = float(os.getenv("STRIPE_SYNC_RATE_LIMIT", 20))
+STRIPE_SYNC_CHUNK_SIZE = int(os.getenv("STRIPE_SYNC_CHUNK_SIZE", 200))
+STRIPE_SYNC_TIME_BUDGET = float(os.getenv("STRIPE_SYNC_TIME_BUDGET", 25 * 60))
+
+# Stripe HTTP client: timeouts in seconds of every call and retries of
+# failed requests (the client backs off exponentially, with jitter)
+STRIPE_CONNECT_TIMEOUT = float(os.getenv("STRIPE_CONNECT_TIMEOUT", 5))
+STRIPE_READ_TIMEOUT = float(os.getenv("STRIPE_READ_TIMEOUT", 20))
+STRIPE_MAX_RETRIES = int(os.getenv("STRIPE_MAX_RETRIES", 2))
+
+# After STRIPE_BREAKER_THRESHOLD consecutive failed calls Stripe is not
+# called for STRIPE_BREAKER_RESET_TIMEOUT seconds: calls fail at once
+STRIPE_BREAKER_THRESHOLD = int(os.getenv("STRIPE_BREAKER_THRESHOLD", 5))
+STRIPE_BREAKER_RESET_TIMEOUT = float(
+    os.getenv("STRIPE_BREAKER_RESET_TIMEOUT", 30)
+)
+
 LOGGING = {
     "version": 1,
     "handlers": {
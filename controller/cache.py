@@ -0,0 +1,101 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+LOCK_TIMEOUT = 10
+LOCK_POLL_INTERVAL = 0.05
+
+_missing = object()
+
+
+def _version_key(namespace):
+    return f"{namespace}:version"
+
+
+def _fresh_version():
+    # versions are change timestamps in nanoseconds: a lost or evicted
+    # counter never falls back to a version that already has entries,
+    # and the newest version doubles as Last-Modified
+    return time.time_ns()
+
+
+def get_versions(namespaces):
+    keys = [_version_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _fresh_version(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def get_version(namespace):
+    return get_versions([namespace])[0]
+
+
+def _touch(namespace):
+    cache.set(_version_key(namespace), _fresh_version(), timeout=None)
+
+
+def bump_version(namespace):
+    """
+    Invalidate every key of the namespace. Inside a transaction the
+    version is bumped again on commit, so a reader that cached
+    pre-commit data in between does not keep it.
+    """
+    _touch(namespace)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _touch(namespace))
+
+
+def model_namespace(model):
+    return f"model:{model._meta.label_lower}"
+
+
+def make_key(namespace, *parts, depends_on=()):
+    """
+    `namespace:versions:digest of parts`; a bump of the namespace or
+    of any namespace in `depends_on` moves readers to a new key
+    """
+    versions = ".".join(
+        str(version)
+        for version in get_versions([namespace, *depends_on])
+    )
+    digest = hashlib.md5(
+        "|".join(str(part) for part in parts).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return f"{namespace}:{versions}:{digest}"
+
+
+def get_or_compute(key, compute, timeout):
+    """
+    cache.get_or_set with stampede protection: on a miss only the
+    caller that takes the lock computes the value, concurrent callers
+    wait for it (up to LOCK_TIMEOUT) instead of hitting the database.
+    """
+    value = cache.get(key, _missing)
+    if value is not _missing:
+        return value
+
+    lock_key = f"{key}:lock"
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    # add() returns None instead of False when django-redis ignores
+    # a connection error; then there is no one to wait for
+    while cache.add(lock_key, 1, LOCK_TIMEOUT) is False:
+        if time.monotonic() >= deadline:
+            # the lock holder is stuck, do not wait any longer
+            return compute()
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key, _missing)
+        if value is not _missing:
+            return value
+
+    try:
+        value = compute()
+        cache.set(key, value, timeout)
+    finally:
+        cache.delete(lock_key)
+    return value
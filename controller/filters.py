@@ -0,0 +1,64 @@
+import operator
+from functools import reduce
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Cast, Greatest, Upper
+from rest_framework.filters import SearchFilter
+
+
+class TrigramSearchFilter(SearchFilter):
+    """
+    Drop-in replacement for SearchFilter backed by pg_trgm. Every term
+    has to match one of the `search_fields` either as a substring or as
+    a similar word (so typos still find the row); both are answered by a
+    GIN gin_trgm_ops index on UPPER(field). Results are ordered by word
+    similarity, best first, then by the queryset ordering.
+    The SearchFilter field prefixes (^, =, @, $) are not supported.
+    """
+
+    def get_matching_pks(self, model, field, term):
+        """
+        pks of the rows whose `field` matches. Each field is searched
+        in its own query, so a field behind a join is looked up in its
+        index first instead of scanning the whole joined table.
+        """
+        return model._default_manager.alias(
+            search_column=Upper(field)
+        ).filter(
+            Q(search_column__contains=term)
+            | Q(search_column__trigram_word_similar=term)
+        ).order_by().values("pk")
+
+    def get_rank(self, fields, terms):
+        ranks = []
+        for term in terms:
+            similarities = [
+                TrigramWordSimilarity(Value(term), Upper(field))
+                for field in fields
+            ]
+            ranks.append(
+                Greatest(*similarities)
+                if len(similarities) > 1 else similarities[0]
+            )
+        # similarity is a `real`: as float8 the rank survives the trip
+        # through a JSON keyset cursor and compares equal to itself
+        return Cast(reduce(operator.add, ranks), FloatField())
+
+    def filter_queryset(self, request, queryset, view):
+        fields = self.get_search_fields(view, request)
+        terms = [term.upper() for term in self.get_search_terms(request)]
+        if not fields or not terms:
+            return queryset
+
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        for term in terms:
+            first, *rest = [
+                self.get_matching_pks(queryset.model, field, term)
+                for field in fields
+            ]
+            queryset = queryset.filter(pk__in=first.union(*rest))
+
+        return queryset.annotate(
+            search_rank=self.get_rank(fields, terms)
+        ).order_by("-search_rank", *ordering, "pk")
@@ -0,0 +1,13 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # pg_trgm is shared by the search indexes of several apps,
+    # so it is installed once here and they depend on this migration.
+
+    dependencies = []
+
+    operations = [
+        TrigramExtension(),
+    ]
@@ -0,0 +1,110 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from controller.cache import (
+    get_or_compute,
+    get_versions,
+    make_key,
+    model_namespace,
+)
+
+
+class _PreconditionResponse(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class CachedListMixin:
+    """
+    Caches the serialized list response per query string (filters,
+    search, page) under a versioned key. `cache_models` lists the models
+    the payload is built from; saving or deleting any of them bumps the
+    version through the model signals.
+    The payload must not depend on the requesting user.
+    """
+
+    cache_models = ()
+    cache_timeout = 5 * 60
+
+    def get_list_cache_key(self, request):
+        namespace, *depends_on = [
+            model_namespace(model) for model in self.cache_models
+        ]
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        return make_key(namespace, "list", query, depends_on=depends_on)
+
+    def cached_list_response(self, request, build_data):
+        data = get_or_compute(
+            self.get_list_cache_key(request), build_data, self.cache_timeout
+        )
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_list_response(
+            request, lambda: super(CachedListMixin, self).list(
+                request, *args, **kwargs
+            ).data
+        )
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified for read actions, derived from the version
+    counters of the namespaces the payload depends on (by default the
+    `cache_models`). The check runs after authentication and permissions
+    but before the handler, so an unchanged resource answers 304 without
+    touching the queryset or the serializer.
+    """
+
+    conditional_actions = ("list", "retrieve")
+
+    def get_conditional_namespaces(self):
+        return [model_namespace(model) for model in self.cache_models]
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_validators = None
+        if (
+            request.method not in ("GET", "HEAD")
+            or self.action not in self.conditional_actions
+        ):
+            return
+
+        versions = get_versions(self.get_conditional_namespaces())
+        if None in versions:
+            # cache unavailable, serve the request unconditionally
+            return
+
+        etag = quote_etag(hashlib.md5(
+            f"{request.get_full_path()}|{versions}".encode(),
+            usedforsecurity=False,
+        ).hexdigest())
+        last_modified = max(versions) // 10 ** 9
+        self.conditional_validators = (etag, last_modified)
+
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            raise _PreconditionResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _PreconditionResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if getattr(self, "conditional_validators", None) and (
+            response.status_code in (200, 304)
+        ):
+            etag, last_modified = self.conditional_validators
+            response.headers["ETag"] = etag
+            response.headers["Last-Modified"] = http_date(last_modified)
+        return response
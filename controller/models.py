@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class OutboxMessage(models.Model):
+    """
+    Celery task call written in the same transaction as the change that
+    caused it and published later by the outbox relay, so a request
+    never waits for (or loses a task to) the broker
+    """
+
+    task = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("id",)
+
+    def __str__(self) -> str:
+        return f"Outbox #{self.id} | {self.task}"
@@ -0,0 +1,55 @@
+from celery import current_app
+from django.db import transaction
+
+from controller.models import OutboxMessage
+
+OUTBOX_BATCH_SIZE = 500
+
+
+def enqueue_task(task, *args, **kwargs):
+    """
+    Record `task.delay(*args, **kwargs)` in the outbox. It becomes
+    visible to the relay only if the surrounding transaction commits;
+    arguments must be JSON serializable, as for the broker.
+    """
+    return OutboxMessage.objects.create(
+        task=task.name, args=list(args), kwargs=kwargs
+    )
+
+
+def relay_batch(limit=OUTBOX_BATCH_SIZE):
+    """
+    Publish up to `limit` oldest messages over one broker connection and
+    delete them. Messages locked by a concurrent relay are skipped. If
+    publishing fails the batch stays in the outbox, so a task may be
+    sent twice but is never lost; the tasks have to be idempotent.
+    """
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .order_by("id")[:limit]
+        )
+        if not messages:
+            return 0
+        with current_app.producer_or_acquire() as producer:
+            for message in messages:
+                current_app.send_task(
+                    message.task,
+                    args=message.args,
+                    kwargs=message.kwargs,
+                    producer=producer,
+                )
+        OutboxMessage.objects.filter(
+            id__in=[message.id for message in messages]
+        ).delete()
+    return len(messages)
+
+
+def relay_outbox(batch_size=OUTBOX_BATCH_SIZE):
+    """Drain the outbox batch by batch; returns the number published"""
+    published = 0
+    while True:
+        relayed = relay_batch(batch_size)
+        published += relayed
+        if relayed < batch_size:
+            return published
@@ -0,0 +1,259 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import connections
+from django.db.models import Field, Func, Q, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    # full precision: DjangoJSONEncoder drops microseconds
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def invert_ordering(ordering):
+    return [
+        field[1:] if field.startswith("-") else f"-{field}"
+        for field in ordering
+    ]
+
+
+class Row(Func):
+    function = "ROW"
+    output_field = Field()
+
+
+def _key_field(model, name):
+    if name == "pk":
+        return model._meta.pk
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        # an annotation such as the search rank
+        return None
+
+
+def seek_condition(model, ordering, key):
+    """
+    Rows strictly after `key` in `ordering`. With a single direction it
+    is a row comparison `(f1, f2) > (v1, v2)` that an index on the key
+    answers as one range scan; mixed directions fall back to the
+    lexicographic expansion `f1 > v1 OR (f1 = v1 AND f2 > v2) ...`
+    behind a redundant `f1 >= v1` bound (< for descending fields).
+    """
+    names = [field.lstrip("-") for field in ordering]
+    descending = [field.startswith("-") for field in ordering]
+
+    if len(set(descending)) == 1:
+        values = [
+            Value(value, output_field=_key_field(model, name))
+            for name, value in zip(names, key)
+        ]
+        lookup = LessThan if descending[0] else GreaterThan
+        return lookup(Row(*names), Row(*values))
+
+    condition = Q()
+    equal = {}
+    for name, is_descending, value in zip(names, descending, key):
+        lookup = "lt" if is_descending else "gt"
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+
+    bound = "lte" if descending[0] else "gte"
+    return Q(**{f"{names[0]}__{bound}": key[0]}) & condition
+
+
+def estimate_count(queryset):
+    """Row estimate of the planner for the queryset, no table scan"""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination. The cursor carries the ordering values of
+    the boundary row and a page is read with `WHERE key after cursor
+    ORDER BY key LIMIT n`, so a deep page costs the same as the first
+    one and rows inserted meanwhile never shift the pages.
+
+    The ordering is `keyset_ordering` of the view (it must end with a
+    unique field and its fields must not be null) unless a filter
+    backend ordered the queryset explicitly, as the search ranking does.
+    No COUNT(*) is run; `?count=estimate` adds the planner's row
+    estimate as `count`.
+    """
+
+    page_size = 10
+    page_size_query_param = "limit"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    ordering = ("-pk",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        ordering = list(
+            queryset.query.order_by
+            or getattr(view, "keyset_ordering", self.ordering)
+        )
+        if ordering[-1].lstrip("-") not in ("pk", "id"):
+            ordering.append("pk")
+        for name in ordering:
+            field = _key_field(queryset.model, name.lstrip("-"))
+            # a NULL key compares as unknown: the walk would stop there
+            if field is not None and field.null:
+                raise ImproperlyConfigured(
+                    f"Keyset field {queryset.model.__name__}.{field.name} "
+                    "must not be nullable"
+                )
+        return ordering
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            key, reverse = cursor["k"], bool(cursor.get("r"))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(key, list) or len(key) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return key, reverse
+
+    def encode_cursor(self, row, reverse=False):
+        cursor = {
+            "k": [
+                _encode_value(getattr(row, field.lstrip("-")))
+                for field in self.ordering
+            ]
+        }
+        if reverse:
+            cursor["r"] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor).encode())
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.decode()
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        self.count = None
+        if request.query_params.get(self.count_query_param) == "estimate":
+            self.count = estimate_count(queryset)
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor[1]
+        ordering = invert_ordering(self.ordering) if reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(
+                seek_condition(queryset.model, ordering, cursor[0])
+            )
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        payload = {
+            "links": {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+            },
+        }
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        link = {"type": "string", "nullable": True, "format": "uri"}
+        return {
+            "type": "object",
+            "required": ["links", "results"],
+            "properties": {
+                "links": {
+                    "type": "object",
+                    "properties": {"next": link, "previous": link},
+                },
+                "count": {
+                    "type": "integer",
+                    "description": "Planner estimate, only with "
+                                   "count=estimate",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor from links.next / links.previous",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Page size, at most {self.max_page_size}",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "'estimate' adds the planner's row "
+                               "estimate as count",
+                "schema": {"type": "string", "enum": ["estimate"]},
+            },
+        ]
@@ -0,0 +1,15 @@
+import logging
+
+from celery import shared_task
+
+from controller.outbox import relay_outbox
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def relay_outbox_messages():
+    published = relay_outbox()
+    if published:
+        logger.info(f"Outbox relay: {published} task(s) published")
+    return published
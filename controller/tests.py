@@ -0,0 +1,47 @@
+from unittest.mock import call, patch
+
+from django.test import TestCase
+
+from controller.models import OutboxMessage
+from controller.outbox import enqueue_task, relay_outbox
+from notifications.tasks import notify_admin_task
+from payment.tasks import create_stripe_payment_task
+
+
+@patch("controller.outbox.current_app")
+class OutboxRelayTests(TestCase):
+    def setUp(self):
+        enqueue_task(create_stripe_payment_task, 1, "CONSULTATION")
+        enqueue_task(notify_admin_task, "first")
+        enqueue_task(notify_admin_task, message="second")
+
+    def test_relay_publishes_in_order_and_empties_outbox(self, mock_app):
+        producer = mock_app.producer_or_acquire.return_value.__enter__()
+
+        self.assertEqual(relay_outbox(batch_size=2), 3)
+
+        self.assertEqual(mock_app.send_task.call_args_list, [
+            call(
+                create_stripe_payment_task.name,
+                args=[1, "CONSULTATION"], kwargs={}, producer=producer,
+            ),
+            call(
+                notify_admin_task.name,
+                args=["first"], kwargs={}, producer=producer,
+            ),
+            call(
+                notify_admin_task.name,
+                args=[], kwargs={"message": "second"}, producer=producer,
+            ),
+        ])
+        # one broker connection per batch
+        self.assertEqual(mock_app.producer_or_acquire.call_count, 2)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_failed_batch_stays_in_outbox(self, mock_app):
+        mock_app.send_task.side_effect = [None, ConnectionError("down")]
+
+        with self.assertRaises(ConnectionError):
+            relay_outbox()
+
+        self.assertEqual(OutboxMessage.objects.count(), 3)
@@ -0,0 +1,46 @@
+_missing = object()
+
+
+class FieldTrackerMixin:
+    """
+    Model mixin that remembers the values of `tracked_fields` as they
+    were loaded from the database (from_db) or last saved, so signal
+    handlers can tell what a save changed without reading the old row.
+
+    The model's save() calls `reset_tracking(update_fields)` once the
+    row and its side effects are written; until then (post_save
+    included) `previous()` returns the stored value. A field that was
+    never loaded (a new instance, a deferred field) counts as changed.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._tracked_values = {
+            field: getattr(instance, field)
+            for field in cls.tracked_fields
+            if field in field_names
+        }
+        return instance
+
+    def previous(self, field):
+        """Stored value of `field`, None if it is not known"""
+        return getattr(self, "_tracked_values", {}).get(field)
+
+    def has_changed(self, field):
+        stored = getattr(self, "_tracked_values", {}).get(field, _missing)
+        return stored is _missing or stored != getattr(self, field)
+
+    def reset_tracking(self, fields=None):
+        """The current values of `fields` (all tracked by default) are saved"""
+        if fields is None:
+            fields = self.tracked_fields
+        tracked = getattr(self, "_tracked_values", {})
+        tracked.update({
+            field: getattr(self, field)
+            for field in fields
+            if field in self.tracked_fields
+        })
+        self._tracked_values = tracked
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Doctor, DoctorSlot
+from .models import Doctor, DoctorSlot, ScheduleException, ScheduleTemplate
 
 
 @admin.register(Doctor)
@@ -12,6 +12,20 @@ class DoctorAdmin(admin.ModelAdmin):
 
 @admin.register(DoctorSlot)
 class DoctorSlotAdmin(admin.ModelAdmin):
-    list_display = ("doctor", "start", "end", "created_at")
-    list_filter = ("doctor",)
+    list_display = ("doctor", "start", "end", "is_booked", "created_at")
+    list_filter = ("doctor", "is_booked")
     search_fields = ("doctor__first_name", "doctor__last_name")
+
+
+@admin.register(ScheduleTemplate)
+class ScheduleTemplateAdmin(admin.ModelAdmin):
+    list_display = (
+        "doctor", "weekday", "start_time", "end_time", "slot_duration"
+    )
+    list_filter = ("doctor", "weekday")
+
+
+@admin.register(ScheduleException)
+class ScheduleExceptionAdmin(admin.ModelAdmin):
+    list_display = ("doctor", "date", "start_time", "end_time", "reason")
+    list_filter = ("doctor",)
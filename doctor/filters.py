@@ -1,8 +1,26 @@
 import django_filters
-from django.db.models import Exists, OuterRef, Q
+from django.db.models import Exists, OuterRef
+
+from specializations.services.codes import resolve_specialization_ids
 
 from .models import Doctor, DoctorSlot
-from appointment.models import Appointment
+
+
+def parse_specializations(value):
+    """Split 'cardio,3,derm' into specialization ids and codes"""
+    ids = []
+    codes = []
+
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if item.isdigit():
+            ids.append(int(item))
+        else:
+            codes.append(item)
+
+    return ids, codes
 
 
 class DoctorFilter(django_filters.FilterSet):
@@ -12,23 +30,26 @@ class DoctorFilter(django_filters.FilterSet):
     )
 
     def filter_specializations(self, queryset, name, value):
+        """
+        A correlated EXISTS on the link table instead of a join, so a
+        doctor with several matching specializations is returned once
+        without DISTINCT; the probe uses the (doctor, specialization)
+        unique index.
+        """
         if not value:
             return queryset
 
-        items = [v.strip() for v in value.split(",") if v.strip()]
-        ids = []
-        codes = []
-
-        for item in items:
-            if item.isdigit():
-                ids.append(int(item))
-            else:
-                codes.append(item)
+        specialization_ids = resolve_specialization_ids(
+            *parse_specializations(value)
+        )
+        if not specialization_ids:
+            return queryset.none()
 
-        return queryset.filter(
-            Q(specializations__id__in=ids) | # noqa W504
-            Q(specializations__code__in=codes)
-        ).distinct()
+        Link = Doctor.specializations.through
+        return queryset.filter(Exists(Link.objects.filter(
+            doctor_id=OuterRef("pk"),
+            specialization_id__in=specialization_ids,
+        )))
 
     class Meta:
         model = Doctor
@@ -37,25 +58,33 @@ class DoctorFilter(django_filters.FilterSet):
 
 class DoctorSlotFilter(django_filters.FilterSet):
     from_date = django_filters.DateTimeFilter(
-        field_name="start", lookup_expr="gte", label="From Date"
+        method="filter_from_date", label="From Date"
     )
     to_date = django_filters.DateTimeFilter(
-        field_name="end", lookup_expr="lte", label="To Date"
+        method="filter_to_date", label="To Date"
     )
     available_only = django_filters.BooleanFilter(
         method="filter_available_only", label="Available Only"
     )
 
+    def filter_from_date(self, queryset, name, value):
+        # both bounds are applied together in filter_queryset
+        return queryset
+
+    filter_to_date = filter_from_date
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        from_date = self.form.cleaned_data.get("from_date")
+        to_date = self.form.cleaned_data.get("to_date")
+        if from_date or to_date:
+            # one range condition the per-doctor GiST index can answer
+            queryset = queryset.within(start=from_date, end=to_date)
+        return queryset
+
     def filter_available_only(self, queryset, name, value):
         if value:
-            return queryset.filter(
-                ~Exists(
-                    Appointment.objects.filter(
-                        doctor_slot=OuterRef("pk"),
-                        status=Appointment.Status.BOOKED
-                    )
-                )
-            )
+            return queryset.filter(is_booked=False)
         return queryset
 
     class Meta:
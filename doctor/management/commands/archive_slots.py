@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from doctor.services.archive import ARCHIVE_BATCH_SIZE, archive_expired_slots
+
+
+class Command(BaseCommand):
+    """
+    Move slots that ended long ago and no live appointment references
+    out of the live slot table, the same job the nightly beat task
+    runs. Safe to rerun.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.SLOT_ARCHIVE_AFTER_DAYS,
+            help="Archive slots that ended more than this many days ago",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=ARCHIVE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_expired_slots(
+            days=options["days"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} slot(s) that ended more than "
+            f"{options['days']} day(s) ago"
+        ))
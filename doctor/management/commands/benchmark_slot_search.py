@@ -0,0 +1,153 @@
+import heapq
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from doctor.filters import DoctorFilter
+from doctor.models import Doctor, DoctorSlot
+from doctor.services.search import first_available_slot_ids
+from specializations.models import Specialization
+
+
+class Command(BaseCommand):
+    """
+    Compares "first available slot by specialization" done the old way
+    (list doctors, then one slot query per doctor) with the single
+    LATERAL query. Fixture data lives in a transaction that is rolled
+    back.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--doctors", type=int, default=500)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--slots-per-day", type=int, default=16)
+        parser.add_argument(
+            "--specializations",
+            type=int,
+            default=5,
+            help="Doctors are spread evenly over this many specializations",
+        )
+        parser.add_argument("--booked-ratio", type=float, default=0.3)
+        parser.add_argument("--window-days", type=int, default=7)
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            code = self.prepare(options)
+            start = timezone.now() + timedelta(days=options["days"] // 2)
+            end = start + timedelta(days=options["window_days"])
+
+            for name, search in (("per-doctor", self.search_per_doctor),
+                                 ("lateral", self.search_lateral)):
+                timings, queries, ids = self.measure(
+                    search, code, start, end, options
+                )
+                self.report(name, timings, queries, ids)
+
+            transaction.set_rollback(True)
+
+    def prepare(self, options):
+        tag = uuid.uuid4().hex[:8]
+        started = time.perf_counter()
+
+        specializations = Specialization.objects.bulk_create(
+            Specialization(name=f"Bench {tag} {i}", code=f"bench-{tag}-{i}")
+            for i in range(options["specializations"])
+        )
+        doctors = Doctor.objects.bulk_create(
+            Doctor(first_name="Bench", last_name=f"{tag} {i}",
+                   price_per_visit=100)
+            for i in range(options["doctors"])
+        )
+        Link = Doctor.specializations.through
+        Link.objects.bulk_create(
+            Link(
+                doctor_id=doctor.id,
+                specialization_id=specializations[i % len(specializations)].id,
+            )
+            for i, doctor in enumerate(doctors)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {DoctorSlot._meta.db_table}
+                    (doctor_id, start, "end", created_at, is_booked)
+                SELECT doctor.id,
+                       day + interval '8 hours' + n * interval '30 minutes',
+                       day + interval '8 hours' + (n + 1) * interval '30 minutes',
+                       now(),
+                       random() < %(booked_ratio)s
+                FROM unnest(%(doctor_ids)s::bigint[]) AS doctor(id)
+                CROSS JOIN generate_series(
+                    date_trunc('day', now()),
+                    date_trunc('day', now()) + %(days)s * interval '1 day',
+                    interval '1 day'
+                ) AS day
+                CROSS JOIN generate_series(0, %(per_day)s - 1) AS n
+                """,
+                {
+                    "doctor_ids": [doctor.id for doctor in doctors],
+                    "days": options["days"] - 1,
+                    "per_day": options["slots_per_day"],
+                    "booked_ratio": options["booked_ratio"],
+                },
+            )
+            total = cursor.rowcount
+            cursor.execute(f"ANALYZE {DoctorSlot._meta.db_table}")
+
+        self.stdout.write(
+            f"Prepared {len(doctors)} doctors, {total} slots "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return specializations[0].code
+
+    def search_per_doctor(self, code, start, end, limit):
+        """What a client does today: doctor list + slot list per doctor"""
+        doctors = DoctorFilter(
+            {"specializations": code}, queryset=Doctor.objects.all()
+        ).qs
+        runs = [
+            DoctorSlot.objects.filter(
+                doctor_id=doctor.id,
+                is_booked=False,
+                start__gte=start,
+                start__lt=end,
+            ).values_list("start", "id")
+            for doctor in doctors
+        ]
+        merged = heapq.merge(*[list(run) for run in runs])
+        return [slot_id for _, slot_id in list(merged)[:limit]]
+
+    def search_lateral(self, code, start, end, limit):
+        return first_available_slot_ids(
+            ids=[], codes=[code], start=start, end=end, limit=limit
+        )
+
+    def measure(self, search, code, start, end, options):
+        timings = []
+        queries = 0
+        ids = []
+        for _ in range(options["repeat"]):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                ids = search(code, start, end, options["limit"])
+                timings.append((time.perf_counter() - started) * 1000)
+            queries = len(captured)
+        return timings, queries, ids
+
+    def report(self, name, timings, queries, ids):
+        self.stdout.write(self.style.SUCCESS(f"[{name}]"))
+        self.stdout.write(
+            f"  ms: median={statistics.median(timings):.2f} "
+            f"min={min(timings):.2f} max={max(timings):.2f}"
+        )
+        self.stdout.write(f"  queries per search: {queries}")
+        self.stdout.write(f"  first ids: {ids[:5]}")
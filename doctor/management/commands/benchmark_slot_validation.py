@@ -0,0 +1,122 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from doctor.models import Doctor, DoctorSlot
+from doctor.serializers import DoctorSlotSerializer
+
+
+def legacy_validate(items, doctor):
+    """Pairwise comparison plus one EXISTS per item, as before the sweep"""
+    for i, (start1, end1) in enumerate(items):
+        for j, (start2, end2) in enumerate(items):  # noqa VNE001
+            if i != j and start1 < end2 and start2 < end1:
+                return False
+
+    for start, end in items:
+        if DoctorSlot.objects.filter(
+            doctor=doctor, start__lt=end, end__gt=start
+        ).exists():
+            return False
+
+    return True
+
+
+class Command(BaseCommand):
+    """
+    Validates a batch of new slots for one doctor with the old
+    O(n^2) + query-per-item validation and with the batch validation.
+    Fixture data is created in a transaction that is rolled back.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=10000)
+        parser.add_argument(
+            "--existing",
+            type=int,
+            default=10000,
+            help="Slots the doctor already has before the batch",
+        )
+        parser.add_argument(
+            "--skip-legacy",
+            action="store_true",
+            help="Only run the batch validation",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            doctor, batch = self.prepare(options["batch"], options["existing"])
+
+            if not options["skip_legacy"]:
+                items = [(item["start"], item["end"]) for item in batch]
+                self.measure(
+                    "legacy", lambda: legacy_validate(items, doctor)
+                )
+
+            def validate_batch():
+                serializer = DoctorSlotSerializer(
+                    data=batch,
+                    many=True,
+                    context={"nested_create": True, "doctor_id": doctor.pk},
+                )
+                return serializer.is_valid()
+
+            self.measure("batch", validate_batch)
+            transaction.set_rollback(True)
+
+    def prepare(self, batch_size, existing):
+        doctor = Doctor.objects.create(
+            first_name="Benchmark",
+            last_name=f"Validation {uuid.uuid4().hex[:8]}",
+            price_per_visit=100,
+        )
+        base = timezone.now() + timedelta(days=3650)
+        DoctorSlot.objects.bulk_create(
+            (
+                DoctorSlot(
+                    doctor=doctor,
+                    start=base + timedelta(minutes=15 * i),
+                    end=base + timedelta(minutes=15 * (i + 1)),
+                )
+                for i in range(existing)
+            ),
+            batch_size=2000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {DoctorSlot._meta.db_table}")
+
+        after = base + timedelta(minutes=15 * existing)
+        batch = [
+            {
+                "start": after + timedelta(minutes=15 * i),
+                "end": after + timedelta(minutes=15 * (i + 1)),
+            }
+            for i in range(batch_size)
+        ]
+        self.stdout.write(
+            f"Prepared {existing} existing slots, batch of {batch_size}"
+        )
+        return doctor, batch
+
+    def measure(self, name, validate):
+        # The debug query log is capped, so count through a wrapper instead
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            started = time.perf_counter()
+            valid = validate()
+            elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(f"[{name}]"))
+        self.stdout.write(
+            f"  valid: {valid} | {elapsed:.2f}s | queries: {queries}"
+        )
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from doctor.models import Doctor, SlotGenerationJob
+from doctor.services.generation import (
+    GENERATION_BATCH_SIZE,
+    run_generation_job,
+)
+
+
+class Command(BaseCommand):
+    """
+    Generate slots of one duration over a long interval for many
+    doctors in constant memory, printing progress after every batch.
+    The run is recorded as a SlotGenerationJob.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--doctor",
+            type=int,
+            action="append",
+            dest="doctors",
+            help="Doctor id (repeatable)",
+        )
+        parser.add_argument(
+            "--all-doctors",
+            action="store_true",
+            help="Generate for every doctor",
+        )
+        parser.add_argument("--from", dest="interval_start", required=True)
+        parser.add_argument("--to", dest="interval_end", required=True)
+        parser.add_argument(
+            "--duration", type=int, required=True, help="Minutes"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=GENERATION_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        interval_start = parse_datetime(options["interval_start"])
+        interval_end = parse_datetime(options["interval_end"])
+        if not interval_start or not interval_end:
+            raise CommandError("--from and --to must be ISO datetimes")
+        if interval_start >= interval_end or options["duration"] <= 0:
+            raise CommandError("Expected --from < --to and --duration > 0")
+
+        doctors = Doctor.objects.all()
+        if not options["all_doctors"]:
+            if not options["doctors"]:
+                raise CommandError("Pass --doctor or --all-doctors")
+            doctors = doctors.filter(id__in=options["doctors"])
+
+        job = SlotGenerationJob.objects.create(
+            interval_start=interval_start,
+            interval_end=interval_end,
+            duration=options["duration"],
+        )
+        job.doctors.set(doctors)
+
+        def progress(processed, inserted):
+            self.stdout.write(
+                f"  {processed} generated, {inserted} inserted", ending="\r"
+            )
+            self.stdout.flush()
+
+        job = run_generation_job(
+            job.id, batch_size=options["batch_size"], on_progress=progress
+        )
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(
+            f"Job #{job.id}: {job.inserted} of {job.total} slot(s) inserted"
+        ))
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from doctor.services.schedule import materialize_horizon
+
+
+class Command(BaseCommand):
+    """
+    Store the scheduled slots of the next days as DoctorSlot rows,
+    the same job the nightly beat task runs. Safe to rerun.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.SCHEDULE_HORIZON_DAYS
+        )
+        parser.add_argument(
+            "--doctor",
+            type=int,
+            action="append",
+            dest="doctors",
+            help="Only this doctor id (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        submitted = materialize_horizon(
+            days=options["days"], doctor_ids=options["doctors"]
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Submitted {submitted} slot(s) for the next "
+            f"{options['days']} day(s)"
+        ))
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.10 on 2026-10-17 00:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointment", "0004_appointment_unique_active_slot_booking"),
+        ("doctor", "0004_doctorslot_start_before_end_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="doctorslot",
+            name="active_appointment",
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="appointment.appointment",
+            ),
+        ),
+        migrations.AddField(
+            model_name="doctorslot",
+            name="is_booked",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE doctor_doctorslot AS slot
+                SET is_booked = TRUE, active_appointment_id = appt.id
+                FROM appointment_appointment AS appt
+                WHERE appt.doctor_slot_id = slot.id
+                  AND appt.status <> 'CANCELLED'
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="doctorslot",
+            index=models.Index(
+                condition=models.Q(("is_booked", False)),
+                fields=["doctor", "start"],
+                name="doctorslot_free_by_start",
+            ),
+        ),
+    ]
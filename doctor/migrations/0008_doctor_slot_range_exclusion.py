@@ -0,0 +1,40 @@
+# Generated by Django 5.2.10 on 2026-10-17 00:54
+
+import django.contrib.postgres.constraints
+import doctor.models
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Every step commits on its own, so the table lock taken while the
+    # new GiST index is built is not held for the rest of the migration.
+    # PostgreSQL cannot build an exclusion constraint concurrently, so
+    # slot writes (and reads) wait for the build; see "Deploying
+    # migrations" in README.md.
+    # The per-doctor constraint is weaker than the global one, so existing
+    # rows always satisfy it and the old constraint is dropped last.
+    atomic = False
+
+    dependencies = [
+        ("appointment", "0004_appointment_unique_active_slot_booking"),
+        ("doctor", "0007_slot_generation_job"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddConstraint(
+            model_name="doctorslot",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[
+                    ("doctor", "="),
+                    (doctor.models.TsTzRange("start", "end"), "&&"),
+                ],
+                name="no_overlapping_doctor_slots",
+            ),
+        ),
+        migrations.RemoveConstraint(
+            model_name="doctorslot",
+            name="no_overlapping_slots",
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:07
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ("controller", "0001_trigram_extension"),
+        ("doctor", "0008_doctor_slot_range_exclusion"),
+        ("specializations", "0002_trigram_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="doctor",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("last_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="doctor_last_name_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="doctor",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("first_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="doctor_first_name_trgm",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:18
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointment", "0004_appointment_unique_active_slot_booking"),
+        ("doctor", "0009_doctor_name_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedDoctorSlot",
+            fields=[
+                ("slot_id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("doctor_id", models.BigIntegerField()),
+                ("start", models.DateTimeField()),
+                ("end", models.DateTimeField()),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["start"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="archiveddoctorslot",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["start"], name="archivedslot_start_brin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archiveddoctorslot",
+            index=models.Index(
+                fields=["doctor_id", "start"], name="archivedslot_doctor_start"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-17 02:45
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The index is built without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ("doctor", "0010_slot_archive"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="doctorslot",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["start"], name="doctorslot_start_brin"
+            ),
+        ),
+    ]
@@ -1,9 +1,27 @@
 from django.db import models
-from django.db.models import Q, F, Func, CheckConstraint
+from django.db.models import Q, F, Func, CheckConstraint, Value
+from django.db.models.functions import Cast, Upper
 from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
+from django.contrib.postgres.fields import (
+    DateTimeRangeField,
+    RangeBoundary,
+    RangeOperators,
+)
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
 from specializations.models import Specialization
 
 
+class TsTzRange(Func):
+    """tstzrange(start, end, '[)') - the slot span as a range"""
+
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+    def __init__(self, start, end, **extra):
+        super().__init__(start, end, RangeBoundary(), **extra)
+
+
 class Doctor(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
@@ -13,10 +31,56 @@ class Doctor(models.Model):
     )
     price_per_visit = models.DecimalField(max_digits=8, decimal_places=2)
 
+    class Meta:
+        indexes = [
+            GinIndex(
+                OpClass(Upper("last_name"), name="gin_trgm_ops"),
+                name="doctor_last_name_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("first_name"), name="gin_trgm_ops"),
+                name="doctor_first_name_trgm",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
 
+class DoctorSlotQuerySet(models.QuerySet):
+    """
+    Range lookups on the same tstzrange expression as the per-doctor
+    exclusion constraint, so `doctor = X AND span op W` is answered by
+    a probe of its GiST index.
+    """
+
+    def for_doctor(self, doctor):
+        """
+        btree_gist only has bigint = bigint, so the id is passed as a
+        bigint; a plain integer parameter keeps the GiST index from
+        being used for the doctor column.
+        """
+        doctor_id = getattr(doctor, "pk", doctor)
+        return self.filter(
+            doctor_id=Cast(Value(int(doctor_id)), models.BigIntegerField())
+        )
+
+    def with_span(self):
+        return self.alias(span=TsTzRange("start", "end"))
+
+    def overlapping(self, start, end):
+        """Slots sharing any moment with [start, end)"""
+        return self.with_span().filter(
+            span__overlap=DateTimeTZRange(start, end, "[)")
+        )
+
+    def within(self, start=None, end=None):
+        """Slots lying entirely inside [start, end); None is unbounded"""
+        return self.with_span().filter(
+            span__contained_by=DateTimeTZRange(start, end, "[)")
+        )
+
+
 class DoctorSlot(models.Model):
     doctor = models.ForeignKey(
         Doctor,
@@ -26,21 +90,47 @@ class DoctorSlot(models.Model):
     start = models.DateTimeField()
     end = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
+    """
+    Booking state is kept on the slot itself by Appointment.save(),
+    the appointment post_delete signal and the booking engine,
+    so availability never needs a join against appointments
+    """
+    is_booked = models.BooleanField(default=False)
+    active_appointment = models.OneToOneField(
+        "appointment.Appointment",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
+    objects = DoctorSlotQuerySet.as_manager()
 
     class Meta:
         ordering = ["start"]
         unique_together = ("doctor", "start", "end")
+        indexes = [
+            models.Index(
+                fields=["doctor", "start"],
+                condition=Q(is_booked=False),
+                name="doctorslot_free_by_start",
+            ),
+            # slots are mostly inserted in start order, so a few block
+            # ranges answer time-window scans across doctors (archival)
+            BrinIndex(fields=["start"], name="doctorslot_start_brin"),
+        ]
         constraints = [
             CheckConstraint(
                 condition=Q(start__lt=F("end")),
                 name="start_before_end",
             ),
             ExclusionConstraint(
-                name="no_overlapping_slots",
+                name="no_overlapping_doctor_slots",
                 expressions=[
-                    (Func(F("start"), F("end"), function="tstzrange"), "&&"),
+                    ("doctor", RangeOperators.EQUAL),
+                    (TsTzRange("start", "end"), RangeOperators.OVERLAPS),
                 ],
-            )
+            ),
         ]
 
     def __str__(self):
@@ -49,6 +139,166 @@ class DoctorSlot(models.Model):
             f"Doctor - {self.doctor} | {self.start} - {self.end}"
         )
 
-    @property
-    def is_booked(self):
-        return self.appointment.exists()
+
+class ScheduleTemplate(models.Model):
+    """
+    Weekly working hours of a doctor. Slots are cut from the rule on the
+    fly for availability reads; a DoctorSlot row only appears when a slot
+    is booked or the rolling horizon job materializes it.
+    Times are wall-clock times in settings.TIME_ZONE.
+    """
+
+    class Weekday(models.IntegerChoices):
+        MONDAY = 0, "Monday"
+        TUESDAY = 1, "Tuesday"
+        WEDNESDAY = 2, "Wednesday"
+        THURSDAY = 3, "Thursday"
+        FRIDAY = 4, "Friday"
+        SATURDAY = 5, "Saturday"
+        SUNDAY = 6, "Sunday"
+
+    doctor = models.ForeignKey(
+        Doctor,
+        on_delete=models.CASCADE,
+        related_name="schedule_templates"
+    )
+    weekday = models.PositiveSmallIntegerField(choices=Weekday.choices)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    slot_duration = models.PositiveIntegerField(help_text="Minutes")
+    valid_from = models.DateField(null=True, blank=True)
+    valid_until = models.DateField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["doctor", "weekday", "start_time"]
+        constraints = [
+            CheckConstraint(
+                condition=Q(start_time__lt=F("end_time")),
+                name="schedule_start_before_end",
+            ),
+            CheckConstraint(
+                condition=Q(slot_duration__gt=0),
+                name="schedule_positive_duration",
+            ),
+        ]
+
+    def is_valid_on(self, day):
+        return (
+            (self.valid_from is None or self.valid_from <= day)
+            and (self.valid_until is None or day <= self.valid_until)
+        )
+
+    def __str__(self):
+        return (
+            f"{self.doctor} | {self.get_weekday_display()} "
+            f"{self.start_time}-{self.end_time} / {self.slot_duration} min"
+        )
+
+
+class ScheduleException(models.Model):
+    """
+    A day off or a blocked period of a doctor on a given date.
+    Without times the whole day is blocked.
+    """
+
+    doctor = models.ForeignKey(
+        Doctor,
+        on_delete=models.CASCADE,
+        related_name="schedule_exceptions"
+    )
+    date = models.DateField()
+    start_time = models.TimeField(null=True, blank=True)
+    end_time = models.TimeField(null=True, blank=True)
+    reason = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ["doctor", "date", "start_time"]
+        indexes = [
+            models.Index(fields=["doctor", "date"]),
+        ]
+        constraints = [
+            CheckConstraint(
+                condition=(
+                    Q(start_time__isnull=True, end_time__isnull=True)
+                    | Q(start_time__lt=F("end_time"))
+                ),
+                name="schedule_exception_whole_day_or_period",
+            ),
+        ]
+
+    def __str__(self):
+        if self.start_time is None:
+            return f"{self.doctor} | {self.date} (whole day)"
+        return (
+            f"{self.doctor} | {self.date} "
+            f"{self.start_time}-{self.end_time}"
+        )
+
+
+class SlotGenerationJob(models.Model):
+    """
+    Bulk slot generation over many doctors, run by a Celery worker
+    or the generate_slots command. Progress is written after every batch.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        RUNNING = "RUNNING", "Running"
+        DONE = "DONE", "Done"
+        FAILED = "FAILED", "Failed"
+
+    doctors = models.ManyToManyField(Doctor, related_name="+")
+    interval_start = models.DateTimeField()
+    interval_end = models.DateTimeField()
+    duration = models.PositiveIntegerField(help_text="Minutes")
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    inserted = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return (
+            f"Slot generation #{self.id} | {self.status} "
+            f"{self.processed}/{self.total}"
+        )
+
+
+class ArchivedDoctorSlot(models.Model):
+    """
+    Expired slots no live appointment references (never booked, or
+    booked by an archived appointment), moved out of DoctorSlot by the
+    archival job so the live table and its indexes only hold slots the
+    booking flow can still touch. Rows are keyed by their DoctorSlot id
+    and have no foreign keys, so archiving never blocks deleting a doctor.
+    """
+
+    slot_id = models.BigIntegerField(primary_key=True)
+    doctor_id = models.BigIntegerField()
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["start"]
+        indexes = [
+            BrinIndex(fields=["start"], name="archivedslot_start_brin"),
+            models.Index(
+                fields=["doctor_id", "start"],
+                name="archivedslot_doctor_start",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"Archived slot #{self.slot_id} | "
+            f"Doctor #{self.doctor_id} | {self.start} - {self.end}"
+        )
@@ -1,7 +1,21 @@
+from django.utils import timezone
 from rest_framework import serializers
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 
-from .models import Doctor, DoctorSlot
+from .filters import parse_specializations
+from .models import (
+    Doctor,
+    DoctorSlot,
+    ScheduleException,
+    ScheduleTemplate,
+    SlotGenerationJob,
+)
+from .services.generation import count_interval_slots, iter_interval_slots
+from .services.overlaps import (
+    BatchSlot,
+    find_batch_overlaps,
+    find_existing_overlaps,
+)
 from specializations.models import Specialization
 
 
@@ -24,20 +38,54 @@ class DoctorSerializer(serializers.ModelSerializer):
 
 
 class DoctorSlotListSerializer(serializers.ListSerializer):
+    """
+    Validates the whole batch at once: a sorted sweep for overlaps
+    inside the batch and one set-based query for overlaps with
+    existing slots. Every conflicting item is reported together.
+    """
+
     def validate(self, data):
-        slots = []
-        for item in data:
+        context_doctor_id = self.context.get("doctor_id")
+        items = []
+        for index, item in enumerate(data):
             start = item.get("start")
             end = item.get("end")
             if start and end:
-                slots.append((start, end))
+                doctor = item.get("doctor")
+                items.append(BatchSlot(
+                    index=index,
+                    doctor_id=doctor.pk if doctor else context_doctor_id,
+                    start=start,
+                    end=end,
+                ))
 
-        for i, (start1, end1) in enumerate(slots):
-            for j, (start2, end2) in enumerate(slots):  # noqa VNE001
-                if i != j and start1 < end2 and start2 < end1:
-                    raise serializers.ValidationError(
-                        "Slots in the list overlap with each other."
-                    )
+        overlaps = [
+            {
+                "index": index,
+                "start": data[index]["start"],
+                "end": data[index]["end"],
+                "conflicts_with_item": other_index,
+            }
+            for index, other_index in find_batch_overlaps(items)
+        ]
+        overlaps += [
+            {
+                "index": index,
+                "start": data[index]["start"],
+                "end": data[index]["end"],
+                "conflicts_with_slot": slot_id,
+            }
+            for index, slot_id in find_existing_overlaps(items)
+        ]
+
+        if overlaps:
+            raise serializers.ValidationError({
+                "non_field_errors": [
+                    "Slots in the list overlap with each other "
+                    "or with existing slots of the doctor."
+                ],
+                "overlaps": overlaps,
+            })
 
         return data
 
@@ -45,8 +93,8 @@ class DoctorSlotListSerializer(serializers.ListSerializer):
 class DoctorSlotSerializer(serializers.ModelSerializer):
     class Meta:
         model = DoctorSlot
-        fields = ["id", "doctor", "start", "end", "created_at"]
-        read_only_fields = ["id", "created_at"]
+        fields = ["id", "doctor", "start", "end", "is_booked", "created_at"]
+        read_only_fields = ["id", "is_booked", "created_at"]
         list_serializer_class = DoctorSlotListSerializer
 
     def __init__(self, *args, **kwargs):
@@ -60,13 +108,19 @@ class DoctorSlotSerializer(serializers.ModelSerializer):
         if start and end and start >= end:
             raise serializers.ValidationError("start must be before end")
 
+        if isinstance(self.parent, DoctorSlotListSerializer):
+            return data
+
         doctor = data.get("doctor") or (
             self.instance.doctor if self.instance else None
         )
         if doctor and start and end:
-            overlapping = DoctorSlot.objects.filter(
-                doctor=doctor, start__lt=end, end__gt=start
-            ).exclude(pk=self.instance.pk if self.instance else None)
+            overlapping = (
+                DoctorSlot.objects
+                .for_doctor(doctor)
+                .overlapping(start, end)
+                .exclude(pk=self.instance.pk if self.instance else None)
+            )
             if overlapping.exists():
                 raise serializers.ValidationError(
                     "This slot overlaps with an existing slot for the doctor."
@@ -80,8 +134,10 @@ class DoctorSlotDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = DoctorSlot
-        fields = ["id", "doctor", "start", "end", "created_at"]
-        read_only_fields = ["id", "doctor", "start", "end", "created_at"]
+        fields = ["id", "doctor", "start", "end", "is_booked", "created_at"]
+        read_only_fields = [
+            "id", "doctor", "start", "end", "is_booked", "created_at"
+        ]
 
 
 class DoctorSlotIntervalSerializer(serializers.Serializer):
@@ -116,19 +172,274 @@ class DoctorSlotIntervalSerializer(serializers.Serializer):
 
         return data
 
+    def iter_slots(self):
+        """Lazily yield (start, end) tuples from interval."""
+        data = self.validated_data
+        return iter_interval_slots(
+            data["interval_start"], data["interval_end"], data["duration"]
+        )
+
     def generate_slots(self):
         """Generate list of (start, end) tuples from interval."""
-        data = self.validated_data
+        return list(self.iter_slots())
+
+
+class DoctorSlotSearchSerializer(serializers.Serializer):
+    """
+    Query parameters of the first available slot search.
+    """
+
+    specializations = serializers.CharField(
+        help_text="Specialization IDs or codes, comma-separated"
+    )
+    from_date = serializers.DateTimeField(
+        required=False,
+        help_text="Search window start (default and earliest: now)",
+    )
+    to_date = serializers.DateTimeField(
+        required=False, help_text="Search window end (default: +7 days)"
+    )
+    limit = serializers.IntegerField(
+        required=False, default=10, min_value=1, max_value=100
+    )
+
+    def validate(self, data):
+        # past slots can no longer be booked
+        now = timezone.now()
+        from_date = max(data.get("from_date") or now, now)
+        to_date = data.get("to_date") or from_date + timedelta(days=7)
+
+        if from_date >= to_date:
+            raise serializers.ValidationError(
+                "from_date must be before to_date"
+            )
+
+        ids, codes = parse_specializations(data["specializations"])
+        if not ids and not codes:
+            raise serializers.ValidationError(
+                {"specializations": "At least one specialization is required"}
+            )
+
+        data.update(
+            from_date=from_date, to_date=to_date, ids=ids, codes=codes
+        )
+        return data
+
+
+class ScheduleTemplateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ScheduleTemplate
+        fields = [
+            "id",
+            "doctor",
+            "weekday",
+            "start_time",
+            "end_time",
+            "slot_duration",
+            "valid_from",
+            "valid_until",
+        ]
+        read_only_fields = ["id", "doctor"]
+
+    def validate(self, data):
+        start_time = data.get("start_time", getattr(
+            self.instance, "start_time", None
+        ))
+        end_time = data.get("end_time", getattr(
+            self.instance, "end_time", None
+        ))
+        if start_time and end_time and start_time >= end_time:
+            raise serializers.ValidationError(
+                "start_time must be before end_time"
+            )
+
+        if data.get("slot_duration") == 0:
+            raise serializers.ValidationError(
+                "slot_duration must be positive (in minutes)"
+            )
+
+        valid_from = data.get("valid_from")
+        valid_until = data.get("valid_until")
+        if valid_from and valid_until and valid_from > valid_until:
+            raise serializers.ValidationError(
+                "valid_from must not be after valid_until"
+            )
+
+        return data
+
+
+class ScheduleExceptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ScheduleException
+        fields = ["id", "doctor", "date", "start_time", "end_time", "reason"]
+        read_only_fields = ["id", "doctor"]
+
+    def validate(self, data):
+        start_time = data.get("start_time")
+        end_time = data.get("end_time")
+        if (start_time is None) != (end_time is None):
+            raise serializers.ValidationError(
+                "Provide both start_time and end_time, "
+                "or neither to block the whole day"
+            )
+        if start_time and start_time >= end_time:
+            raise serializers.ValidationError(
+                "start_time must be before end_time"
+            )
+        return data
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    """
+    Query parameters of the computed availability of a doctor.
+    """
+
+    MAX_WINDOW_DAYS = 31
+
+    from_date = serializers.DateTimeField(
+        required=False, help_text="Window start (default: now)"
+    )
+    to_date = serializers.DateTimeField(
+        required=False, help_text="Window end (default: +7 days)"
+    )
+    available_only = serializers.BooleanField(required=False, default=True)
+
+    def validate(self, data):
+        # past slots can no longer be booked
+        now = timezone.now()
+        from_date = max(data.get("from_date") or now, now)
+        to_date = data.get("to_date") or from_date + timedelta(days=7)
+
+        if from_date >= to_date:
+            raise serializers.ValidationError(
+                "from_date must be before to_date"
+            )
+        if to_date - from_date > timedelta(days=self.MAX_WINDOW_DAYS):
+            raise serializers.ValidationError(
+                f"The window must not exceed {self.MAX_WINDOW_DAYS} days"
+            )
+
+        data.update(from_date=from_date, to_date=to_date)
+        return data
+
+
+class AvailableSlotSerializer(serializers.Serializer):
+    """
+    A slot of the computed availability. `slot_id` is empty until the
+    slot is materialized.
+    """
+
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    slot_id = serializers.IntegerField(allow_null=True)
+    is_booked = serializers.BooleanField()
+
+
+class MaterializeSlotSerializer(serializers.Serializer):
+    start = serializers.DateTimeField(
+        help_text="Start of a slot from the computed availability"
+    )
+
+    def validate_start(self, value):
+        if value <= timezone.now():
+            raise serializers.ValidationError(
+                "Cannot materialize a slot in the past"
+            )
+        return value
+
+
+class SlotGenerationJobSerializer(serializers.ModelSerializer):
+    MAX_INTERVAL_DAYS = 366 * 2
+
+    doctors = serializers.PrimaryKeyRelatedField(
+        many=True, queryset=Doctor.objects.all()
+    )
+
+    class Meta:
+        model = SlotGenerationJob
+        fields = [
+            "id",
+            "doctors",
+            "interval_start",
+            "interval_end",
+            "duration",
+            "status",
+            "total",
+            "processed",
+            "inserted",
+            "error",
+            "created_at",
+            "finished_at",
+        ]
+        read_only_fields = [
+            "id",
+            "status",
+            "total",
+            "processed",
+            "inserted",
+            "error",
+            "created_at",
+            "finished_at",
+        ]
+
+    def validate(self, data):
         interval_start = data["interval_start"]
         interval_end = data["interval_end"]
-        duration_mins = data["duration"]
-        duration = timedelta(minutes=duration_mins)
 
-        slots = []
-        current_start = interval_start
-        while current_start + duration <= interval_end:
-            current_end = current_start + duration
-            slots.append((current_start, current_end))
-            current_start = current_end
+        if interval_start >= interval_end:
+            raise serializers.ValidationError(
+                "interval_start must be before interval_end"
+            )
+        if interval_end - interval_start > timedelta(
+            days=self.MAX_INTERVAL_DAYS
+        ):
+            raise serializers.ValidationError(
+                f"The interval must not exceed {self.MAX_INTERVAL_DAYS} days"
+            )
+        if data["duration"] <= 0:
+            raise serializers.ValidationError(
+                "duration must be positive (in minutes)"
+            )
+        if not data["doctors"]:
+            raise serializers.ValidationError(
+                {"doctors": "At least one doctor is required"}
+            )
+
+        data["total"] = len(data["doctors"]) * count_interval_slots(
+            interval_start, interval_end, data["duration"]
+        )
+        return data
+
+
+class HeatmapQuerySerializer(serializers.Serializer):
+    """
+    Query parameters of the availability heatmap of a doctor.
+    """
+
+    from_date = serializers.DateField(
+        required=False, help_text="First day (default: today)"
+    )
+    days = serializers.IntegerField(
+        required=False, default=60, min_value=1, max_value=90
+    )
+    granularity = serializers.ChoiceField(
+        choices=["day", "hour"], required=False, default="day"
+    )
+    bitmap = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Add base64 occupancy bits (1 = booked) per bucket",
+    )
 
-        return slots
+    def validate(self, data):
+        from_date = data.get("from_date") or timezone.localdate()
+        tz = timezone.get_current_timezone()
+        start = timezone.make_aware(
+            datetime.combine(from_date, time.min), tz
+        )
+        end = timezone.make_aware(
+            datetime.combine(from_date + timedelta(days=data["days"]), time.min),
+            tz,
+        )
+        data.update(from_date=from_date, start=start, end=end)
+        return data
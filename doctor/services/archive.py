@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from appointment.models import Appointment
+from doctor.models import ArchivedDoctorSlot, DoctorSlot
+from doctor.services.heatmap import invalidate_doctor_slots
+
+ARCHIVE_BATCH_SIZE = 5000
+
+# Only slots no live appointment points at are moved (a cancelled
+# appointment still references its slot, an archived one does not).
+# Rows locked by someone else are skipped and picked up by the next run.
+ARCHIVE_BATCH_SQL = """
+WITH expired AS (
+    SELECT slot.id
+    FROM {slot_table} slot
+    WHERE slot.start < %(before)s
+      AND slot."end" <= %(before)s
+      AND NOT EXISTS (
+          SELECT 1
+          FROM {appointment_table} appointment
+          WHERE appointment.doctor_slot_id = slot.id
+      )
+    LIMIT %(limit)s
+    FOR UPDATE SKIP LOCKED
+), moved AS (
+    DELETE FROM {slot_table} slot
+    USING expired
+    WHERE slot.id = expired.id
+    RETURNING slot.id, slot.doctor_id, slot.start, slot."end", slot.created_at
+)
+INSERT INTO {archive_table}
+    (slot_id, doctor_id, start, "end", created_at, archived_at)
+SELECT id, doctor_id, start, "end", created_at, now()
+FROM moved
+RETURNING doctor_id
+"""
+
+
+def _archive_batch_sql():
+    return ARCHIVE_BATCH_SQL.format(
+        slot_table=DoctorSlot._meta.db_table,
+        appointment_table=Appointment._meta.db_table,
+        archive_table=ArchivedDoctorSlot._meta.db_table,
+    )
+
+
+def archive_batch(before, limit):
+    """Move up to `limit` expired slots; returns their doctor ids"""
+    with connection.cursor() as cursor:
+        cursor.execute(_archive_batch_sql(), {"before": before, "limit": limit})
+        return [row[0] for row in cursor.fetchall()]
+
+
+def archive_expired_slots(days, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move slots no live appointment references that ended more than
+    `days` days ago into ArchivedDoctorSlot, each batch in its own
+    transaction. Slot signals are bypassed, so the slot caches of the
+    affected doctors are invalidated per batch. Returns the number of archived slots.
+    """
+    before = timezone.now() - timedelta(days=days)
+    archived = 0
+    while True:
+        with transaction.atomic():
+            doctor_ids = archive_batch(before, batch_size)
+            invalidate_doctor_slots(*doctor_ids)
+        archived += len(doctor_ids)
+        if len(doctor_ids) < batch_size:
+            return archived
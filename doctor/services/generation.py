@@ -0,0 +1,184 @@
+import io
+from datetime import timedelta
+from itertools import islice
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from doctor.models import DoctorSlot, SlotGenerationJob
+from doctor.services.heatmap import invalidate_doctor_slots
+
+GENERATION_BATCH_SIZE = 5000
+
+# Batches are copied into a session temp table and moved into the slot
+# table with ON CONFLICT DO NOTHING, so slots that collide with existing
+# ones (unique or exclusion constraint) are skipped instead of failing
+# the whole batch.
+CREATE_STAGE_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS doctor_slot_generation_stage (
+    doctor_id bigint,
+    start timestamptz,
+    "end" timestamptz
+) ON COMMIT DROP
+"""
+
+INSERT_FROM_STAGE_SQL = """
+INSERT INTO {slot_table} (doctor_id, start, "end", created_at, is_booked)
+SELECT doctor_id, start, "end", now(), false
+FROM doctor_slot_generation_stage
+ORDER BY doctor_id, start
+ON CONFLICT DO NOTHING
+"""
+
+INSERT_FROM_ARRAYS_SQL = """
+INSERT INTO {slot_table} (doctor_id, start, "end", created_at, is_booked)
+SELECT doctor_id, start, "end", now(), false
+FROM unnest(
+    %(doctor_ids)s::bigint[],
+    %(starts)s::timestamptz[],
+    %(ends)s::timestamptz[]
+) AS batch(doctor_id, start, "end")
+ON CONFLICT DO NOTHING
+"""
+
+
+def iter_interval_slots(interval_start, interval_end, duration):
+    """Yield (start, end) pairs of `duration` minutes inside the interval"""
+    step = timedelta(minutes=duration)
+    current_start = interval_start
+    while current_start + step <= interval_end:
+        current_end = current_start + step
+        yield current_start, current_end
+        current_start = current_end
+
+
+def count_interval_slots(interval_start, interval_end, duration):
+    return max(
+        (interval_end - interval_start) // timedelta(minutes=duration), 0
+    )
+
+
+def iter_doctor_slots(doctor_ids, interval_start, interval_end, duration):
+    for doctor_id in doctor_ids:
+        for start, end in iter_interval_slots(
+            interval_start, interval_end, duration
+        ):
+            yield doctor_id, start, end
+
+
+def iter_batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def write_batch(rows):
+    """
+    Insert (doctor_id, start, end) rows, skipping conflicting ones.
+    Uses COPY when the driver supports it. Returns the inserted count.
+    """
+    slot_table = DoctorSlot._meta.db_table
+    with connection.cursor() as cursor:
+        if hasattr(cursor.cursor, "copy_expert"):
+            buffer = io.StringIO()
+            for doctor_id, start, end in rows:
+                buffer.write(
+                    f"{doctor_id}\t{start.isoformat()}\t{end.isoformat()}\n"
+                )
+            buffer.seek(0)
+
+            cursor.execute(CREATE_STAGE_SQL)
+            cursor.execute("TRUNCATE doctor_slot_generation_stage")
+            cursor.cursor.copy_expert(
+                'COPY doctor_slot_generation_stage (doctor_id, start, "end") '
+                "FROM STDIN",
+                buffer,
+            )
+            cursor.execute(INSERT_FROM_STAGE_SQL.format(slot_table=slot_table))
+        else:
+            doctor_ids, starts, ends = zip(*rows)
+            cursor.execute(
+                INSERT_FROM_ARRAYS_SQL.format(slot_table=slot_table),
+                {
+                    "doctor_ids": list(doctor_ids),
+                    "starts": list(starts),
+                    "ends": list(ends),
+                },
+            )
+        return cursor.rowcount
+
+
+def generate_slots(
+    doctor_ids,
+    interval_start,
+    interval_end,
+    duration,
+    batch_size=GENERATION_BATCH_SIZE,
+    on_progress=None,
+):
+    """
+    Generate slots for every doctor in constant memory: rows are produced
+    lazily and written in batches, each batch in its own transaction.
+    `on_progress(processed, inserted)` runs inside the batch transaction.
+    Returns (processed, inserted).
+    """
+    processed = inserted = 0
+    rows = iter_doctor_slots(doctor_ids, interval_start, interval_end, duration)
+
+    for batch in iter_batches(rows, batch_size):
+        with transaction.atomic():
+            inserted += write_batch(batch)
+            processed += len(batch)
+            invalidate_doctor_slots(*{row[0] for row in batch})
+            if on_progress:
+                on_progress(processed, inserted)
+
+    return processed, inserted
+
+
+def run_generation_job(
+    job_id, batch_size=GENERATION_BATCH_SIZE, on_progress=None
+):
+    job = SlotGenerationJob.objects.get(pk=job_id)
+    doctor_ids = list(
+        job.doctors.order_by("id").values_list("id", flat=True)
+    )
+    SlotGenerationJob.objects.filter(pk=job.pk).update(
+        status=SlotGenerationJob.Status.RUNNING,
+        total=len(doctor_ids) * count_interval_slots(
+            job.interval_start, job.interval_end, job.duration
+        ),
+        processed=0,
+        inserted=0,
+        error="",
+    )
+
+    def report(processed, inserted):
+        SlotGenerationJob.objects.filter(pk=job.pk).update(
+            processed=processed, inserted=inserted
+        )
+        if on_progress:
+            on_progress(processed, inserted)
+
+    try:
+        generate_slots(
+            doctor_ids,
+            job.interval_start,
+            job.interval_end,
+            job.duration,
+            batch_size=batch_size,
+            on_progress=report,
+        )
+    except Exception as exc:
+        SlotGenerationJob.objects.filter(pk=job.pk).update(
+            status=SlotGenerationJob.Status.FAILED,
+            error=str(exc),
+            finished_at=timezone.now(),
+        )
+        raise
+
+    SlotGenerationJob.objects.filter(pk=job.pk).update(
+        status=SlotGenerationJob.Status.DONE, finished_at=timezone.now()
+    )
+    job.refresh_from_db()
+    return job
@@ -0,0 +1,153 @@
+import base64
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import Case, Count, Q, Value, When
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from controller.cache import bump_version, make_key
+from doctor.models import DoctorSlot
+
+HEATMAP_CACHE_TIMEOUT = 10 * 60
+
+
+def slot_cache_namespace(doctor_id):
+    return f"doctor-slots:{doctor_id}"
+
+
+def invalidate_doctor_slots(*doctor_ids):
+    """
+    Called by the slot and appointment signals; bulk paths that skip
+    signals (bulk_create, raw inserts, queryset updates) call it directly.
+    """
+    for doctor_id in set(doctor_ids):
+        bump_version(slot_cache_namespace(doctor_id))
+
+
+def heatmap_cache_key(doctor_id, *params):
+    return make_key(slot_cache_namespace(doctor_id), "heatmap", *params)
+
+
+def encode_bitmap(bits):
+    """
+    '0110' (1 = booked, in slot start order) -> base64 of the bits
+    packed big-endian and padded with zeros to whole bytes
+    """
+    if not bits:
+        return ""
+    padded = bits.ljust(-(-len(bits) // 8) * 8, "0")
+    packed = int(padded, 2).to_bytes(len(padded) // 8, "big")
+    return base64.b64encode(packed).decode()
+
+
+def bucket_start(moment, granularity, tz):
+    """Start of the local day (or hour) `moment` falls in"""
+    local = timezone.localtime(moment, tz)
+    if granularity == "hour":
+        return local.replace(minute=0, second=0, microsecond=0)
+    return timezone.make_aware(datetime.combine(local.date(), time.min), tz)
+
+
+def _stored_buckets(doctor_id, start, end, split, granularity, bitmap):
+    """
+    Stored slots in [start, end) starting before `split`, grouped per
+    bucket by one query
+    """
+    aggregates = {
+        "total": Count("id"),
+        "booked": Count("id", filter=Q(is_booked=True)),
+    }
+    if bitmap:
+        aggregates["occupancy"] = StringAgg(
+            Case(
+                When(is_booked=True, then=Value("1")),
+                default=Value("0"),
+            ),
+            delimiter="",
+            order_by="start",
+        )
+
+    rows = (
+        DoctorSlot.objects
+        .for_doctor(doctor_id)
+        .within(start=start, end=end)
+        .filter(start__lt=split)
+        .annotate(bucket=Trunc(
+            "start", granularity, tzinfo=timezone.get_current_timezone()
+        ))
+        .values("bucket")
+        .annotate(**aggregates)
+        .order_by("bucket")
+    )
+    return [
+        (row["bucket"], row["total"], row["booked"], row.get("occupancy"))
+        for row in rows
+    ]
+
+
+def _scheduled_buckets(doctor_id, start, end, granularity):
+    """
+    Stored and template-generated slots in [start, end) grouped per
+    bucket in Python; only used past the materialization horizon,
+    where the templates are not stored yet.
+    """
+    from doctor.services.schedule import (
+        _existing_slots,
+        _schedule,
+        iter_template_slots,
+        merge_availability,
+    )
+
+    tz = timezone.get_current_timezone()
+    templates, exceptions = _schedule([doctor_id], start, end)
+    existing = _existing_slots([doctor_id], start, end)[doctor_id]
+    virtual = iter_template_slots(
+        templates[doctor_id], exceptions[doctor_id], start, end
+    )
+
+    occupancy = {}
+    for slot in merge_availability(virtual, existing):
+        # stored slots starting before `start` are counted by the query
+        if start <= slot.start and slot.end <= end:
+            key = bucket_start(slot.start, granularity, tz)
+            occupancy.setdefault(key, []).append(slot.is_booked)
+    return [
+        (
+            key,
+            len(booked),
+            booked.count(True),
+            "".join("1" if is_booked else "0" for is_booked in booked),
+        )
+        for key, booked in occupancy.items()
+    ]
+
+
+def build_heatmap(doctor_id, start, end, granularity="day", bitmap=False):
+    """
+    Free and booked counts of the doctor's slots per day (or hour) in
+    [start, end). Stored slots are counted by one grouped query; from
+    the bucket holding the materialization horizon on, the slots the
+    schedule templates generate are merged in as well. With `bitmap`
+    every bucket also carries the occupancy of its slots in start order.
+    """
+    tz = timezone.get_current_timezone()
+    horizon = timezone.now() + timedelta(days=settings.SCHEDULE_HORIZON_DAYS)
+    split = min(max(bucket_start(horizon, granularity, tz), start), end)
+
+    rows = []
+    if start < split:
+        rows += _stored_buckets(
+            doctor_id, start, end, split, granularity, bitmap
+        )
+    if split < end:
+        rows += _scheduled_buckets(doctor_id, split, end, granularity)
+
+    buckets = []
+    for key, total, booked, occupancy in rows:
+        bucket = {"start": key, "free": total - booked, "booked": booked}
+        if bitmap:
+            bucket["bitmap"] = encode_bitmap(occupancy)
+        buckets.append(bucket)
+    return buckets
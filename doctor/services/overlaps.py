@@ -0,0 +1,79 @@
+from collections import defaultdict, namedtuple
+
+from django.db import connection
+
+from doctor.models import DoctorSlot
+
+BatchSlot = namedtuple("BatchSlot", ["index", "doctor_id", "start", "end"])
+
+# The whole batch is sent as parallel arrays. Every item probes the
+# GiST index of the per-doctor exclusion constraint with the condition
+# of DoctorSlot.objects.for_doctor(X).overlapping(start, end), so the
+# single-slot and the bulk checks share one overlap definition. The
+# LATERAL subquery keeps it one probe per item: a plain join is
+# planned as a hash join over every slot. Of the existing slots an
+# item overlaps (they never overlap each other) the latest is reported.
+EXISTING_OVERLAPS_SQL = """
+SELECT batch.idx, slot.id
+FROM unnest(
+    %(doctor_ids)s::bigint[],
+    %(starts)s::timestamptz[],
+    %(ends)s::timestamptz[],
+    %(indexes)s::integer[]
+) AS batch(doctor_id, start, "end", idx)
+CROSS JOIN LATERAL (
+    SELECT slot.id
+    FROM {slot_table} slot
+    WHERE slot.doctor_id = batch.doctor_id::bigint
+      AND tstzrange(slot.start, slot."end", '[)')
+          && tstzrange(batch.start, batch."end", '[)')
+    ORDER BY slot.start DESC
+    LIMIT 1
+) AS slot
+ORDER BY batch.idx
+"""
+
+
+def find_batch_overlaps(items):
+    """
+    Sorted sweep per doctor: an item overlaps some earlier item
+    if and only if it starts before the latest end seen so far.
+    Returns (index, other_index) pairs in O(n log n).
+    """
+    by_doctor = defaultdict(list)
+    for item in items:
+        by_doctor[item.doctor_id].append(item)
+
+    conflicts = []
+    for group in by_doctor.values():
+        group.sort(key=lambda item: (item.start, item.end))
+        latest = None
+        for item in group:
+            if latest is not None and item.start < latest.end:
+                conflicts.append((item.index, latest.index))
+            if latest is None or item.end > latest.end:
+                latest = item
+
+    return sorted(conflicts)
+
+
+def find_existing_overlaps(items):
+    """
+    One query for the whole batch.
+    Returns (index, existing_slot_id) pairs, at most one per item.
+    """
+    items = [item for item in items if item.doctor_id is not None]
+    if not items:
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            EXISTING_OVERLAPS_SQL.format(slot_table=DoctorSlot._meta.db_table),
+            {
+                "doctor_ids": [item.doctor_id for item in items],
+                "starts": [item.start for item in items],
+                "ends": [item.end for item in items],
+                "indexes": [item.index for item in items],
+            },
+        )
+        return cursor.fetchall()
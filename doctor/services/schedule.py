@@ -0,0 +1,226 @@
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from doctor.models import DoctorSlot, ScheduleException, ScheduleTemplate
+from doctor.services.heatmap import invalidate_doctor_slots
+
+AvailableSlot = namedtuple(
+    "AvailableSlot", ["start", "end", "slot_id", "is_booked"]
+)
+
+
+class ScheduleError(Exception):
+    """Base class for every reason a slot cannot be materialized."""
+
+
+class SlotNotInSchedule(ScheduleError):
+    pass
+
+
+class SlotUnavailable(ScheduleError):
+    pass
+
+
+def _local(day, time, tz):
+    return timezone.make_aware(datetime.combine(day, time), tz)
+
+
+def _is_blocked(exceptions, start, end, tz):
+    for exception in exceptions:
+        if exception.start_time is None:
+            return True
+        blocked_start = _local(exception.date, exception.start_time, tz)
+        blocked_end = _local(exception.date, exception.end_time, tz)
+        if start < blocked_end and blocked_start < end:
+            return True
+    return False
+
+
+def iter_template_slots(templates, exceptions, start, end):
+    """
+    Cut the weekly rules into (start, end) pairs inside [start, end),
+    in order, skipping periods blocked by exceptions.
+    Nothing is read from the database here.
+    """
+    tz = timezone.get_current_timezone()
+    by_weekday = defaultdict(list)
+    for template in templates:
+        by_weekday[template.weekday].append(template)
+    for rules in by_weekday.values():
+        rules.sort(key=lambda template: template.start_time)
+
+    exceptions_by_date = defaultdict(list)
+    for exception in exceptions:
+        exceptions_by_date[exception.date].append(exception)
+
+    day = timezone.localtime(start, tz).date()
+    last_day = timezone.localtime(end, tz).date()
+    while day <= last_day:
+        for template in by_weekday[day.weekday()]:
+            if not template.is_valid_on(day):
+                continue
+
+            step = timedelta(minutes=template.slot_duration)
+            slot_start = _local(day, template.start_time, tz)
+            day_end = _local(day, template.end_time, tz)
+            while slot_start + step <= day_end:
+                slot_end = slot_start + step
+                if (
+                    start <= slot_start and slot_end <= end
+                    and not _is_blocked(
+                        exceptions_by_date[day], slot_start, slot_end, tz
+                    )
+                ):
+                    yield slot_start, slot_end
+                slot_start = slot_end
+        day += timedelta(days=1)
+
+
+def merge_availability(virtual, existing):
+    """
+    Materialized slots win; a generated slot is dropped if it overlaps
+    a materialized one or a generated slot kept before it.
+    `existing` is a list of (start, end, id, is_booked) sorted by start.
+    """
+    existing_starts = [row[0] for row in existing]
+    result = [AvailableSlot(*row) for row in existing]
+
+    kept_end = None
+    for start, end in sorted(virtual):
+        if kept_end is not None and start < kept_end:
+            continue
+        # slots of one doctor never overlap, so only the latest
+        # materialized slot starting before `end` can conflict
+        position = bisect_left(existing_starts, end) - 1
+        if position >= 0 and existing[position][1] > start:
+            continue
+        result.append(AvailableSlot(start, end, None, False))
+        kept_end = end
+
+    result.sort(key=lambda slot: slot.start)
+    return result
+
+
+def _existing_slots(doctor_ids, start, end):
+    slots = DoctorSlot.objects.overlapping(start, end)
+    if len(doctor_ids) == 1:
+        slots = slots.for_doctor(doctor_ids[0])
+    else:
+        slots = slots.filter(doctor_id__in=doctor_ids)
+
+    rows = (
+        slots
+        .order_by("doctor_id", "start")
+        .values_list("doctor_id", "start", "end", "id", "is_booked")
+    )
+    by_doctor = defaultdict(list)
+    for doctor_id, *slot in rows:
+        by_doctor[doctor_id].append(tuple(slot))
+    return by_doctor
+
+
+def _schedule(doctor_ids, start, end):
+    tz = timezone.get_current_timezone()
+    templates = defaultdict(list)
+    for template in ScheduleTemplate.objects.filter(doctor_id__in=doctor_ids):
+        templates[template.doctor_id].append(template)
+
+    exceptions = defaultdict(list)
+    for exception in ScheduleException.objects.filter(
+        doctor_id__in=doctor_ids,
+        date__gte=timezone.localtime(start, tz).date(),
+        date__lte=timezone.localtime(end, tz).date(),
+    ):
+        exceptions[exception.doctor_id].append(exception)
+
+    return templates, exceptions
+
+
+def compute_availability(doctor_id, start, end, available_only=True):
+    """
+    Availability of one doctor in [start, end): materialized slots plus
+    slots generated from the weekly templates, in three queries.
+    """
+    templates, exceptions = _schedule([doctor_id], start, end)
+    existing = _existing_slots([doctor_id], start, end)[doctor_id]
+    virtual = iter_template_slots(
+        templates[doctor_id], exceptions[doctor_id], start, end
+    )
+
+    slots = merge_availability(virtual, existing)
+    if available_only:
+        slots = [slot for slot in slots if not slot.is_booked]
+    return slots
+
+
+def materialize_slot(doctor_id, start):
+    """
+    Return the DoctorSlot starting at `start`, creating it from the
+    schedule if it is not stored yet. Returns (slot, created).
+    """
+    window_end = start + timedelta(days=1)
+    for slot in compute_availability(
+        doctor_id, start, window_end, available_only=False
+    ):
+        if slot.start == start:
+            break
+    else:
+        raise SlotNotInSchedule(
+            "The doctor has no slot starting at this time."
+        )
+
+    if slot.slot_id is not None:
+        return DoctorSlot.objects.get(pk=slot.slot_id), False
+
+    try:
+        return DoctorSlot.objects.get_or_create(
+            doctor_id=doctor_id, start=slot.start, end=slot.end
+        )
+    except IntegrityError:
+        raise SlotUnavailable(
+            "The slot overlaps with an existing slot."
+        )
+
+
+def materialize_horizon(days=None, doctor_ids=None):
+    """
+    Store every scheduled slot of the next `days` days that is not
+    stored yet. Conflicting rows are skipped by the database, so the
+    job is safe to rerun. Returns the number of slots submitted.
+    """
+    start = timezone.now()
+    end = start + timedelta(days=days or settings.SCHEDULE_HORIZON_DAYS)
+
+    templates = ScheduleTemplate.objects.all()
+    if doctor_ids is not None:
+        templates = templates.filter(doctor_id__in=doctor_ids)
+    doctor_ids = list(
+        templates.order_by().values_list("doctor_id", flat=True).distinct()
+    )
+    if not doctor_ids:
+        return 0
+
+    templates, exceptions = _schedule(doctor_ids, start, end)
+    existing = _existing_slots(doctor_ids, start, end)
+
+    to_create = []
+    for doctor_id in doctor_ids:
+        virtual = iter_template_slots(
+            templates[doctor_id], exceptions[doctor_id], start, end
+        )
+        to_create.extend(
+            DoctorSlot(doctor_id=doctor_id, start=slot.start, end=slot.end)
+            for slot in merge_availability(virtual, existing[doctor_id])
+            if slot.slot_id is None
+        )
+
+    DoctorSlot.objects.bulk_create(
+        to_create, batch_size=1000, ignore_conflicts=True
+    )
+    invalidate_doctor_slots(*doctor_ids)
+    return len(to_create)
@@ -0,0 +1,68 @@
+from django.db import connection
+
+from doctor.models import Doctor, DoctorSlot
+from specializations.models import Specialization
+
+# Matching doctors are resolved once, then every doctor contributes its
+# first `limit` free slots from the (doctor, start) partial index via
+# LATERAL; the outer ORDER BY ... LIMIT merges those short ordered runs,
+# so the cost depends on doctors * limit, not on the number of slots.
+FIRST_AVAILABLE_SQL = """
+SELECT slot.id
+FROM (
+    SELECT DISTINCT link.doctor_id
+    FROM {link_table} link
+    JOIN {specialization_table} spec ON spec.id = link.specialization_id
+    WHERE spec.id = ANY(%(ids)s::bigint[])
+       OR spec.code = ANY(%(codes)s::text[])
+) AS doctor
+CROSS JOIN LATERAL (
+    SELECT s.id, s.start
+    FROM {slot_table} s
+    WHERE s.doctor_id = doctor.doctor_id
+      AND s.is_booked = FALSE
+      AND s.start >= %(start)s
+      AND s.start < %(end)s
+    ORDER BY s.start
+    LIMIT %(limit)s
+) AS slot
+ORDER BY slot.start, slot.id
+LIMIT %(limit)s
+"""
+
+
+def _first_available_sql():
+    return FIRST_AVAILABLE_SQL.format(
+        link_table=Doctor.specializations.through._meta.db_table,
+        specialization_table=Specialization._meta.db_table,
+        slot_table=DoctorSlot._meta.db_table,
+    )
+
+
+def first_available_slot_ids(*, ids, codes, start, end, limit):
+    """Ids of the earliest free slots across doctors of given specializations"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _first_available_sql(),
+            {
+                "ids": list(ids),
+                "codes": list(codes),
+                "start": start,
+                "end": end,
+                "limit": limit,
+            },
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def first_available_slots(*, ids, codes, start, end, limit):
+    """Earliest free slots with doctors loaded, in start order"""
+    slot_ids = first_available_slot_ids(
+        ids=ids, codes=codes, start=start, end=end, limit=limit
+    )
+    slots = (
+        DoctorSlot.objects.select_related("doctor")
+        .prefetch_related("doctor__specializations")
+        .in_bulk(slot_ids)
+    )
+    return [slots[slot_id] for slot_id in slot_ids]
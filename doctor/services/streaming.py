@@ -0,0 +1,50 @@
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM_CHUNK_SIZE = 2000
+
+STREAM_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def iter_serialized(queryset, serializer_class, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Rows are read through a server-side cursor and serialized one by one
+    by a single serializer instance, so memory does not grow with the
+    size of the queryset.
+    """
+    serializer = serializer_class()
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        yield serializer.to_representation(obj)
+
+
+def stream_rows(rows, fmt, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Encode rows as NDJSON lines or as one JSON array, flushing
+    every `chunk_size` rows instead of every row.
+    """
+    encoder = JSONEncoder()
+    buffer = []
+    is_array = fmt == "json"
+    first = True
+
+    if is_array:
+        buffer.append("[")
+
+    for row in rows:
+        encoded = encoder.encode(row)
+        if is_array:
+            buffer.append(encoded if first else "," + encoded)
+        else:
+            buffer.append(encoded + "\n")
+        first = False
+
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+
+    if is_array:
+        buffer.append("]")
+    if buffer:
+        yield "".join(buffer)
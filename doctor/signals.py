@@ -0,0 +1,43 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from controller.cache import bump_version, model_namespace
+from doctor.models import (
+    Doctor,
+    DoctorSlot,
+    ScheduleException,
+    ScheduleTemplate,
+)
+from doctor.services.heatmap import invalidate_doctor_slots
+from specializations.models import Specialization
+
+
+@receiver(post_save, sender=DoctorSlot)
+@receiver(post_delete, sender=DoctorSlot)
+def invalidate_slot_cache_signal_handler(sender, instance, **kwargs):
+    invalidate_doctor_slots(instance.doctor_id)
+
+
+@receiver(post_save, sender=ScheduleTemplate)
+@receiver(post_delete, sender=ScheduleTemplate)
+@receiver(post_save, sender=ScheduleException)
+@receiver(post_delete, sender=ScheduleException)
+def invalidate_schedule_cache_signal_handler(sender, instance, **kwargs):
+    """The heatmap counts the slots generated from the schedule too"""
+    invalidate_doctor_slots(instance.doctor_id)
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+def invalidate_doctor_cache_signal_handler(sender, **kwargs):
+    bump_version(model_namespace(Doctor))
+
+
+@receiver(m2m_changed, sender=Doctor.specializations.through)
+def invalidate_doctor_specializations_signal_handler(
+    sender, action, **kwargs
+):
+    """Both sides list the link, so both namespaces are bumped"""
+    if action.startswith("post_"):
+        bump_version(model_namespace(Doctor))
+        bump_version(model_namespace(Specialization))
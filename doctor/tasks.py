@@ -0,0 +1,35 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+
+from doctor.services.archive import archive_expired_slots
+from doctor.services.generation import run_generation_job
+from doctor.services.schedule import materialize_horizon
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def materialize_schedule_horizon(days=None):
+    submitted = materialize_horizon(days=days)
+    logger.info(f"Schedule horizon: {submitted} slot(s) submitted")
+    return submitted
+
+
+@shared_task
+def run_slot_generation_job(job_id):
+    job = run_generation_job(job_id)
+    logger.info(
+        f"Slot generation job {job.id}: {job.inserted} of "
+        f"{job.processed} slot(s) inserted"
+    )
+
+
+@shared_task
+def archive_expired_doctor_slots(days=None):
+    if days is None:
+        days = settings.SLOT_ARCHIVE_AFTER_DAYS
+    archived = archive_expired_slots(days=days)
+    logger.info(f"Slot archive: {archived} expired slot(s) archived")
+    return archived
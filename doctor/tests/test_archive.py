@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from appointment.models import Appointment
+from controller.cache import get_version
+from doctor.models import ArchivedDoctorSlot, Doctor, DoctorSlot
+from doctor.services.archive import archive_expired_slots
+from doctor.services.heatmap import slot_cache_namespace
+
+
+class SlotArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.doctor = Doctor.objects.create(
+            first_name="Gregory", last_name="House", price_per_visit=100
+        )
+        self.patient = get_user_model().objects.create_user(
+            email="patient@example.com", password="password123"
+        )
+
+    def make_slot(self, days):
+        start = timezone.now() + timedelta(days=days)
+        return DoctorSlot.objects.create(
+            doctor=self.doctor, start=start, end=start + timedelta(hours=1)
+        )
+
+    def test_moves_only_expired_slots_without_appointments(self):
+        expired = [self.make_slot(-40), self.make_slot(-35)]
+        cancelled = self.make_slot(-45)
+        Appointment.objects.create(
+            doctor_slot=cancelled,
+            patient=self.patient,
+            status=Appointment.Status.CANCELLED,
+        )
+        recent = self.make_slot(-2)
+        upcoming = self.make_slot(3)
+
+        archived = archive_expired_slots(days=30, batch_size=1)
+
+        self.assertEqual(archived, 2)
+        self.assertQuerySetEqual(
+            DoctorSlot.objects.order_by("pk"),
+            [cancelled, recent, upcoming],
+        )
+        archive = ArchivedDoctorSlot.objects.get(pk=expired[0].pk)
+        self.assertEqual(
+            (archive.doctor_id, archive.start, archive.end),
+            (self.doctor.id, expired[0].start, expired[0].end),
+        )
+        self.assertEqual(archive_expired_slots(days=30), 0)
+
+    def test_invalidates_slot_caches_of_affected_doctors(self):
+        self.make_slot(-40)
+        version = get_version(slot_cache_namespace(self.doctor.id))
+
+        archive_expired_slots(days=30)
+
+        self.assertNotEqual(
+            get_version(slot_cache_namespace(self.doctor.id)), version
+        )
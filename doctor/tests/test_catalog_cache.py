@@ -0,0 +1,133 @@
+import threading
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from controller.cache import get_or_compute
+from doctor.models import Doctor
+from specializations.models import Specialization
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.cardio = Specialization.objects.create(
+            name="Cardiology", code="cardio"
+        )
+        self.doctor = Doctor.objects.create(
+            first_name="Gregory", last_name="House", price_per_visit=100
+        )
+        self.doctor.specializations.add(self.cardio)
+
+    def test_doctor_list_is_cached_per_query(self):
+        response = self.client.get("/api/doctors/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get("/api/doctors/")
+        self.assertEqual(cached.data, response.data)
+
+        # code map, doctors, prefetched specializations
+        with self.assertNumQueries(3):
+            self.client.get("/api/doctors/", {"specializations": "cardio"})
+        # the code map is cached too
+        with self.assertNumQueries(2):
+            self.client.get("/api/doctors/", {"specializations": "cardio,"})
+
+    def test_doctor_list_follows_doctor_and_link_changes(self):
+        self.client.get("/api/doctors/")
+
+        self.doctor.last_name = "Wilson"
+        self.doctor.save()
+        response = self.client.get("/api/doctors/")
+        self.assertEqual(response.data["results"][0]["last_name"], "Wilson")
+
+        self.doctor.specializations.clear()
+        response = self.client.get("/api/doctors/")
+        self.assertEqual(
+            response.data["results"][0]["specializations"], []
+        )
+
+    def test_specialization_change_invalidates_both_lists(self):
+        self.client.get("/api/doctors/")
+        self.client.get("/api/specializations/")
+
+        self.cardio.name = "Cardiac surgery"
+        self.cardio.save()
+
+        doctors = self.client.get("/api/doctors/")
+        specializations = self.client.get("/api/specializations/")
+        self.assertEqual(
+            doctors.data["results"][0]["specializations"],
+            ["Cardiac surgery"],
+        )
+        self.assertEqual(specializations.data[0]["name"], "Cardiac surgery")
+
+
+class SpecializationFilterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.cardio = Specialization.objects.create(
+            name="Cardiology", code="cardio"
+        )
+        self.surgery = Specialization.objects.create(
+            name="Surgery", code="surgery"
+        )
+        self.house = Doctor.objects.create(
+            first_name="Gregory", last_name="House", price_per_visit=100
+        )
+        self.house.specializations.add(self.cardio, self.surgery)
+        self.wilson = Doctor.objects.create(
+            first_name="James", last_name="Wilson", price_per_visit=100
+        )
+
+    def filter_doctors(self, value):
+        response = self.client.get(
+            "/api/doctors/", {"specializations": value}
+        )
+        return [doctor["id"] for doctor in response.data["results"]]
+
+    def test_doctor_matching_several_specializations_is_listed_once(self):
+        self.assertEqual(
+            self.filter_doctors(f"cardio,{self.surgery.id}"), [self.house.id]
+        )
+        self.assertEqual(self.filter_doctors("unknown"), [])
+
+    def test_new_code_is_resolved_after_specialization_is_created(self):
+        self.filter_doctors("cardio")
+
+        oncology = Specialization.objects.create(
+            name="Oncology", code="onco"
+        )
+        self.wilson.specializations.add(oncology)
+
+        self.assertEqual(self.filter_doctors("onco"), [self.wilson.id])
+
+
+class StampedeProtectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_waits_for_the_lock_holder_instead_of_computing(self):
+        cache.add("key:lock", 1)
+        timer = threading.Timer(0.1, lambda: cache.set("key", "fresh"))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        value = get_or_compute(key="key", compute=lambda: "own", timeout=60)
+
+        self.assertEqual(value, "fresh")
+
+    def test_computes_once_on_miss(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "value"
+
+        get_or_compute("key", compute, 60)
+        get_or_compute("key", compute, 60)
+
+        self.assertEqual(len(calls), 1)
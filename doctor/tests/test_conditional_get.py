@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from doctor.models import Doctor, DoctorSlot
+from specializations.models import Specialization
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.doctor = Doctor.objects.create(
+            first_name="Gregory", last_name="House", price_per_visit=100
+        )
+        self.slots_url = f"/api/doctors/{self.doctor.id}/slots/"
+
+    def add_slot(self, hours):
+        start = timezone.now() + timezone.timedelta(hours=hours)
+        return DoctorSlot.objects.create(
+            doctor=self.doctor,
+            start=start,
+            end=start + timezone.timedelta(hours=1),
+        )
+
+    def test_unchanged_slot_list_answers_304_without_queries(self):
+        self.add_slot(1)
+        response = self.client.get(self.slots_url)
+        etag = response.headers["ETag"]
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.slots_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached.headers["ETag"], etag)
+        self.assertEqual(cached.content, b"")
+
+    def test_slot_change_produces_new_etag(self):
+        etag = self.client.get(self.slots_url).headers["ETag"]
+
+        self.add_slot(1)
+        response = self.client.get(self.slots_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_etag_depends_on_query(self):
+        plain = self.client.get(self.slots_url).headers["ETag"]
+        filtered = self.client.get(
+            self.slots_url, {"available_only": "True"}
+        ).headers["ETag"]
+        self.assertNotEqual(plain, filtered)
+
+    def test_catalog_supports_last_modified(self):
+        response = self.client.get("/api/specializations/")
+        last_modified = response.headers["Last-Modified"]
+
+        cached = self.client.get(
+            "/api/specializations/", HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        etag = self.client.get(
+            f"/api/doctors/{self.doctor.id}/"
+        ).headers["ETag"]
+        self.doctor.specializations.add(
+            Specialization.objects.create(name="Cardiology", code="cardio")
+        )
+        response = self.client.get(
+            f"/api/doctors/{self.doctor.id}/", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["specializations"], ["Cardiology"])
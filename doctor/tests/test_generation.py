@@ -0,0 +1,73 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from doctor.models import Doctor, DoctorSlot, SlotGenerationJob
+from doctor.services.generation import generate_slots, run_generation_job
+
+
+class SlotGenerationTests(APITestCase):
+    url = "/api/slot-generation-jobs/"
+
+    def setUp(self):
+        self.doctor = Doctor.objects.create(
+            first_name="Gregory", last_name="House", price_per_visit=100
+        )
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="password123"
+        )
+        self.start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        self.end = self.start + timedelta(minutes=300)
+
+    def test_writes_in_batches_and_skips_conflicts(self):
+        DoctorSlot.objects.create(
+            doctor=self.doctor,
+            start=self.start + timedelta(minutes=60),
+            end=self.start + timedelta(minutes=90),
+        )
+        progress = []
+
+        processed, inserted = generate_slots(
+            [self.doctor.id],
+            self.start,
+            self.end,
+            30,
+            batch_size=4,
+            on_progress=lambda *state: progress.append(state),
+        )
+
+        self.assertEqual((processed, inserted), (10, 9))
+        self.assertEqual(progress, [(4, 3), (8, 7), (10, 9)])
+        self.assertEqual(DoctorSlot.objects.count(), 10)
+        self.assertFalse(DoctorSlot.objects.filter(is_booked=True).exists())
+
+    @patch("doctor.tasks.run_slot_generation_job.delay")
+    def test_api_starts_job_and_reports_progress(self, mock_delay):
+        self.client.force_authenticate(self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {
+                "doctors": [self.doctor.id],
+                "interval_start": self.start.isoformat(),
+                "interval_end": self.end.isoformat(),
+                "duration": 60,
+            }, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "PENDING")
+        self.assertEqual(response.data["total"], 5)
+        mock_delay.assert_called_once_with(response.data["id"])
+
+        run_generation_job(response.data["id"], batch_size=2)
+        job = self.client.get(f"{self.url}{response.data['id']}/").data
+
+        self.assertEqual(job["status"], SlotGenerationJob.Status.DONE)
+        self.assertEqual((job["processed"], job["inserted"]), (5, 5))
+
+    def test_api_is_staff_only(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
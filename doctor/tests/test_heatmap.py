@@ -0,0 +1,116 @@
+import base64
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from appointment.models import Appointment
+from doctor.models import Doctor, DoctorSlot, ScheduleTemplate
+from doctor.services.heatmap import build_heatmap, encode_bitmap
+
+
+class AvailabilityHeatmapTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.doctor = Doctor.objects.create(
+            first_name="Gregory", last_name="House", price_per_visit=100
+        )
+        self.patient = get_user_model().objects.create_user(
+            email="patient@example.com", password="password123"
+        )
+        self.day = timezone.localdate() + timedelta(days=1)
+        self.url = f"/api/doctors/{self.doctor.id}/heatmap/"
+
+        self.slots = [
+            self.make_slot(self.day, hour) for hour in (9, 10, 11)
+        ] + [self.make_slot(self.day + timedelta(days=2), 14)]
+
+    def make_slot(self, day, hour):
+        start = timezone.make_aware(datetime.combine(day, time(hour)))
+        return DoctorSlot.objects.create(
+            doctor=self.doctor, start=start, end=start + timedelta(hours=1)
+        )
+
+    def heatmap(self, **params):
+        params.setdefault("from_date", self.day.isoformat())
+        return self.client.get(self.url, params)
+
+    def test_counts_per_day(self):
+        Appointment.objects.create(
+            doctor_slot=self.slots[1], patient=self.patient
+        )
+
+        response = self.heatmap(days=7)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (bucket["start"].date(), bucket["free"], bucket["booked"])
+                for bucket in response.data["buckets"]
+            ],
+            [(self.day, 2, 1), (self.day + timedelta(days=2), 1, 0)],
+        )
+
+    def test_stored_slots_are_counted_by_one_query(self):
+        start = timezone.make_aware(datetime.combine(self.day, time.min))
+
+        with self.assertNumQueries(1):
+            buckets = build_heatmap(
+                self.doctor.id, start, start + timedelta(days=7), bitmap=True
+            )
+
+        self.assertEqual(len(buckets), 2)
+
+    def test_bitmap_encodes_occupancy_in_start_order(self):
+        Appointment.objects.create(
+            doctor_slot=self.slots[1], patient=self.patient
+        )
+
+        response = self.heatmap(days=1, bitmap=True)
+
+        bitmap = response.data["buckets"][0]["bitmap"]
+        self.assertEqual(base64.b64decode(bitmap), bytes([0b01000000]))
+        self.assertEqual(encode_bitmap("101000001"), "oIA=")
+
+    def test_cached_until_slots_or_appointments_change(self):
+        self.heatmap(days=7)
+        with self.assertNumQueries(0):
+            self.heatmap(days=7)
+
+        Appointment.objects.create(
+            doctor_slot=self.slots[0], patient=self.patient
+        )
+        first_day = self.heatmap(days=7).data["buckets"][0]
+        self.assertEqual((first_day["free"], first_day["booked"]), (2, 1))
+
+        self.make_slot(self.day, 15)
+        first_day = self.heatmap(days=7).data["buckets"][0]
+        self.assertEqual((first_day["free"], first_day["booked"]), (3, 1))
+
+    def test_counts_template_slots_past_the_horizon(self):
+        day = self.day + timedelta(days=45)
+        Appointment.objects.create(
+            doctor_slot=self.make_slot(day, 10), patient=self.patient
+        )
+        self.heatmap(from_date=day.isoformat(), days=1)
+
+        # three one-hour slots, the stored 10:00 one wins over its
+        # generated twin; the template also invalidates the cache
+        ScheduleTemplate.objects.create(
+            doctor=self.doctor,
+            weekday=day.weekday(),
+            start_time=time(9),
+            end_time=time(12),
+            slot_duration=60,
+        )
+        response = self.heatmap(from_date=day.isoformat(), days=1, bitmap=True)
+
+        bucket = response.data["buckets"][0]
+        self.assertEqual(bucket["start"].date(), day)
+        self.assertEqual((bucket["free"], bucket["booked"]), (2, 1))
+        self.assertEqual(
+            base64.b64decode(bucket["bitmap"]), bytes([0b01000000])
+        )
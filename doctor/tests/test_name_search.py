@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from appointment.models import Appointment
+from doctor.models import Doctor, DoctorSlot
+from specializations.models import Specialization
+
+User = get_user_model()
+
+
+class TrigramSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.house = Doctor.objects.create(
+            first_name="Gregory", last_name="House", price_per_visit=100
+        )
+        self.wilson = Doctor.objects.create(
+            first_name="James", last_name="Wilson", price_per_visit=100
+        )
+        self.household = Doctor.objects.create(
+            first_name="Anna", last_name="Householder", price_per_visit=100
+        )
+
+    def search_doctors(self, term):
+        response = self.client.get("/api/doctors/", {"search": term})
+        return [doctor["id"] for doctor in response.data["results"]]
+
+    def test_doctor_search_ranks_closest_name_first(self):
+        self.assertEqual(
+            self.search_doctors("house"), [self.house.id, self.household.id]
+        )
+        self.assertEqual(self.search_doctors("gregory house"), [self.house.id])
+
+    def test_doctor_search_tolerates_typos(self):
+        self.assertEqual(
+            self.search_doctors("Housholder"), [self.household.id]
+        )
+        self.assertEqual(self.search_doctors("Cuddy"), [])
+
+    def test_specialization_search_matches_any_field(self):
+        cardio = Specialization.objects.create(
+            name="Cardiology", code="cardio", description="Heart"
+        )
+        Specialization.objects.create(
+            name="Dermatology", code="derm", description="Skin"
+        )
+
+        for term in ("cardio", "HEART", "Kardiology"):
+            response = self.client.get(
+                "/api/specializations/", {"search": term}
+            )
+            self.assertEqual(
+                [spec["id"] for spec in response.data], [cardio.id], term
+            )
+
+    def test_appointment_search_by_patient_or_doctor_name(self):
+        admin = User.objects.create_superuser(
+            email="admin@example.com", password="adminpass"
+        )
+        patient = User.objects.create_user(
+            email="patient@example.com",
+            password="password123",
+            first_name="Lisa",
+            last_name="Cuddy",
+        )
+        start = timezone.now() + timezone.timedelta(days=1)
+        appointments = {
+            doctor: Appointment.objects.create(
+                patient=patient,
+                doctor_slot=DoctorSlot.objects.create(
+                    doctor=doctor,
+                    start=start,
+                    end=start + timezone.timedelta(minutes=30),
+                ),
+            )
+            for doctor in (self.house, self.wilson)
+        }
+        self.client.force_authenticate(user=admin)
+
+        def search(term):
+            response = self.client.get("/api/appointments/", {"search": term})
+            return {item["id"] for item in response.data["results"]}
+
+        self.assertEqual(
+            search("cudy"), {item.id for item in appointments.values()}
+        )
+        self.assertEqual(search("wilson"), {appointments[self.wilson].id})
+        self.assertEqual(search("wilson cuddy"), {appointments[self.wilson].id})
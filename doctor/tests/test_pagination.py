@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from appointment.models import Appointment
+from controller.pagination import KeysetPagination
+from doctor.models import Doctor, DoctorSlot
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.doctor = Doctor.objects.create(
+            first_name="Gregory", last_name="House", price_per_visit=100
+        )
+        self.start = timezone.now() + timezone.timedelta(days=1)
+        self.slots = [self.add_slot(i) for i in range(7)]
+        self.url = f"/api/doctors/{self.doctor.id}/slots/"
+
+    def add_slot(self, index):
+        start = self.start + timezone.timedelta(minutes=30 * index)
+        return DoctorSlot.objects.create(
+            doctor=self.doctor,
+            start=start,
+            end=start + timezone.timedelta(minutes=30),
+        )
+
+    def ids(self, response):
+        return [slot["id"] for slot in response.data["results"]]
+
+    def test_walks_pages_forward_and_back(self):
+        first = self.client.get(self.url, {"limit": 3})
+        self.assertIsNone(first.data["links"]["previous"])
+        self.assertNotIn("count", first.data)
+
+        second = self.client.get(first.data["links"]["next"])
+        third = self.client.get(second.data["links"]["next"])
+        self.assertIsNone(third.data["links"]["next"])
+        self.assertEqual(
+            self.ids(first) + self.ids(second) + self.ids(third),
+            [slot.id for slot in self.slots],
+        )
+
+        back = self.client.get(third.data["links"]["previous"])
+        self.assertEqual(self.ids(back), self.ids(second))
+        self.assertEqual(back.data["links"]["next"], second.data["links"]["next"])
+
+    def test_flat_slot_list_is_paginated(self):
+        first = self.client.get("/api/slots/", {"limit": 4})
+        second = self.client.get(first.data["links"]["next"])
+
+        self.assertEqual(
+            self.ids(first) + self.ids(second),
+            [slot.id for slot in self.slots],
+        )
+        self.assertIsNone(second.data["links"]["next"])
+
+    def test_deep_page_is_one_query_and_stable_under_inserts(self):
+        first = self.client.get(self.url, {"limit": 5})
+        self.add_slot(-1)
+
+        with self.assertNumQueries(1):
+            second = self.client.get(first.data["links"]["next"])
+        self.assertEqual(self.ids(second), [slot.id for slot in self.slots[5:]])
+
+    def test_estimated_count_and_invalid_cursor(self):
+        response = self.client.get(self.url, {"count": "estimate"})
+        self.assertIsInstance(response.data["count"], int)
+
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_walks_search_results_tied_on_rank(self):
+        doctors = [self.doctor] + [
+            Doctor.objects.create(
+                first_name=f"Doctor {i}", last_name="House", price_per_visit=100
+            )
+            for i in range(3)
+        ]
+
+        ids = []
+        response = self.client.get("/api/doctors/", {"search": "hous", "limit": 1})
+        while True:
+            ids += self.ids(response)
+            if not response.data["links"]["next"]:
+                break
+            response = self.client.get(response.data["links"]["next"])
+
+        self.assertEqual(ids, [doctor.id for doctor in doctors])
+
+    def test_nullable_key_field_is_rejected(self):
+        queryset = Appointment.objects.order_by("-completed_at")
+
+        with self.assertRaises(ImproperlyConfigured):
+            KeysetPagination().get_ordering(queryset, view=None)
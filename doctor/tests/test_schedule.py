@@ -0,0 +1,137 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from appointment.models import Appointment
+from doctor.models import (
+    Doctor,
+    DoctorSlot,
+    ScheduleException,
+    ScheduleTemplate,
+)
+from doctor.services.schedule import compute_availability, materialize_horizon
+
+
+def next_weekday(weekday):
+    today = timezone.localdate() + timedelta(days=1)
+    return today + timedelta(days=(weekday - today.weekday()) % 7)
+
+
+def at(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+class ScheduleAvailabilityTests(APITestCase):
+    def setUp(self):
+        self.doctor = Doctor.objects.create(
+            first_name="Gregory", last_name="House", price_per_visit=100
+        )
+        self.monday = next_weekday(ScheduleTemplate.Weekday.MONDAY)
+        ScheduleTemplate.objects.create(
+            doctor=self.doctor,
+            weekday=ScheduleTemplate.Weekday.MONDAY,
+            start_time=time(9),
+            end_time=time(11),
+            slot_duration=30,
+        )
+        self.patient = get_user_model().objects.create_user(
+            email="patient@example.com", password="password123"
+        )
+        self.availability_url = f"/api/doctors/{self.doctor.id}/availability/"
+        self.materialize_url = self.availability_url + "materialize/"
+
+    def window(self):
+        return {
+            "from_date": at(self.monday, 0).isoformat(),
+            "to_date": at(self.monday + timedelta(days=1), 0).isoformat(),
+        }
+
+    def test_availability_is_computed_without_materializing(self):
+        response = self.client.get(self.availability_url, self.window())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 4)
+        self.assertIsNone(response.data[0]["slot_id"])
+        self.assertFalse(DoctorSlot.objects.exists())
+
+    def test_exceptions_and_booked_slots_are_excluded(self):
+        ScheduleException.objects.create(
+            doctor=self.doctor,
+            date=self.monday,
+            start_time=time(10),
+            end_time=time(10, 30),
+        )
+        booked = DoctorSlot.objects.create(
+            doctor=self.doctor,
+            start=at(self.monday, 9),
+            end=at(self.monday, 9, 30),
+        )
+        Appointment.objects.create(doctor_slot=booked, patient=self.patient)
+
+        slots = compute_availability(
+            self.doctor.id, at(self.monday, 0), at(self.monday, 23)
+        )
+
+        self.assertEqual(
+            [slot.start for slot in slots],
+            [at(self.monday, 9, 30), at(self.monday, 10, 30)],
+        )
+
+    def test_whole_day_exception_blocks_every_slot(self):
+        ScheduleException.objects.create(doctor=self.doctor, date=self.monday)
+
+        response = self.client.get(self.availability_url, self.window())
+
+        self.assertEqual(response.data, [])
+
+    def test_materialize_creates_slot_once(self):
+        self.client.force_authenticate(self.patient)
+        payload = {"start": at(self.monday, 9, 30).isoformat()}
+
+        first = self.client.post(self.materialize_url, payload)
+        second = self.client.post(self.materialize_url, payload)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data["id"], second.data["id"])
+        self.assertEqual(DoctorSlot.objects.count(), 1)
+
+    def test_materialize_rejects_time_outside_schedule(self):
+        self.client.force_authenticate(self.patient)
+
+        response = self.client.post(
+            self.materialize_url, {"start": at(self.monday, 9, 15).isoformat()}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(DoctorSlot.objects.exists())
+
+
+class ScheduleHorizonTests(TestCase):
+    def setUp(self):
+        self.doctor = Doctor.objects.create(
+            first_name="James", last_name="Wilson", price_per_visit=100
+        )
+        ScheduleTemplate.objects.create(
+            doctor=self.doctor,
+            weekday=ScheduleTemplate.Weekday.WEDNESDAY,
+            start_time=time(14),
+            end_time=time(15),
+            slot_duration=20,
+        )
+
+    def test_horizon_materializes_scheduled_slots_idempotently(self):
+        materialize_horizon(days=14)
+        slots = DoctorSlot.objects.filter(doctor=self.doctor)
+        count = slots.count()
+
+        materialize_horizon(days=14)
+
+        # 14 days always hold at least one whole Wednesday
+        self.assertGreaterEqual(count, 3)
+        self.assertEqual(slots.count(), count)
+        self.assertTrue(all(slot.start.weekday() == 2 for slot in slots))
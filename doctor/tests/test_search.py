@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from appointment.models import Appointment
+from doctor.models import Doctor, DoctorSlot
+from specializations.models import Specialization
+
+
+class FirstAvailableSlotSearchTests(APITestCase):
+    url = "/api/slots/search/"
+
+    def setUp(self):
+        self.cardio = Specialization.objects.create(
+            name="Cardiology", code="cardio"
+        )
+        self.derm = Specialization.objects.create(
+            name="Dermatology", code="derm"
+        )
+        self.house = Doctor.objects.create(
+            first_name="Gregory", last_name="House", price_per_visit=100
+        )
+        self.wilson = Doctor.objects.create(
+            first_name="James", last_name="Wilson", price_per_visit=100
+        )
+        self.cuddy = Doctor.objects.create(
+            first_name="Lisa", last_name="Cuddy", price_per_visit=100
+        )
+        self.house.specializations.add(self.cardio)
+        self.wilson.specializations.add(self.cardio, self.derm)
+        self.cuddy.specializations.add(self.derm)
+
+        self.base = timezone.now() + timezone.timedelta(days=1)
+        self.house_early = self.make_slot(self.house, 60)
+        self.house_late = self.make_slot(self.house, 180)
+        self.wilson_mid = self.make_slot(self.wilson, 120)
+        self.cuddy_first = self.make_slot(self.cuddy, 0)
+
+    def make_slot(self, doctor, offset_minutes):
+        start = self.base + timezone.timedelta(minutes=offset_minutes)
+        return DoctorSlot.objects.create(
+            doctor=doctor,
+            start=start,
+            end=start + timezone.timedelta(minutes=30),
+        )
+
+    def search(self, **params):
+        return self.client.get(self.url, params)
+
+    def test_returns_earliest_slots_across_doctors(self):
+        response = self.search(specializations="cardio", limit=2)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [slot["id"] for slot in response.data],
+            [self.house_early.id, self.wilson_mid.id],
+        )
+        self.assertEqual(response.data[0]["doctor"]["last_name"], "House")
+
+    def test_skips_booked_slots(self):
+        patient = get_user_model().objects.create_user(
+            email="patient@example.com", password="password123"
+        )
+        Appointment.objects.create(doctor_slot=self.house_early, patient=patient)
+
+        response = self.search(specializations=str(self.cardio.id))
+
+        self.assertEqual(
+            [slot["id"] for slot in response.data],
+            [self.wilson_mid.id, self.house_late.id],
+        )
+
+    def test_respects_time_window_and_mixed_specializations(self):
+        response = self.search(
+            specializations=f"derm,{self.cardio.id}",
+            from_date=(self.base + timezone.timedelta(minutes=30)).isoformat(),
+            to_date=(self.base + timezone.timedelta(minutes=150)).isoformat(),
+        )
+
+        self.assertEqual(
+            [slot["id"] for slot in response.data],
+            [self.house_early.id, self.wilson_mid.id],
+        )
+
+    def test_never_returns_past_slots(self):
+        past = DoctorSlot.objects.create(
+            doctor=self.house,
+            start=timezone.now() - timezone.timedelta(days=2),
+            end=timezone.now() - timezone.timedelta(days=2, minutes=-30),
+        )
+
+        response = self.search(
+            specializations="cardio",
+            from_date=(past.start - timezone.timedelta(days=1)).isoformat(),
+        )
+
+        self.assertNotIn(past.id, [slot["id"] for slot in response.data])
+        self.assertEqual(response.data[0]["id"], self.house_early.id)
+
+    def test_requires_specialization(self):
+        response = self.search(specializations=",")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,3 +1,5 @@
+import json
+
 from django.test import TestCase
 from django.utils import timezone
 from django.contrib.auth import get_user_model
@@ -5,6 +7,7 @@ from django.db import IntegrityError
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 
+from appointment.models import Appointment
 from ..models import Doctor, DoctorSlot
 from ..serializers import DoctorSlotSerializer
 
@@ -50,6 +53,45 @@ class DoctorSlotTests(TestCase):
         with self.assertRaises(IntegrityError):
             DoctorSlot.objects.create(doctor=self.doctor, start=start, end=end)
 
+    def test_overlap_is_excluded_per_doctor(self):
+        other = Doctor.objects.create(
+            first_name="Jane", last_name="Roe", price_per_visit=100
+        )
+        start = timezone.now()
+        DoctorSlot.objects.create(
+            doctor=self.doctor, start=start, end=start + timezone.timedelta(hours=1)
+        )
+
+        DoctorSlot.objects.create(
+            doctor=other, start=start, end=start + timezone.timedelta(hours=1)
+        )
+        with self.assertRaises(IntegrityError):
+            DoctorSlot.objects.create(
+                doctor=self.doctor,
+                start=start + timezone.timedelta(minutes=30),
+                end=start + timezone.timedelta(hours=2),
+            )
+
+    def test_range_helpers(self):
+        start = timezone.now()
+        hour = timezone.timedelta(hours=1)
+        first = DoctorSlot.objects.create(
+            doctor=self.doctor, start=start, end=start + hour
+        )
+        second = DoctorSlot.objects.create(
+            doctor=self.doctor, start=start + hour, end=start + 2 * hour
+        )
+        slots = DoctorSlot.objects.for_doctor(self.doctor)
+
+        self.assertEqual(
+            list(slots.overlapping(start + hour / 2, start + hour)), [first]
+        )
+        self.assertEqual(
+            list(slots.overlapping(start + hour, start + 3 * hour)), [second]
+        )
+        self.assertEqual(list(slots.within(start=start + hour)), [second])
+        self.assertEqual(list(slots.within(end=start + hour)), [first])
+
     def test_ordering_by_start(self):
         now = timezone.now()
         later = now + timezone.timedelta(hours=2)
@@ -285,3 +327,203 @@ class DoctorSlotBulkCreateAPITests(APITestCase):
 
         serializer = DoctorSlotSerializer(data=data, many=True)
         self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class DoctorSlotBookingStateTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.patient = User.objects.create_user(
+            email="patient@example.com", password="password123"
+        )
+        self.doctor = Doctor.objects.create(
+            first_name="John", last_name="Doe", price_per_visit=100
+        )
+        start = timezone.now() + timezone.timedelta(days=1)
+        self.slot = DoctorSlot.objects.create(
+            doctor=self.doctor,
+            start=start,
+            end=start + timezone.timedelta(minutes=30),
+        )
+        self.free_slot = DoctorSlot.objects.create(
+            doctor=self.doctor,
+            start=start + timezone.timedelta(hours=1),
+            end=start + timezone.timedelta(hours=1, minutes=30),
+        )
+
+    def book(self):
+        return Appointment.objects.create(
+            doctor_slot=self.slot, patient=self.patient
+        )
+
+    def test_booking_marks_slot_as_booked(self):
+        appointment = self.book()
+        self.slot.refresh_from_db()
+        self.assertTrue(self.slot.is_booked)
+        self.assertEqual(self.slot.active_appointment_id, appointment.id)
+
+    def test_cancel_frees_slot_and_complete_keeps_it(self):
+        appointment = self.book()
+        appointment.status = appointment.Status.COMPLETED
+        appointment.save()
+        self.slot.refresh_from_db()
+        self.assertTrue(self.slot.is_booked)
+
+        appointment.status = appointment.Status.CANCELLED
+        appointment.save()
+        self.slot.refresh_from_db()
+        self.assertFalse(self.slot.is_booked)
+        self.assertIsNone(self.slot.active_appointment_id)
+
+    def test_cancelled_appointment_does_not_free_rebooked_slot(self):
+        cancelled = self.book()
+        cancelled.status = cancelled.Status.CANCELLED
+        cancelled.save()
+        active = self.book()
+
+        cancelled.save()
+        self.slot.refresh_from_db()
+        self.assertTrue(self.slot.is_booked)
+        self.assertEqual(self.slot.active_appointment_id, active.id)
+
+    def test_deleting_appointment_frees_slot(self):
+        self.book().delete()
+        self.slot.refresh_from_db()
+        self.assertFalse(self.slot.is_booked)
+        self.assertIsNone(self.slot.active_appointment_id)
+
+    def test_available_only_filter_uses_booking_state(self):
+        self.book()
+        response = self.client.get(
+            f"/api/doctors/{self.doctor.pk}/slots/?available_only=True"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [slot["id"] for slot in response.data["results"]],
+            [self.free_slot.id],
+        )
+
+
+class DoctorSlotStreamingTests(APITestCase):
+    def setUp(self):
+        self.doctor = Doctor.objects.create(
+            first_name="John", last_name="Doe", price_per_visit=100
+        )
+        start = timezone.now() + timezone.timedelta(days=1)
+        self.slots = [
+            DoctorSlot.objects.create(
+                doctor=self.doctor,
+                start=start + timezone.timedelta(minutes=30 * i),
+                end=start + timezone.timedelta(minutes=30 * (i + 1)),
+            )
+            for i in range(3)
+        ]
+        self.url = f"/api/doctors/{self.doctor.pk}/slots/"
+
+    def read(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_stream_ndjson(self):
+        response = self.client.get(self.url, {"stream": "ndjson"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        lines = self.read(response).splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["id"] for row in rows],
+                         [slot.id for slot in self.slots])
+        self.assertEqual(rows[0]["doctor"], self.doctor.id)
+
+    def test_stream_json_array_matches_regular_list(self):
+        regular = self.client.get(self.url)
+        streamed = self.client.get(self.url, {"stream": "json"})
+
+        self.assertEqual(json.loads(self.read(streamed)),
+                         json.loads(regular.content)["results"])
+
+    def test_stream_respects_filters(self):
+        from_date = self.slots[1].start.isoformat()
+        response = self.client.get(
+            self.url, {"stream": "ndjson", "from_date": from_date}
+        )
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 2)
+
+
+class DoctorSlotBatchOverlapTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.admin_user = User.objects.create_superuser(
+            email="admin@example.com", password="adminpass"
+        )
+        self.doctor = Doctor.objects.create(
+            first_name="Jane", last_name="Smith", price_per_visit=150
+        )
+        self.base = timezone.now() + timezone.timedelta(days=1)
+        self.existing = DoctorSlot.objects.create(
+            doctor=self.doctor,
+            start=self.base + timezone.timedelta(hours=5),
+            end=self.base + timezone.timedelta(hours=6),
+        )
+        self.url = f"/api/doctors/{self.doctor.pk}/slots/"
+        self.client.force_authenticate(user=self.admin_user)
+
+    def slot(self, start_hours, end_hours):
+        return {
+            "start": (self.base + timezone.timedelta(hours=start_hours))
+            .isoformat(),
+            "end": (self.base + timezone.timedelta(hours=end_hours))
+            .isoformat(),
+        }
+
+    def test_reports_every_conflicting_item(self):
+        data = [
+            self.slot(0, 2),
+            self.slot(1, 3),
+            self.slot(3, 4),
+            self.slot(1.5, 1.75),
+            self.slot(5.5, 7),
+        ]
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        overlaps = response.data["overlaps"]
+        self.assertEqual(
+            sorted(int(item["index"]) for item in overlaps), [1, 3, 4]
+        )
+        existing = [item for item in overlaps if "conflicts_with_slot" in item]
+        self.assertEqual(len(existing), 1)
+        self.assertEqual(
+            int(existing[0]["conflicts_with_slot"]), self.existing.id
+        )
+        self.assertEqual(DoctorSlot.objects.count(), 1)
+
+    def test_batch_validation_uses_single_query(self):
+        data = [
+            {
+                "start": self.base + timezone.timedelta(hours=10 + i),
+                "end": self.base + timezone.timedelta(hours=11 + i),
+            }
+            for i in range(50)
+        ]
+        serializer = DoctorSlotSerializer(
+            data=data,
+            many=True,
+            context={"nested_create": True, "doctor_id": self.doctor.pk},
+        )
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_interval_overlapping_existing_slot_rejected(self):
+        data = {
+            "interval_start": self.base.isoformat(),
+            "interval_end": (self.base + timezone.timedelta(hours=8))
+            .isoformat(),
+            "duration": 60,
+        }
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["overlapping_slots"], [self.existing.id]
+        )
+        self.assertEqual(DoctorSlot.objects.count(), 1)
@@ -1,10 +1,22 @@
 from django.urls import path, include
 from rest_framework_nested import routers
-from .views import DoctorViewSet, DoctorSlotNestedViewSet, DoctorSlotViewSet
+from .views import (
+    DoctorViewSet,
+    DoctorSlotNestedViewSet,
+    DoctorSlotViewSet,
+    ScheduleExceptionViewSet,
+    ScheduleTemplateViewSet,
+    SlotGenerationJobViewSet,
+)
 
 router = routers.DefaultRouter()
 router.register("doctors", DoctorViewSet, basename="doctor")
 router.register("slots", DoctorSlotViewSet, basename="slot")
+router.register(
+    "slot-generation-jobs",
+    SlotGenerationJobViewSet,
+    basename="slot-generation-job"
+)
 
 doctor_router = routers.NestedDefaultRouter(
     router,
@@ -17,6 +29,16 @@ doctor_router.register(
     DoctorSlotNestedViewSet,
     basename="doctor-slots"
 )
+doctor_router.register(
+    "schedule-templates",
+    ScheduleTemplateViewSet,
+    basename="doctor-schedule-templates"
+)
+doctor_router.register(
+    "schedule-exceptions",
+    ScheduleExceptionViewSet,
+    basename="doctor-schedule-exceptions"
+)
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -1,54 +1,249 @@
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, status, mixins
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from controller.cache import get_or_compute
+from controller.filters import TrigramSearchFilter
+from controller.mixins import CachedListMixin, ConditionalGetMixin
+from controller.pagination import KeysetPagination
+from specializations.models import Specialization
 from user.permissions import IsAdminOrReadOnly
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 
-from .models import Doctor, DoctorSlot
+from .models import (
+    Doctor,
+    DoctorSlot,
+    ScheduleException,
+    ScheduleTemplate,
+    SlotGenerationJob,
+)
 from .serializers import (
+    AvailabilityQuerySerializer,
+    AvailableSlotSerializer,
+    HeatmapQuerySerializer,
+    MaterializeSlotSerializer,
+    ScheduleExceptionSerializer,
+    ScheduleTemplateSerializer,
+    SlotGenerationJobSerializer,
     DoctorSerializer,
     DoctorSlotSerializer,
     DoctorSlotDetailSerializer,
     DoctorSlotIntervalSerializer,
+    DoctorSlotSearchSerializer,
 )
 from .filters import DoctorFilter, DoctorSlotFilter
+from .tasks import run_slot_generation_job
+from .services.heatmap import (
+    HEATMAP_CACHE_TIMEOUT,
+    build_heatmap,
+    heatmap_cache_key,
+    invalidate_doctor_slots,
+    slot_cache_namespace,
+)
+from .services.overlaps import BatchSlot, find_existing_overlaps
+from .services.schedule import (
+    ScheduleError,
+    compute_availability,
+    materialize_slot,
+)
+from .services.search import first_available_slots
+from .services.streaming import (
+    iter_serialized,
+    stream_rows,
+    STREAM_CONTENT_TYPES,
+)
 
 
-class DoctorViewSet(viewsets.ModelViewSet):
+class DoctorViewSet(
+    ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet
+):
     queryset = Doctor.objects.all()
     serializer_class = DoctorSerializer
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, TrigramSearchFilter]
     filterset_class = DoctorFilter
+    search_fields = ["last_name", "first_name"]
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("id",)
+    cache_models = (Doctor, Specialization)
 
     @extend_schema(
         summary="List doctors",
         description="Retrieve a list of doctors. "
                     "Filter by specialization code or id using the "
-                    "'specialization' query parameter.",
+                    "'specialization' query parameter, search by name "
+                    "with 'search' (best matches first).",
         parameters=[
             OpenApiParameter(
                 name="specialization",
                 type=OpenApiTypes.STR,
                 description="Filter doctors by specialization code or id",
             ),
+            OpenApiParameter(
+                name="search",
+                type=OpenApiTypes.STR,
+                description="Search doctors by first or last name, "
+                            "tolerates typos",
+            ),
         ],
     )
     def list(self, request, *args, **kwargs):
+        return self.cached_list_response(request, self.build_list_data)
+
+    def build_list_data(self):
         queryset = self.filter_queryset(
             self.get_queryset().prefetch_related("specializations")
         )
-        queryset = queryset.distinct()
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(serializer.data).data
 
         serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return serializer.data
+
+    @extend_schema(
+        summary="Doctor availability",
+        description="Slots of the doctor in a time window, computed on "
+                    "the fly from the weekly schedule templates and "
+                    "exceptions, merged with already stored slots. "
+                    "Slots that are not stored yet have an empty slot_id.",
+        parameters=[AvailabilityQuerySerializer],
+        responses={200: AvailableSlotSerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def availability(self, request, pk=None):
+        doctor = self.get_object()
+        params = AvailabilityQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        slots = compute_availability(
+            doctor.id,
+            data["from_date"],
+            data["to_date"],
+            available_only=data["available_only"],
+        )
+        return Response(AvailableSlotSerializer(slots, many=True).data)
+
+    @extend_schema(
+        summary="Doctor availability heatmap",
+        description="Free and booked slot counts of the doctor per day "
+                    "(or hour), stored slots and the ones generated from "
+                    "the schedule templates alike, optionally with a "
+                    "base64 occupancy bitmap per bucket. Cached until "
+                    "the doctor's slots, schedule or appointments change.",
+        parameters=[HeatmapQuerySerializer],
+    )
+    @action(detail=True, methods=["get"])
+    def heatmap(self, request, pk=None):
+        params = HeatmapQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        key = heatmap_cache_key(
+            pk, data["start"], data["end"], data["granularity"], data["bitmap"]
+        )
+
+        def build_payload():
+            doctor = self.get_object()
+            return {
+                "doctor": doctor.id,
+                "from_date": data["from_date"],
+                "days": data["days"],
+                "granularity": data["granularity"],
+                "buckets": build_heatmap(
+                    doctor.id,
+                    data["start"],
+                    data["end"],
+                    granularity=data["granularity"],
+                    bitmap=data["bitmap"],
+                ),
+            }
+
+        return Response(
+            get_or_compute(key, build_payload, HEATMAP_CACHE_TIMEOUT)
+        )
+
+    @extend_schema(
+        summary="Materialize a scheduled slot",
+        description="Store the slot of the doctor's schedule starting at "
+                    "the given time so it can be booked. Returns the "
+                    "existing slot if it is already stored.",
+        request=MaterializeSlotSerializer,
+        responses={
+            200: DoctorSlotSerializer,
+            201: DoctorSlotSerializer,
+            400: {"description": "No such slot in the schedule"},
+        },
+    )
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="availability/materialize",
+        permission_classes=[IsAuthenticated],
+    )
+    def materialize(self, request, pk=None):
+        doctor = self.get_object()
+        serializer = MaterializeSlotSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            slot, created = materialize_slot(
+                doctor.id, serializer.validated_data["start"]
+            )
+        except ScheduleError as exc:
+            return Response(
+                {"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            DoctorSlotSerializer(slot).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
+class ScheduleTemplateViewSet(viewsets.ModelViewSet):
+    """
+    Nested viewset for /doctors/<doctor_id>/schedule-templates/
+    Weekly rules the doctor's availability is computed from.
+    """
+
+    serializer_class = ScheduleTemplateSerializer
+    permission_classes = [IsAdminOrReadOnly]
+
+    def get_queryset(self):
+        return ScheduleTemplate.objects.filter(
+            doctor_id=self.kwargs["doctor_pk"]
+        )
+
+    def perform_create(self, serializer):
+        serializer.save(doctor_id=self.kwargs["doctor_pk"])
+
+
+class ScheduleExceptionViewSet(viewsets.ModelViewSet):
+    """
+    Nested viewset for /doctors/<doctor_id>/schedule-exceptions/
+    Days off and blocked periods that override the weekly rules.
+    """
+
+    serializer_class = ScheduleExceptionSerializer
+    permission_classes = [IsAdminOrReadOnly]
+
+    def get_queryset(self):
+        return ScheduleException.objects.filter(
+            doctor_id=self.kwargs["doctor_pk"]
+        )
+
+    def perform_create(self, serializer):
+        serializer.save(doctor_id=self.kwargs["doctor_pk"])
 
 
 class DoctorSlotNestedViewSet(
+    ConditionalGetMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet
@@ -62,10 +257,15 @@ class DoctorSlotNestedViewSet(
     filter_backends = [DjangoFilterBackend]
     filterset_class = DoctorSlotFilter
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("start", "id")
+    conditional_actions = ("list",)
 
     def get_queryset(self):
-        doctor_id = self.kwargs["doctor_pk"]
-        return DoctorSlot.objects.filter(doctor_id=doctor_id)
+        return DoctorSlot.objects.for_doctor(self.kwargs["doctor_pk"])
+
+    def get_conditional_namespaces(self):
+        return [slot_cache_namespace(self.kwargs["doctor_pk"])]
 
     @extend_schema(
         summary="List doctor slots",
@@ -89,14 +289,32 @@ class DoctorSlotNestedViewSet(
                 description="If True, show only slots "
                             "without booked appointment",
             ),
+            OpenApiParameter(
+                name="stream",
+                type=OpenApiTypes.STR,
+                enum=list(STREAM_CONTENT_TYPES),
+                description="Stream slots as NDJSON lines or as a "
+                            "chunked JSON array instead of building "
+                            "the whole response in memory",
+            ),
         ],
     )
     def list(self, request, doctor_pk=None):
         qs = self.get_queryset()
         filterset = self.filterset_class(request.GET, queryset=qs)
         qs = filterset.qs
-        serializer = DoctorSlotSerializer(qs, many=True)
-        return Response(serializer.data)
+
+        fmt = request.query_params.get("stream")
+        if fmt in STREAM_CONTENT_TYPES:
+            rows = iter_serialized(qs, DoctorSlotSerializer)
+            return StreamingHttpResponse(
+                stream_rows(rows, fmt),
+                content_type=STREAM_CONTENT_TYPES[fmt],
+            )
+
+        page = self.paginate_queryset(qs)
+        serializer = DoctorSlotSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @extend_schema(
         summary="Create doctor slots",
@@ -156,7 +374,9 @@ class DoctorSlotNestedViewSet(
                 normalized.append(slot_copy)
 
             serializer = DoctorSlotSerializer(
-                data=normalized, many=True, context={"nested_create": True}
+                data=normalized,
+                many=True,
+                context={"nested_create": True, "doctor_id": doctor_pk},
             )
             serializer.is_valid(raise_exception=True)
             slots = [(d["start"], d["end"]) for d in serializer.validated_data]
@@ -166,6 +386,22 @@ class DoctorSlotNestedViewSet(
             interval_ser.is_valid(raise_exception=True)
             slots = interval_ser.generate_slots()
 
+            overlaps = find_existing_overlaps([
+                BatchSlot(index, doctor_pk, start, end)
+                for index, (start, end) in enumerate(slots)
+            ])
+            if overlaps:
+                return Response(
+                    {
+                        "detail": "Generated slots overlap with existing "
+                                  "slots of the doctor.",
+                        "overlapping_slots": sorted(
+                            {slot_id for _, slot_id in overlaps}
+                        ),
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
         else:
             return Response(
                 {"detail": "Expected list of slots or interval object"},
@@ -177,6 +413,7 @@ class DoctorSlotNestedViewSet(
             for start, end in slots
         ]
         created = DoctorSlot.objects.bulk_create(slots_to_create)
+        invalidate_doctor_slots(doctor_pk)
 
         out_serializer = DoctorSlotSerializer(created, many=True)
         return Response(out_serializer.data, status=status.HTTP_201_CREATED)
@@ -193,7 +430,9 @@ class DoctorSlotNestedViewSet(
     )
     def destroy(self, request, doctor_pk=None, pk=None):
         slot = self.get_object()
-        if slot.appointment.exists():
+        # booked slots are refused without a query,
+        # free ones are still protected if they keep cancelled history
+        if slot.is_booked or slot.appointment.exists():
             return Response(
                 {"detail": "Cannot delete slot with existing "
                            "appointment"},
@@ -217,13 +456,41 @@ class DoctorSlotViewSet(
     queryset = DoctorSlot.objects.all()
     serializer_class = DoctorSlotSerializer
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("start", "id")
 
     def get_serializer_class(self):
-        """Use detail serializer for retrieve action."""
-        if self.action == "retrieve":
+        """Use detail serializer for retrieve and search actions."""
+        if self.action in ["retrieve", "search"]:
             return DoctorSlotDetailSerializer
         return DoctorSlotSerializer
 
+    @extend_schema(
+        summary="Search first available slots",
+        description="Earliest free slots across all doctors with any of "
+                    "the given specializations within a time window "
+                    "starting no earlier than now. Only stored slots are "
+                    "searched, so days past the materialization horizon "
+                    "show no schedule-generated slots.",
+        parameters=[DoctorSlotSearchSerializer],
+        responses={200: DoctorSlotDetailSerializer(many=True)},
+    )
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        params = DoctorSlotSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        slots = first_available_slots(
+            ids=data["ids"],
+            codes=data["codes"],
+            start=data["from_date"],
+            end=data["to_date"],
+            limit=data["limit"],
+        )
+        serializer = self.get_serializer(slots, many=True)
+        return Response(serializer.data)
+
     @extend_schema(
         summary="Delete a doctor slot",
         description="Delete a slot if it has no associated appointment.",
@@ -236,7 +503,9 @@ class DoctorSlotViewSet(
     )
     def destroy(self, request, pk=None):
         slot = self.get_object()
-        if slot.appointment.exists():
+        # booked slots are refused without a query,
+        # free ones are still protected if they keep cancelled history
+        if slot.is_booked or slot.appointment.exists():
             return Response(
                 {"detail": "Cannot delete slot with existing "
                            "appointment"},
@@ -244,3 +513,35 @@ class DoctorSlotViewSet(
             )
         slot.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SlotGenerationJobViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.CreateModelMixin,
+    viewsets.GenericViewSet
+):
+    """
+    /slot-generation-jobs/
+    POST starts bulk generation for many doctors in the background,
+    GET reports its progress.
+    """
+
+    queryset = SlotGenerationJob.objects.prefetch_related("doctors")
+    serializer_class = SlotGenerationJobSerializer
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        summary="Start bulk slot generation",
+        description="Generate slots of `duration` minutes over the interval "
+                    "for every listed doctor in a background job. Slots "
+                    "that conflict with existing ones are skipped. Poll "
+                    "the returned job for progress.",
+        responses={202: SlotGenerationJobSerializer},
+    )
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save()
+        transaction.on_commit(lambda: run_slot_generation_job.delay(job.id))
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
@@ -17,7 +17,7 @@ class Command(BaseCommand):
     def handle(self, *args, **kwargs):
         total = kwargs["total"]
         patient = User.objects.filter(is_staff=False).first()
-        slots = DoctorSlot.objects.filter(appointment__isnull=True)[:total]
+        slots = DoctorSlot.objects.filter(is_booked=False)[:total]
 
         if not slots.exists():
             self.stdout.write(self.style.ERROR("No free slots!"))
@@ -1,9 +1,8 @@
-from django.db.models.signals import post_save, pre_save
-from django.db import transaction
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from dataclasses import dataclass
 
-from appointment.models import Appointment
+from controller.outbox import enqueue_task
 from payment.models import Payment
 from .tasks import notify_admin_task
 
@@ -33,35 +32,6 @@ class AppointmentDTO:
         )
 
 
-@receiver(pre_save, sender=Appointment)
-def capture_old_status(sender, instance, **kwargs):
-    """
-    Capture old status from DB before save
-    """
-    if instance.pk:
-        try:
-            old_obj = sender.objects.get(pk=instance.pk)
-            instance._old_status = old_obj.status
-        except sender.DoesNotExist:
-            instance._old_status = None
-    else:
-        instance._old_status = None
-
-
-@receiver(post_save, sender=Appointment)
-def appointment_notification_signal(sender, instance, created, **kwargs):
-    if created:
-        send_appointment_msg(instance, "created")
-        return
-
-    old_status = getattr(instance, "_old_status", None)
-
-    if old_status != instance.status:
-        send_appointment_msg(instance, "updated")
-    else:
-        pass
-
-
 def send_appointment_msg(instance, event):
     dto = AppointmentDTO(
         id_=instance.id,
@@ -72,37 +42,47 @@ def send_appointment_msg(instance, event):
         slot_time=instance.doctor_slot.start.strftime("%Y-%m-%d %H:%M"),
         price=str(instance.price)
     )
-    notify_admin_task.delay(dto.to_message(event))
+    enqueue_task(notify_admin_task, dto.to_message(event))
 
 
 @receiver(post_save, sender=Payment)
 def payment_notification_signal(sender, instance, created, **kwargs):
     """
         The signal reacts to a change in the payment status.
-        We use transaction.on_commit so that the message is sent only
+        The message goes through the outbox, so it is sent only
         after the status is actually committed to the database.
         """
 
-    if instance.status == Payment.Status.PAID:
+    message = payment_status_message(instance)
+    if message:
+        enqueue_task(notify_admin_task, message)
+
+
+def payment_status_message(payment):
+    """
+    Admin message for a paid or expired payment, None for other statuses.
+    Bulk status updates that bypass the signal send it themselves.
+    """
+    if payment.status == Payment.Status.PAID:
         status_type = "success"
-    elif instance.status == Payment.Status.EXPIRED:
+    elif payment.status == Payment.Status.EXPIRED:
         status_type = "failed"
     else:
-        return
+        return None
 
     icon = "✅" if status_type == "success" else "❌"
     msg_title = ("Оплата отримана" if status_type == "success"
                  else "Оплата відмінена")
 
-    patient_name = (f"{instance.appointment.patient.first_name} "
-                    f"{instance.appointment.patient.last_name}")
+    patient_name = (f"{payment.appointment.patient.first_name} "
+                    f"{payment.appointment.patient.last_name}")
 
     message = (
         f"{icon} **{msg_title}**\n"
-        f"🆔 Номер запису: #{instance.appointment.id}\n"
+        f"🆔 Номер запису: #{payment.appointment.id}\n"
         f"👤 Пацієнт: {patient_name}\n"
-        f"💰 Сума: ${instance.money_to_pay}\n"
-        f"🚩 Тип: {instance.get_payment_type_display()}"
+        f"💰 Сума: ${payment.money_to_pay}\n"
+        f"🚩 Тип: {payment.get_payment_type_display()}"
     )
 
-    transaction.on_commit(lambda: notify_admin_task.delay(message))
+    return message
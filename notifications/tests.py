@@ -5,8 +5,9 @@ from unittest.mock import patch
 from datetime import timedelta
 
 from appointment.models import Appointment, DoctorSlot
+from controller.models import OutboxMessage
 from doctor.models import Doctor
-from notifications.tasks import check_no_shows_daily
+from notifications.tasks import check_no_shows_daily, notify_admin_task
 
 User = get_user_model()
 
@@ -31,37 +32,37 @@ class NotificationsTest(TestCase):
             end=timezone.now() + timedelta(days=1, hours=1)
         )
 
-    @patch("notifications.tasks.notify_admin_task.delay")
-    def test_signal_create_appointment(self, mock_notify_task):
+    def queued_notifications(self):
+        return OutboxMessage.objects.filter(task=notify_admin_task.name)
+
+    def test_signal_create_appointment(self):
         Appointment.objects.create(
             doctor_slot=self.slot,
             patient=self.user,
             status=Appointment.Status.BOOKED
         )
-        mock_notify_task.assert_called()
+        self.assertTrue(self.queued_notifications().exists())
 
-    @patch("notifications.tasks.notify_admin_task.delay")
-    def test_signal_update_status_sends_notification(self, mock_notify_task):
+    def test_signal_update_status_sends_notification(self):
         appt = Appointment.objects.create(
             doctor_slot=self.slot,
             patient=self.user,
             status=Appointment.Status.BOOKED
         )
-        mock_notify_task.reset_mock()
+        self.queued_notifications().delete()
         appt.status = Appointment.Status.COMPLETED
         appt.save()
-        self.assertTrue(mock_notify_task.called)
+        self.assertTrue(self.queued_notifications().exists())
 
-    @patch("notifications.tasks.notify_admin_task.delay")
-    def test_signal_no_notification_if_status_unchanged(self, mock_notify_task):
+    def test_signal_no_notification_if_status_unchanged(self):
         appt = Appointment.objects.create(
             doctor_slot=self.slot,
             patient=self.user,
             status=Appointment.Status.BOOKED
         )
-        mock_notify_task.reset_mock()
+        self.queued_notifications().delete()
         appt.save()
-        mock_notify_task.assert_not_called()
+        self.assertFalse(self.queued_notifications().exists())
 
     @patch("notifications.tasks.send_telegram_message")
     @patch("notifications.tasks.notify_admin_task.apply_async")
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class PaymentConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "payment"
+
+    def ready(self):
+        import payment.signals  # noqa
+        from payment.services.stripe_gateway import configure
+
+        configure()
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from payment.services.ledger import reconcile_balances
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the balance ledger from Payment in one pass and report the
+    accounts that had drifted. Safe to rerun.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the drift, do not correct it",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            accounts, drift = reconcile_balances(dry_run=options["dry_run"])
+        action = "Found" if options["dry_run"] else "Corrected"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {accounts} account(s) off by {drift} in total"
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:20
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The index is built without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ("appointment", "0005_keyset_index"),
+        ("payment", "0005_payment_unique_appointment"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="payment",
+            index=models.Index(
+                fields=["created_at", "id"], name="payment_created_at_id"
+            ),
+        ),
+    ]
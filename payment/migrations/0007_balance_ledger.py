@@ -0,0 +1,100 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:30
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+# Opening balances: pending payments that exist before the ledger does.
+OPENING_BALANCES_SQL = """
+INSERT INTO payment_balanceaccount (user_id, balance, updated_at)
+SELECT a.patient_id, SUM(p.money_to_pay), now()
+FROM payment_payment p
+JOIN appointment_appointment a ON a.id = p.appointment_id
+WHERE p.status = 'PENDING'
+GROUP BY a.patient_id;
+
+INSERT INTO payment_balanceentry (account_id, payment_id, kind, amount, created_at)
+SELECT user_id, NULL, 'RECONCILIATION', balance, now()
+FROM payment_balanceaccount;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointment", "0005_keyset_index"),
+        ("payment", "0006_keyset_index"),
+        ("user", "0003_user_last_name_trigram_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BalanceAccount",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="balance_account",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "balance",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0"), max_digits=12
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="BalanceEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("payment_id", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("PAYMENT", "Payment change"),
+                            ("RECONCILIATION", "Reconciliation"),
+                        ],
+                        default="PAYMENT",
+                        max_length=20,
+                    ),
+                ),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="entries",
+                        to="payment.balanceaccount",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("-created_at",),
+                "indexes": [
+                    models.Index(
+                        fields=["account", "created_at"],
+                        name="payment_bal_account_e4ccc8_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(OPENING_BALANCES_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.10 on 2026-10-17 02:05
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The index is built without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ("payment", "0008_sync_state"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="payment",
+            index=models.Index(
+                condition=models.Q(("status", "PENDING")),
+                fields=["id"],
+                name="payment_pending_id",
+            ),
+        ),
+    ]
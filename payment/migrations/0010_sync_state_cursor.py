@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payment", "0009_pending_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="syncstate",
+            name="cursor",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
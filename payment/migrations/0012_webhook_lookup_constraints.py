@@ -0,0 +1,53 @@
+# Generated by Django 5.2.10 on 2026-10-17 02:20
+
+from django.db import migrations, models
+
+# The unique indexes are built without locking the table against
+# writes; the model state gets the matching UniqueConstraints.
+CONSTRAINTS = [
+    (
+        "unique_payment_session_id",
+        "session_id",
+        models.UniqueConstraint(
+            condition=models.Q(("session_id__gt", "")),
+            fields=("session_id",),
+            name="unique_payment_session_id",
+        ),
+    ),
+    (
+        "unique_payment_intent_id",
+        "stripe_payment_intent_id",
+        models.UniqueConstraint(
+            condition=models.Q(("stripe_payment_intent_id__gt", "")),
+            fields=("stripe_payment_intent_id",),
+            name="unique_payment_intent_id",
+        ),
+    ),
+]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("payment", "0011_stripe_event"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    f'CREATE UNIQUE INDEX CONCURRENTLY "{name}" '
+                    f'ON "payment_payment" ("{column}") '
+                    f"WHERE \"{column}\" > ''",
+                    f'DROP INDEX CONCURRENTLY "{name}"',
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name="payment", constraint=constraint
+                ),
+            ],
+        )
+        for name, column, constraint in CONSTRAINTS
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.10 on 2026-10-17 02:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payment", "0012_webhook_lookup_constraints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedPayment",
+            fields=[
+                (
+                    "payment_id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("appointment_id", models.BigIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PARTIALLY_REFUNDED", "Refunded 50% of price"),
+                            ("REFUNDED", "Refunded 100% of price"),
+                            ("PENDING", "Pending"),
+                            ("PAID", "Paid"),
+                            ("EXPIRED", "Expired"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "payment_type",
+                    models.CharField(
+                        choices=[
+                            ("CONSULTATION", "Consultation"),
+                            ("CANCELLATION_FEE", "Cancellation fee"),
+                            ("NO_SHOW_FEE", "No-show fee"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("money_to_pay", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("session_id", models.CharField(blank=True, max_length=255, null=True)),
+                (
+                    "stripe_payment_intent_id",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ("-created_at",),
+                "indexes": [
+                    models.Index(
+                        fields=["appointment_id"], name="archivedpayment_appointment"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,9 +1,13 @@
-from django.db import models
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import models, transaction
 
 from appointment.models import Appointment
+from controller.tracking import FieldTrackerMixin
 
 
-class Payment(models.Model):
+class Payment(FieldTrackerMixin, models.Model):
     class Status(models.TextChoices):
         PARTIALLY_REFUNDED = ("PARTIALLY_REFUNDED", "Refunded 50% of price")
         REFUNDED = ("REFUNDED", "Refunded 100% of price")
@@ -16,6 +20,9 @@ class Payment(models.Model):
         CANCELLATION_FEE = ("CANCELLATION_FEE", "Cancellation fee")
         NO_SHOW_FEE = ("NO_SHOW_FEE", "No-show fee")
 
+    # a save touching these is posted to the balance ledger
+    tracked_fields = ("status", "money_to_pay")
+
     status = models.CharField(
         max_length=20,
         choices=Status.choices,
@@ -44,13 +51,228 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # keyset pagination key
+            models.Index(
+                fields=["created_at", "id"], name="payment_created_at_id"
+            ),
+            # Stripe reconciliation walks pending payments in id order
+            models.Index(
+                fields=["id"],
+                condition=models.Q(status="PENDING"),
+                name="payment_pending_id",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["appointment", "payment_type"],
                 name="unique_appointment",
-            )
+            ),
+            # webhook lookups; payments without a session yet are left out
+            models.UniqueConstraint(
+                fields=["session_id"],
+                condition=models.Q(session_id__gt=""),
+                name="unique_payment_session_id",
+            ),
+            models.UniqueConstraint(
+                fields=["stripe_payment_intent_id"],
+                condition=models.Q(stripe_payment_intent_id__gt=""),
+                name="unique_payment_intent_id",
+            ),
         ]
 
+    @classmethod
+    def _outstanding(cls, status, money_to_pay):
+        if status == cls.Status.PENDING and money_to_pay is not None:
+            # a value assigned in code may still be a str or a float
+            return Decimal(str(money_to_pay))
+        return Decimal("0")
+
+    @property
+    def outstanding_amount(self):
+        """What the payment adds to the patient's balance"""
+        return self._outstanding(self.status, self.money_to_pay)
+
+    def save(self, *args, **kwargs):
+        """
+        Redefined method to keep the balance ledger of the patient
+        in step with the payment (in the same transaction)
+        """
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic():
+            if update_fields is None or set(self.tracked_fields) & set(
+                update_fields
+            ):
+                previous = self.stored_outstanding_amount()
+                super().save(*args, **kwargs)
+                self.sync_balance(previous)
+            else:
+                super().save(*args, **kwargs)
+        self.reset_tracking(update_fields)
+
+    def stored_outstanding_amount(self):
+        """
+        Outstanding amount of the stored row, locked until the end of
+        the transaction: a concurrent save of the same payment waits and
+        then sees this one's result, so a change is posted only once
+        """
+        if self._state.adding:
+            return Decimal("0")
+        stored = (
+            Payment.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values_list("status", "money_to_pay")
+            .first()
+        )
+        return self._outstanding(*stored) if stored else Decimal("0")
+
+    def sync_balance(self, previous):
+        """Post the change of the outstanding amount from `previous`"""
+        from payment.services.ledger import post_balance_entry
+
+        current = self.outstanding_amount
+        if current != previous:
+            post_balance_entry(
+                appointment_id=self.appointment_id,
+                payment_id=self.pk,
+                amount=current - previous,
+            )
+
     def __str__(self) -> str:
         return (f"Payment #{self.id} | {self.payment_type} | {self.status} "
                 f"| appt #{self.appointment_id}")
+
+
+class ArchivedPayment(models.Model):
+    """
+    Payments of archived appointments (ArchivedAppointment), moved out
+    of Payment with them. Only settled payments are archived, so the
+    balance ledger never needs them.
+    """
+
+    payment_id = models.BigIntegerField(primary_key=True)
+    appointment_id = models.BigIntegerField()
+    status = models.CharField(max_length=20, choices=Payment.Status.choices)
+    payment_type = models.CharField(max_length=20, choices=Payment.Type.choices)
+    money_to_pay = models.DecimalField(max_digits=10, decimal_places=2)
+    session_id = models.CharField(max_length=255, null=True, blank=True)
+    stripe_payment_intent_id = models.CharField(
+        max_length=255, null=True, blank=True
+    )
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ("-created_at",)
+        indexes = [
+            models.Index(
+                fields=["appointment_id"], name="archivedpayment_appointment"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return (f"Archived payment #{self.payment_id} | {self.payment_type} "
+                f"| {self.status} | appt #{self.appointment_id}")
+
+
+class BalanceAccount(models.Model):
+    """
+    Outstanding balance of a user: money_to_pay of the pending payments
+    of their appointments. Kept up to date with every payment change in
+    the same transaction, so the penalty check is a primary key read;
+    reconcile_balances rebuilds it from Payment.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="balance_account",
+    )
+    balance = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal("0")
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Balance of user #{self.user_id}: {self.balance}"
+
+
+class BalanceEntry(models.Model):
+    """
+    Append-only history of balance changes. payment_id is a plain id:
+    the entry that releases a deleted payment outlives the payment.
+    """
+
+    class Kind(models.TextChoices):
+        PAYMENT = ("PAYMENT", "Payment change")
+        RECONCILIATION = ("RECONCILIATION", "Reconciliation")
+
+    account = models.ForeignKey(
+        BalanceAccount,
+        on_delete=models.CASCADE,
+        related_name="entries",
+    )
+    payment_id = models.BigIntegerField(null=True, blank=True)
+    kind = models.CharField(
+        max_length=20, choices=Kind.choices, default=Kind.PAYMENT
+    )
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["account", "created_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return (f"Balance entry #{self.id} | {self.kind} | {self.amount} "
+                f"| user #{self.account_id}")
+
+
+class SyncState(models.Model):
+    """
+    Progress of a resumable Stripe sync job: `watermark` is the last
+    payment id it has handled in the current pass, `cursor` the last
+    Stripe event it has applied, `stats` the timing and counters of its
+    last run.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    watermark = models.BigIntegerField(default=0)
+    cursor = models.CharField(max_length=255, blank=True)
+    stats = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Sync {self.name} at #{self.watermark}"
+
+
+class StripeEvent(models.Model):
+    """
+    Verified webhook event as Stripe sent it, stored before the webhook
+    answers and applied later by process_stripe_events. The Stripe
+    event id is the key, so a redelivered event is stored only once.
+    """
+
+    event_id = models.CharField(max_length=255, primary_key=True)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            # the consumer reads the unprocessed events oldest first
+            models.Index(
+                fields=["received_at"],
+                condition=models.Q(processed_at__isnull=True),
+                name="stripeevent_unprocessed",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Stripe event {self.event_id} | {self.event_type}"
@@ -0,0 +1,152 @@
+from django.db import connection
+
+from appointment.models import Appointment
+from payment.models import BalanceAccount, BalanceEntry, Payment
+
+# The account row is upserted and the entry appended in one statement;
+# the owner is read from the appointment, so the caller only needs the
+# ids it already has in memory.
+POST_ENTRY_SQL = """
+WITH owner AS (
+    SELECT patient_id
+    FROM {appointment_table}
+    WHERE id = %(appointment_id)s
+), account AS (
+    INSERT INTO {account_table} AS account (user_id, balance, updated_at)
+    SELECT patient_id, %(amount)s, now()
+    FROM owner
+    ON CONFLICT (user_id) DO UPDATE
+    SET balance = account.balance + EXCLUDED.balance,
+        updated_at = EXCLUDED.updated_at
+    RETURNING user_id
+)
+INSERT INTO {entry_table} (account_id, payment_id, kind, amount, created_at)
+SELECT user_id, %(payment_id)s, %(kind)s, %(amount)s, now()
+FROM account
+"""
+
+# Bulk variant for status changes applied with bulk_update: one account
+# upsert per patient, one entry per payment.
+POST_ENTRIES_SQL = """
+WITH changes AS (
+    SELECT payment.id AS payment_id,
+           appointment.patient_id AS user_id,
+           change.amount
+    FROM unnest(%(payment_ids)s::bigint[], %(amounts)s::numeric[])
+        AS change(payment_id, amount)
+    JOIN {payment_table} payment ON payment.id = change.payment_id
+    JOIN {appointment_table} appointment
+        ON appointment.id = payment.appointment_id
+), account AS (
+    INSERT INTO {account_table} AS account (user_id, balance, updated_at)
+    SELECT user_id, SUM(amount), now()
+    FROM changes
+    GROUP BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET balance = account.balance + EXCLUDED.balance,
+        updated_at = EXCLUDED.updated_at
+)
+INSERT INTO {entry_table} (account_id, payment_id, kind, amount, created_at)
+SELECT user_id, payment_id, %(kind)s, amount, now()
+FROM changes
+"""
+
+# Expected balances are summed from Payment in one pass; every account
+# that differs gets a reconciliation entry with the difference.
+RECONCILE_SQL = """
+WITH expected AS (
+    SELECT a.patient_id AS user_id,
+           SUM(p.money_to_pay) AS balance
+    FROM {payment_table} p
+    JOIN {appointment_table} a ON a.id = p.appointment_id
+    WHERE p.status = %(pending)s
+    GROUP BY a.patient_id
+), drift AS (
+    SELECT COALESCE(expected.user_id, account.user_id) AS user_id,
+           COALESCE(expected.balance, 0)
+               - COALESCE(account.balance, 0) AS amount
+    FROM expected
+    FULL JOIN {account_table} account ON account.user_id = expected.user_id
+    WHERE COALESCE(expected.balance, 0) <> COALESCE(account.balance, 0)
+), adjusted AS (
+    INSERT INTO {account_table} AS account (user_id, balance, updated_at)
+    SELECT user_id, amount, now()
+    FROM drift
+    WHERE NOT %(dry_run)s
+    ON CONFLICT (user_id) DO UPDATE
+    SET balance = account.balance + EXCLUDED.balance,
+        updated_at = EXCLUDED.updated_at
+    RETURNING user_id
+), entries AS (
+    INSERT INTO {entry_table} (account_id, payment_id, kind, amount, created_at)
+    SELECT drift.user_id, NULL, %(kind)s, drift.amount, now()
+    FROM drift
+    JOIN adjusted ON adjusted.user_id = drift.user_id
+)
+SELECT COUNT(*), COALESCE(SUM(ABS(amount)), 0)
+FROM drift
+"""
+
+
+def _tables():
+    return {
+        "appointment_table": Appointment._meta.db_table,
+        "payment_table": Payment._meta.db_table,
+        "account_table": BalanceAccount._meta.db_table,
+        "entry_table": BalanceEntry._meta.db_table,
+    }
+
+
+def post_balance_entry(*, appointment_id, payment_id, amount, kind=None):
+    """Add `amount` to the balance of the appointment's patient"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            POST_ENTRY_SQL.format(**_tables()),
+            {
+                "appointment_id": appointment_id,
+                "payment_id": payment_id,
+                "amount": amount,
+                "kind": kind or BalanceEntry.Kind.PAYMENT,
+            },
+        )
+
+
+def post_balance_entries(changes):
+    """
+    Post `(payment_id, amount)` changes in one statement, for payments
+    updated in bulk (their save() and its ledger sync do not run)
+    """
+    if not changes:
+        return
+    payment_ids, amounts = zip(*changes)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            POST_ENTRIES_SQL.format(**_tables()),
+            {
+                "payment_ids": list(payment_ids),
+                "amounts": list(amounts),
+                "kind": BalanceEntry.Kind.PAYMENT,
+            },
+        )
+
+
+def reconcile_balances(dry_run=False):
+    """
+    Rebuild every balance from Payment in bulk. Ledger writes are held
+    off while it runs, so the payments it reads and the balances it
+    corrects belong to the same moment. Returns (accounts, drift).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"LOCK TABLE {BalanceAccount._meta.db_table} "
+            "IN SHARE ROW EXCLUSIVE MODE"
+        )
+        cursor.execute(
+            RECONCILE_SQL.format(**_tables()),
+            {
+                "pending": Payment.Status.PENDING,
+                "kind": BalanceEntry.Kind.RECONCILIATION,
+                "dry_run": dry_run,
+            },
+        )
+        return cursor.fetchone()
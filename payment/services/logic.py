@@ -6,6 +6,7 @@ import stripe
 from django.utils import timezone
 
 from payment.models import Payment
+from payment.services import stripe_gateway
 from payment.services.stripe_checkout import create_checkout_session
 
 logger = logging.getLogger(__name__)
@@ -20,7 +21,7 @@ def renew_payment_session(payment: Payment) -> Payment:
 
     if payment.session_id:
         try:
-            stripe_session = stripe.checkout.Session.retrieve(
+            stripe_session = stripe_gateway.retrieve_session(
                 payment.session_id)
 
             if getattr(stripe_session, "payment_status", None) == "paid":
@@ -35,8 +36,9 @@ def renew_payment_session(payment: Payment) -> Payment:
                     payment.save(update_fields=["session_url"])
                 return payment
 
-        except Exception:
-            pass
+        except stripe.error.StripeError as e:
+            logger.warning(
+                f"Could not retrieve session {payment.session_id}: {e}")
 
     new_session = create_checkout_session(
         amount_usd=payment.money_to_pay,
@@ -45,9 +47,10 @@ def renew_payment_session(payment: Payment) -> Payment:
 
     if payment.session_id and payment.session_id != new_session.id:
         try:
-            stripe.checkout.Session.expire(payment.session_id)
-        except Exception:
-            pass
+            stripe_gateway.expire_session(payment.session_id)
+        except stripe.error.StripeError as e:
+            logger.warning(
+                f"Could not expire session {payment.session_id}: {e}")
 
     payment.session_id = new_session.id
     payment.session_url = new_session.url
@@ -158,8 +161,8 @@ def process_appointment_payment(appointment, payment_type):
 def expire_stripe_session(payment):
     try:
         if payment.session_id:
-            stripe.checkout.Session.expire(payment.session_id)
-    except Exception as e:
+            stripe_gateway.expire_session(payment.session_id)
+    except stripe.error.StripeError as e:
         logger.warning(f"Could not expire session {payment.session_id}: {e}")
 
 
@@ -168,7 +171,7 @@ def make_refund(payment, percentage):
 
     if not payment.stripe_payment_intent_id:
         try:
-            session = stripe.checkout.Session.retrieve(payment.session_id)
+            session = stripe_gateway.retrieve_session(payment.session_id)
             if session.payment_intent:
                 payment.stripe_payment_intent_id = session.payment_intent
                 payment.save()
@@ -178,7 +181,7 @@ def make_refund(payment, percentage):
                     "PaymentIntent yet (unpaid?)"
                 )
                 return False
-        except Exception as e:
+        except stripe.error.StripeError as e:
             logger.error(f"Failed to retrieve session from Stripe: {e}")
             return False
 
@@ -196,7 +199,7 @@ def make_refund(payment, percentage):
                 f"Refund amount for payment {payment.id} is 0. Skipping.")
             return False
 
-        refund = stripe.Refund.create(
+        refund = stripe_gateway.create_refund(
             payment_intent=payment.stripe_payment_intent_id,
             amount=amount_to_refund,
         )
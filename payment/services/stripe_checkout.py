@@ -1,6 +1,7 @@
 from decimal import Decimal
 from django.conf import settings
-import stripe
+
+from payment.services import stripe_gateway
 
 
 def to_cents(amount: Decimal) -> int:
@@ -12,9 +13,7 @@ def create_checkout_session(*, amount_usd: Decimal, title: str):
     if not settings.STRIPE_SECRET_KEY:
         raise RuntimeError("STRIPE_SECRET_KEY is not set")
 
-    stripe.api_key = settings.STRIPE_SECRET_KEY
-
-    session = stripe.checkout.Session.create(
+    session = stripe_gateway.create_session(
         mode="payment",
         line_items=[
             {
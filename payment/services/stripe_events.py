@@ -0,0 +1,224 @@
+import logging
+import time
+
+import stripe
+from django.db import transaction
+from django.utils import timezone
+
+from payment.models import Payment, StripeEvent, SyncState
+from payment.services import stripe_gateway
+from payment.services.stripe_sync import apply_status_changes
+
+logger = logging.getLogger(__name__)
+
+STRIPE_EVENTS_SYNC = "stripe-events"
+EVENTS_PAGE_SIZE = 100
+WEBHOOK_BATCH_SIZE = 100
+WEBHOOK_MAX_ATTEMPTS = 5
+
+# Statuses a payment may move to a status from. A transition from any
+# other status (the target included) is skipped, so an event applied
+# twice or arriving after a later one changes nothing.
+TRANSITIONS = {
+    Payment.Status.PAID: (Payment.Status.PENDING,),
+    Payment.Status.EXPIRED: (Payment.Status.PENDING,),
+    Payment.Status.PARTIALLY_REFUNDED: (Payment.Status.PAID,),
+    Payment.Status.REFUNDED: (
+        Payment.Status.PAID, Payment.Status.PARTIALLY_REFUNDED
+    ),
+}
+
+
+def _session_paid(session):
+    # asynchronous payment methods complete unpaid and settle later
+    if session.get("payment_status") != "paid":
+        return None
+    return "session_id", session["id"], {
+        "status": Payment.Status.PAID,
+        "stripe_payment_intent_id": session.get("payment_intent"),
+    }
+
+
+def _session_unpaid(session):
+    # expired, or its asynchronous payment failed: nothing will be paid
+    return "session_id", session["id"], {"status": Payment.Status.EXPIRED}
+
+
+def _charge_refunded(charge):
+    if not charge.get("payment_intent"):
+        return None
+    if charge.get("amount_refunded", 0) >= charge.get("amount", 0):
+        status = Payment.Status.REFUNDED
+    else:
+        status = Payment.Status.PARTIALLY_REFUNDED
+    return "stripe_payment_intent_id", charge["payment_intent"], {
+        "status": status
+    }
+
+
+# Event type -> handler of its data.object returning the payment lookup
+# (field, value) and the changes, or None when the event changes nothing
+EVENT_HANDLERS = {
+    "checkout.session.completed": _session_paid,
+    "checkout.session.async_payment_succeeded": _session_paid,
+    "checkout.session.async_payment_failed": _session_unpaid,
+    "checkout.session.expired": _session_unpaid,
+    "charge.refunded": _charge_refunded,
+}
+EVENT_TYPES = tuple(EVENT_HANDLERS)
+
+
+def route_events(events):
+    """
+    Changes the events amount to, grouped by lookup field and target
+    status: `{(field, status): {value: changes}}`. A later event on the
+    same payment replaces an earlier one.
+    """
+    latest = {}
+    for event in events:
+        handler = EVENT_HANDLERS.get(event["type"])
+        routed = handler(event["data"]["object"]) if handler else None
+        if routed is not None:
+            field, value, changes = routed
+            latest.pop((field, value), None)
+            latest[field, value] = changes
+
+    grouped = {}
+    for (field, value), changes in latest.items():
+        grouped.setdefault((field, changes["status"]), {})[value] = changes
+    return grouped
+
+
+def apply_events(events):
+    """Apply the events to the payments; returns the updated payments"""
+    updated = []
+    for (field, status), changes in route_events(events).items():
+        updated += apply_status_changes(
+            changes, key=field, from_statuses=TRANSITIONS[status]
+        )
+    return updated
+
+
+def list_events(**params):
+    return stripe_gateway.list_events(types=list(EVENT_TYPES), **params)
+
+
+def sync_stripe_events(page_size=EVENTS_PAGE_SIZE):
+    """
+    Page through the Stripe events newer than the stored cursor, oldest
+    page first, applying each page and moving the cursor in the same
+    transaction. The cost follows the number of changes: with nothing
+    new a run is a single API call. The first run only records the
+    newest event; payments settled before that are left to
+    sync_pending_payments. Returns the stats stored on the SyncState.
+    """
+    state, _ = SyncState.objects.get_or_create(name=STRIPE_EVENTS_SYNC)
+    started, clock = timezone.now(), time.monotonic()
+    stats = {
+        "started_at": started.isoformat(),
+        "resumed_from": state.cursor,
+        "calls": 0,
+        "events": 0,
+        "applied": 0,
+    }
+
+    if not state.cursor:
+        newest = list_events(limit=1)
+        stats["calls"] += 1
+        if newest.data:
+            state.cursor = newest.data[0]["id"]
+    else:
+        while True:
+            try:
+                page = list_events(
+                    ending_before=state.cursor, limit=page_size
+                )
+            except stripe.InvalidRequestError as e:
+                # the cursor event is past Stripe's retention window
+                logger.warning(f"Stripe event cursor {state.cursor}: {e}")
+                state.cursor = ""
+                break
+            stats["calls"] += 1
+            # a page lists the events right after the cursor, newest first
+            events = list(reversed(page.data))
+            if not events:
+                break
+            with transaction.atomic():
+                stats["applied"] += len(apply_events(events))
+                state.cursor = events[-1]["id"]
+                state.save(update_fields=["cursor", "updated_at"])
+            stats["events"] += len(events)
+            if not page.has_more:
+                break
+
+    stats["seconds"] = round(time.monotonic() - clock, 3)
+    state.stats = stats
+    state.save()
+    return stats
+
+
+def record_webhook_event(event, payload):
+    """
+    Store a verified webhook event in a single INSERT; a redelivered
+    event hits the primary key and is ignored
+    """
+    StripeEvent.objects.bulk_create(
+        [
+            StripeEvent(
+                event_id=event["id"],
+                event_type=event["type"],
+                payload=payload,
+            )
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def process_stripe_events(batch_size=WEBHOOK_BATCH_SIZE):
+    """
+    Apply the stored webhook events oldest first, a batch per
+    transaction; events locked by a concurrent consumer are skipped.
+    If a batch fails its events are applied one by one, and the failing
+    ones are left to later runs, up to WEBHOOK_MAX_ATTEMPTS times.
+    Returns the number of processed events.
+    """
+    pending = StripeEvent.objects.filter(
+        processed_at__isnull=True, attempts__lt=WEBHOOK_MAX_ATTEMPTS
+    ).order_by("received_at")
+    processed = 0
+    failed = set()
+    while True:
+        with transaction.atomic():
+            batch = list(
+                pending.exclude(event_id__in=failed)
+                .select_for_update(skip_locked=True)[:batch_size]
+            )
+            try:
+                with transaction.atomic():
+                    apply_events([item.payload for item in batch])
+                done = batch
+            except Exception as e:
+                logger.error(f"Stripe event batch failed: {e}")
+                done = [item for item in batch if _apply_one(item)]
+                failed.update(
+                    item.event_id for item in batch if item not in done
+                )
+            StripeEvent.objects.filter(
+                event_id__in=[item.event_id for item in done]
+            ).update(processed_at=timezone.now())
+        processed += len(done)
+        if len(batch) < batch_size:
+            return processed
+
+
+def _apply_one(item):
+    try:
+        with transaction.atomic():
+            apply_events([item.payload])
+    except Exception as e:
+        logger.error(f"Stripe event {item.event_id} failed: {e}")
+        StripeEvent.objects.filter(event_id=item.event_id).update(
+            attempts=item.attempts + 1, error=str(e)
+        )
+        return False
+    return True
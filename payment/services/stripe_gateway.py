@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+
+import stripe
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean Stripe cannot be reached or failed on its side, as
+# opposed to a request it answered and refused
+OUTAGE_ERRORS = (stripe.APIConnectionError, stripe.APIError)
+
+
+class StripeUnavailable(Exception):
+    """The circuit is open: the call was refused without reaching Stripe."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Stripe is unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` outage errors with no successful call in
+    between; errors Stripe answered (4xx) are not recorded at all.
+    While open every call fails at once with StripeUnavailable; after
+    `reset_timeout` seconds the next call goes through as a trial that
+    closes the circuit on success or keeps it open for another
+    `reset_timeout`.
+    """
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            now = time.monotonic()
+            remaining = self.opened_at + self.reset_timeout - now
+            if remaining > 0:
+                raise StripeUnavailable(remaining)
+            # the trial call; the others keep failing until it returns
+            self.opened_at = now
+
+    def record(self, failed):
+        with self.lock:
+            if not failed:
+                self.failures, self.opened_at = 0, None
+                return
+            self.failures += 1
+            if self.opened_at is None:
+                if self.failures < self.threshold:
+                    return
+                logger.error(
+                    f"Stripe circuit opened after {self.failures} "
+                    "failed calls"
+                )
+            self.opened_at = time.monotonic()
+
+    def reset(self):
+        self.record(failed=False)
+
+
+breaker = CircuitBreaker(
+    settings.STRIPE_BREAKER_THRESHOLD, settings.STRIPE_BREAKER_RESET_TIMEOUT
+)
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def _count(operation, seconds=0.0, error=False, rejected=False):
+    with _metrics_lock:
+        counters = _metrics.setdefault(operation, {
+            "calls": 0,
+            "errors": 0,
+            "rejected": 0,
+            "seconds": 0.0,
+            "max_seconds": 0.0,
+        })
+        if rejected:
+            counters["rejected"] += 1
+            return
+        counters["calls"] += 1
+        counters["errors"] += error
+        counters["seconds"] += seconds
+        counters["max_seconds"] = max(counters["max_seconds"], seconds)
+
+
+def metrics():
+    """
+    Counters of this process per operation: calls made, errors among
+    them, calls refused by the open circuit and the latency in seconds
+    """
+    with _metrics_lock:
+        snapshot = {
+            operation: dict(counters)
+            for operation, counters in _metrics.items()
+        }
+    for counters in snapshot.values():
+        calls = counters["calls"]
+        counters["avg_seconds"] = counters["seconds"] / calls if calls else 0
+    return snapshot
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def configure():
+    """
+    Set up the stripe library once per process: the API key and one
+    HTTP client that keeps connections alive, with the connect/read
+    timeouts applied to every call. The client retries connection
+    errors, conflicts, rate limits and 5xx responses itself, with
+    jittered exponential backoff and idempotency keys on POSTs.
+    """
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    stripe.max_network_retries = settings.STRIPE_MAX_RETRIES
+    stripe.default_http_client = stripe.RequestsClient(
+        timeout=(settings.STRIPE_CONNECT_TIMEOUT, settings.STRIPE_READ_TIMEOUT)
+    )
+
+
+def call(operation, func, *args, **kwargs):
+    """
+    Make a Stripe call through the circuit breaker, counting it under
+    `operation`. Raises StripeUnavailable while the circuit is open.
+    """
+    try:
+        breaker.before_call()
+    except StripeUnavailable:
+        _count(operation, rejected=True)
+        raise
+    started = time.monotonic()
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        _count(operation, time.monotonic() - started, error=True)
+        if isinstance(e, OUTAGE_ERRORS):
+            breaker.record(failed=True)
+        raise
+    _count(operation, time.monotonic() - started)
+    breaker.record(failed=False)
+    return result
+
+
+def create_session(**params):
+    return call(
+        "checkout.session.create", stripe.checkout.Session.create, **params
+    )
+
+
+def retrieve_session(session_id):
+    return call(
+        "checkout.session.retrieve",
+        stripe.checkout.Session.retrieve,
+        session_id,
+    )
+
+
+def expire_session(session_id):
+    return call(
+        "checkout.session.expire", stripe.checkout.Session.expire, session_id
+    )
+
+
+def create_refund(**params):
+    return call("refund.create", stripe.Refund.create, **params)
+
+
+def list_events(**params):
+    return call("event.list", stripe.Event.list, **params)
@@ -0,0 +1,186 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from controller.outbox import enqueue_task
+from payment.models import Payment, SyncState
+from payment.services import stripe_gateway
+from payment.services.ledger import post_balance_entries
+
+logger = logging.getLogger(__name__)
+
+PENDING_SESSIONS_SYNC = "pending-sessions"
+PENDING_GRACE_PERIOD = timedelta(minutes=15)
+
+
+class RateLimiter:
+    """Spaces calls from any number of threads `1 / rate` seconds apart"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_call = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            call_at = max(self.next_call, now)
+            self.next_call = call_at + self.interval
+        if call_at > now:
+            time.sleep(call_at - now)
+
+
+def session_status(session):
+    """Payment status a Checkout Session resolves to, None while open"""
+    if getattr(session, "payment_status", None) == "paid":
+        return Payment.Status.PAID
+    if getattr(session, "status", None) == "expired":
+        return Payment.Status.EXPIRED
+    return None
+
+
+def fetch_session_statuses(payments, pool, limiter):
+    """{payment id: status} for the sessions that are settled"""
+
+    def fetch(payment):
+        limiter.wait()
+        try:
+            session = stripe_gateway.retrieve_session(payment.session_id)
+        except stripe_gateway.StripeUnavailable:
+            # the run stops; the watermark stays before this chunk
+            raise
+        except Exception as e:
+            logger.error(f"Error processing payment {payment.id}: {e}")
+            return payment.id, None, True
+        return payment.id, session_status(session), False
+
+    statuses, failed = {}, 0
+    for payment_id, status, error in pool.map(fetch, payments):
+        failed += error
+        if status is not None:
+            statuses[payment_id] = status
+    return statuses, failed
+
+
+def apply_status_changes(
+    changes, key="id", from_statuses=(Payment.Status.PENDING,)
+):
+    """
+    Apply `{key value: {field: value}}` changes to the payments still in
+    `from_statuses` with one bulk_update. Rows are locked and re-read
+    first, so a payment settled meanwhile by another path is left
+    alone; the balance entries and admin messages that save() would
+    produce are written in bulk as well. Returns the updated payments.
+    """
+    from notifications.signals import payment_status_message
+    from notifications.tasks import notify_admin_task
+
+    if not changes:
+        return []
+    lookup = {f"{key}__in": changes}
+    if key != "id":
+        # the predicate of the partial unique index on the Stripe id
+        lookup[f"{key}__gt"] = ""
+    with transaction.atomic():
+        payments = list(
+            Payment.objects.select_for_update(of=("self",))
+            .select_related("appointment__patient")
+            .filter(**lookup, status__in=from_statuses)
+            .order_by("id")
+        )
+        fields, balance_changes = set(), []
+        for payment in payments:
+            outstanding = payment.outstanding_amount
+            for field, value in changes[getattr(payment, key)].items():
+                setattr(payment, field, value)
+                fields.add(field)
+            if payment.outstanding_amount != outstanding:
+                balance_changes.append(
+                    (payment.id, payment.outstanding_amount - outstanding)
+                )
+        if payments:
+            Payment.objects.bulk_update(payments, sorted(fields))
+        post_balance_entries(balance_changes)
+
+        for payment in payments:
+            payment.reset_tracking()
+            message = payment_status_message(payment)
+            if message:
+                enqueue_task(notify_admin_task, message)
+    return payments
+
+
+def reconcile_pending_payments(
+    chunk_size=None, workers=None, rate_limit=None, time_budget=None
+):
+    """
+    Settle PENDING payments older than the grace period from their
+    Checkout Sessions. Payments are read in id order, `chunk_size` at a
+    time, after the watermark of the previous run; each chunk is fetched
+    concurrently and applied in its own transaction before the
+    watermark moves. A run that exceeds `time_budget` stops after the
+    current chunk and the next one resumes from there; a finished pass
+    resets the watermark. Returns the stats stored on the SyncState.
+    """
+    chunk_size = chunk_size or settings.STRIPE_SYNC_CHUNK_SIZE
+    workers = workers or settings.STRIPE_SYNC_WORKERS
+    if rate_limit is None:
+        rate_limit = settings.STRIPE_SYNC_RATE_LIMIT
+    if time_budget is None:
+        time_budget = settings.STRIPE_SYNC_TIME_BUDGET
+
+    state, _ = SyncState.objects.get_or_create(name=PENDING_SESSIONS_SYNC)
+    started, clock = timezone.now(), time.monotonic()
+    stats = {
+        "started_at": started.isoformat(),
+        "resumed_from": state.watermark,
+        "checked": 0,
+        "paid": 0,
+        "expired": 0,
+        "failed": 0,
+        "without_session": 0,
+        "finished": False,
+    }
+    pending = Payment.objects.filter(
+        status=Payment.Status.PENDING,
+        created_at__lt=started - PENDING_GRACE_PERIOD,
+    ).only("id", "status", "money_to_pay", "session_id").order_by("id")
+    limiter = RateLimiter(rate_limit)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            chunk = list(pending.filter(id__gt=state.watermark)[:chunk_size])
+            with_session = [payment for payment in chunk if payment.session_id]
+            stats["without_session"] += len(chunk) - len(with_session)
+
+            statuses, failed = fetch_session_statuses(
+                with_session, pool, limiter
+            )
+            applied = apply_status_changes({
+                payment_id: {"status": status}
+                for payment_id, status in statuses.items()
+            })
+            for payment in applied:
+                stats[payment.status.lower()] += 1
+            stats["checked"] += len(with_session)
+            stats["failed"] += failed
+
+            if len(chunk) < chunk_size:
+                state.watermark = 0
+                stats["finished"] = True
+                break
+            state.watermark = chunk[-1].id
+            state.save(update_fields=["watermark", "updated_at"])
+            if time.monotonic() - clock > time_budget:
+                break
+
+    stats["seconds"] = round(time.monotonic() - clock, 3)
+    state.stats = stats
+    state.save()
+    return stats
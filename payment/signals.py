@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from payment.models import Payment
+from payment.services.ledger import post_balance_entry
+
+
+@receiver(post_delete, sender=Payment)
+def release_balance_signal_handler(sender, instance, origin=None, **kwargs):
+    """
+    A deleted pending payment leaves the balance. When the whole user is
+    deleted the account goes with it, so there is nothing to release.
+    """
+    if isinstance(origin, get_user_model()):
+        return
+    if instance.outstanding_amount:
+        post_balance_entry(
+            appointment_id=instance.appointment_id,
+            payment_id=instance.pk,
+            amount=-instance.outstanding_amount,
+        )
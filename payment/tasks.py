@@ -1,64 +1,121 @@
-import stripe
 from celery import shared_task
-from datetime import timedelta
-from django.conf import settings
-from django.utils import timezone
 
 from appointment.models import Appointment
 from payment.models import Payment
 from payment.services.logic import process_appointment_payment
+from payment.services.stripe_gateway import StripeUnavailable, metrics
+from payment.services.stripe_events import (
+    process_stripe_events,
+    sync_stripe_events,
+)
+from payment.services.stripe_sync import reconcile_pending_payments
 import logging
 
 
 logger = logging.getLogger(__name__)
-stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
 @shared_task(bind=True, max_retries=5)
 def create_stripe_payment_task(self, appointment_id, payment_type_value):
     try:
         instance = Appointment.objects.get(id=appointment_id)
+        if instance.payments.filter(
+            payment_type=payment_type_value
+        ).exists():
+            logger.info(
+                f"Appointment {appointment_id} already has "
+                f"a {payment_type_value} payment"
+            )
+            return
         process_appointment_payment(
             appointment=instance, payment_type=payment_type_value
         )
     except Appointment.DoesNotExist:
         logger.error(f"Appointment {appointment_id} not found")
+    except StripeUnavailable as exc:
+        raise self.retry(exc=exc, countdown=exc.retry_after)
     except Exception as exc:
         logger.error(f"Error creating payment for {appointment_id}: {exc}")
         raise self.retry(exc=exc, countdown=60)
 
 
+@shared_task
+def create_stripe_payments_task(appointment_ids, payment_type_value):
+    """
+    Bulk version of create_stripe_payment_task for set-based jobs:
+    the appointments are loaded in one query, the ones that already
+    have a payment of this type are skipped, and a failed one is handed
+    over to create_stripe_payment_task to be retried on its own.
+    """
+    appointments = Appointment.objects.filter(
+        id__in=appointment_ids
+    ).exclude(
+        payments__payment_type=payment_type_value
+    ).select_related("patient", "doctor_slot__doctor")
+
+    for appointment in appointments:
+        try:
+            process_appointment_payment(
+                appointment=appointment, payment_type=payment_type_value
+            )
+        except StripeUnavailable as exc:
+            # the batch is run again once the circuit may close; the
+            # appointments paid for by then are skipped
+            create_stripe_payments_task.apply_async(
+                (appointment_ids, payment_type_value),
+                countdown=exc.retry_after,
+            )
+            return
+        except Exception as exc:
+            logger.error(
+                f"Error creating payment for {appointment.id}: {exc}"
+            )
+            create_stripe_payment_task.delay(
+                appointment.id, payment_type_value
+            )
+
+
 @shared_task
 def sync_pending_payments():
-    pending_payments = Payment.objects.filter(
-        status=Payment.Status.PENDING,
-        created_at__lt=timezone.now() - timedelta(minutes=15)
+    stats = reconcile_pending_payments()
+    if stats["without_session"]:
+        logger.warning(
+            f"{stats['without_session']} pending payment(s) "
+            f"have no session_id. Skipped."
+        )
+    logger.info(
+        f"Stripe sync: {stats['checked']} session(s) checked, "
+        f"{stats['paid']} paid, {stats['expired']} expired, "
+        f"{stats['failed']} failed in {stats['seconds']}s"
     )
+    for operation, counters in metrics().items():
+        logger.info(
+            f"Stripe {operation}: {counters['calls']} call(s), "
+            f"{counters['errors']} error(s), {counters['rejected']} "
+            f"rejected, avg {counters['avg_seconds']:.3f}s, "
+            f"max {counters['max_seconds']:.3f}s"
+        )
+    return stats
 
-    for payment in pending_payments:
-        try:
-            if not payment.session_id:
-                logger.warning(
-                    f"Payment {payment.id} has no session_id. Skipping.")
-                continue
 
-            stripe_session = stripe.checkout.Session.retrieve(
-                payment.session_id
-            )
+@shared_task
+def sync_stripe_events_task():
+    stats = sync_stripe_events()
+    if stats["events"]:
+        logger.info(
+            f"Stripe events: {stats['events']} event(s) in "
+            f"{stats['calls']} call(s), {stats['applied']} payment(s) "
+            f"updated in {stats['seconds']}s"
+        )
+    return stats
 
-            if stripe_session.payment_status == "paid":
-                payment.status = Payment.Status.PAID
-                payment.save()
-            elif stripe_session.status == "expired":
-                payment.status = Payment.Status.EXPIRED
-                payment.save()
-            else:
-                logger.info(
-                    f"Payment {payment.id} still pending in "
-                    f"Stripe (open/no_payment_required)")
-
-        except Exception as e:
-            logger.error(f"Error processing payment {payment.id}: {str(e)}")
+
+@shared_task
+def process_stripe_events_task():
+    processed = process_stripe_events()
+    if processed:
+        logger.info(f"Stripe webhook: {processed} event(s) processed")
+    return processed
 
 
 @shared_task
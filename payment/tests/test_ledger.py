@@ -0,0 +1,84 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+
+from payment.models import BalanceAccount, BalanceEntry, Payment
+from payment.tests.base_set_up import BaseTestCaseModel
+
+
+class BalanceLedgerTest(BaseTestCaseModel):
+
+    def create_payment(self, amount="40.00"):
+        return Payment.objects.create(
+            appointment=self.appointment,
+            status=Payment.Status.PENDING,
+            payment_type=Payment.Type.CONSULTATION,
+            money_to_pay=amount,
+        )
+
+    def balance(self):
+        return BalanceAccount.objects.get(user=self.patient).balance
+
+    def test_balance_follows_payment_status(self):
+        payment = self.create_payment()
+        self.assertEqual(self.balance(), Decimal("40.00"))
+
+        payment = Payment.objects.get(pk=payment.pk)
+        payment.money_to_pay = Decimal("55.00")
+        payment.save(update_fields=["money_to_pay"])
+        self.assertEqual(self.balance(), Decimal("55.00"))
+
+        payment.status = Payment.Status.PAID
+        payment.save(update_fields=["status"])
+        self.assertEqual(self.balance(), Decimal("0.00"))
+        self.assertEqual(
+            list(BalanceEntry.objects.order_by("id").values_list(
+                "amount", flat=True
+            )),
+            [Decimal("40.00"), Decimal("15.00"), Decimal("-55.00")],
+        )
+
+    def test_stale_copies_post_a_change_once(self):
+        payment = self.create_payment()
+        webhook, reconciliation = (
+            Payment.objects.get(pk=payment.pk) for _ in range(2)
+        )
+
+        for copy in (webhook, reconciliation):
+            copy.status = Payment.Status.PAID
+            copy.save(update_fields=["status"])
+
+        self.assertEqual(self.balance(), Decimal("0.00"))
+        self.assertEqual(BalanceEntry.objects.count(), 2)
+
+    def test_deleting_pending_payment_releases_balance(self):
+        self.create_payment()
+        self.appointment.delete()
+        self.assertEqual(self.balance(), Decimal("0.00"))
+
+    def test_penalty_check_is_single_query(self):
+        self.create_payment()
+        self.patient.refresh_from_db()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.patient.has_penalty, Decimal("40.00"))
+
+    def test_reconcile_rebuilds_drifted_balances(self):
+        self.create_payment()
+        BalanceAccount.objects.filter(user=self.patient).update(
+            balance=Decimal("7.00")
+        )
+
+        call_command("reconcile_balances", "--dry-run", stdout=StringIO())
+        self.assertEqual(self.balance(), Decimal("7.00"))
+
+        out = StringIO()
+        call_command("reconcile_balances", stdout=out)
+        self.assertEqual(self.balance(), Decimal("40.00"))
+        self.assertIn("Corrected 1 account(s) off by 33.00", out.getvalue())
+        self.assertEqual(
+            BalanceEntry.objects.filter(
+                kind=BalanceEntry.Kind.RECONCILIATION
+            ).get().amount,
+            Decimal("33.00"),
+        )
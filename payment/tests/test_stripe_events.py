@@ -0,0 +1,221 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+import stripe
+from django.db import IntegrityError, transaction
+
+from controller.models import OutboxMessage
+from payment.models import BalanceAccount, Payment, SyncState
+from payment.services.stripe_events import (
+    STRIPE_EVENTS_SYNC,
+    apply_events,
+    sync_stripe_events,
+)
+from payment.tests.base_set_up import BaseTestCaseModel
+
+
+def event(event_id, event_type, **obj):
+    return {"id": event_id, "type": event_type, "data": {"object": obj}}
+
+
+class FakeEventStream:
+    """Local stand-in for stripe.Event.list, newest event last"""
+
+    def __init__(self, events):
+        self.events = events
+        self.calls = []
+
+    def list(self, types, limit, ending_before=None):
+        self.calls.append(ending_before)
+        events = [item for item in self.events if item["type"] in types]
+        ids = [item["id"] for item in events]
+        if ending_before is None:
+            newer = events
+        else:
+            newer = events[ids.index(ending_before) + 1:]
+        page = newer[:limit] if ending_before else newer[-limit:]
+        return type("Page", (), {
+            "data": list(reversed(page)),
+            "has_more": len(newer) > len(page),
+        })()
+
+
+class SyncStripeEventsTests(BaseTestCaseModel):
+    def setUp(self):
+        super().setUp()
+        self.paid, self.expired, self.refunded = [
+            Payment.objects.create(
+                appointment=self.appointment,
+                payment_type=payment_type,
+                session_id=f"cs_{number}",
+                stripe_payment_intent_id=f"pi_{number}",
+                money_to_pay=Decimal("10.00"),
+                status=status,
+            )
+            for number, (payment_type, status) in enumerate([
+                (Payment.Type.CONSULTATION, Payment.Status.PENDING),
+                (Payment.Type.NO_SHOW_FEE, Payment.Status.PENDING),
+                (Payment.Type.CANCELLATION_FEE, Payment.Status.PAID),
+            ])
+        ]
+        OutboxMessage.objects.all().delete()
+        self.stream = FakeEventStream([
+            event("evt_0", "checkout.session.completed", id="cs_9"),
+        ])
+        SyncState.objects.create(name=STRIPE_EVENTS_SYNC, cursor="evt_0")
+
+    def sync(self, **kwargs):
+        with patch(
+            "payment.services.stripe_events.stripe.Event.list",
+            side_effect=self.stream.list,
+        ):
+            return sync_stripe_events(**kwargs)
+
+    def test_quiet_period_costs_one_call(self):
+        stats = self.sync()
+
+        self.assertEqual(stats["calls"], 1)
+        self.assertEqual(stats["events"], 0)
+
+    def test_applies_new_events_in_pages_and_moves_cursor(self):
+        self.stream.events += [
+            event(
+                "evt_1", "checkout.session.completed",
+                id="cs_0", payment_status="paid", payment_intent="pi_new",
+            ),
+            event("evt_2", "customer.created", id="cus_1"),
+            event("evt_3", "checkout.session.expired", id="cs_1"),
+            event(
+                "evt_4", "charge.refunded",
+                payment_intent="pi_2", amount=1000, amount_refunded=500,
+            ),
+        ]
+
+        stats = self.sync(page_size=2)
+
+        self.assertEqual(self.stream.calls, ["evt_0", "evt_3"])
+        self.assertEqual((stats["events"], stats["applied"]), (3, 3))
+        self.paid.refresh_from_db()
+        self.assertEqual(self.paid.status, Payment.Status.PAID)
+        self.assertEqual(self.paid.stripe_payment_intent_id, "pi_new")
+        self.expired.refresh_from_db()
+        self.assertEqual(self.expired.status, Payment.Status.EXPIRED)
+        self.refunded.refresh_from_db()
+        self.assertEqual(
+            self.refunded.status, Payment.Status.PARTIALLY_REFUNDED
+        )
+        self.assertEqual(
+            BalanceAccount.objects.get(user=self.patient).balance,
+            Decimal("0.00"),
+        )
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+        self.assertEqual(
+            SyncState.objects.get(name=STRIPE_EVENTS_SYNC).cursor, "evt_4"
+        )
+
+        self.stream.calls.clear()
+        self.assertEqual(self.sync()["events"], 0)
+        self.assertEqual(self.stream.calls, ["evt_4"])
+
+    def test_first_run_starts_from_newest_event(self):
+        SyncState.objects.all().delete()
+        self.stream.events.append(
+            event("evt_1", "checkout.session.expired", id="cs_1")
+        )
+
+        self.sync()
+
+        self.assertEqual(
+            SyncState.objects.get(name=STRIPE_EVENTS_SYNC).cursor, "evt_1"
+        )
+        self.expired.refresh_from_db()
+        self.assertEqual(self.expired.status, Payment.Status.PENDING)
+
+    def test_expired_cursor_is_reset(self):
+        with patch(
+            "payment.services.stripe_events.stripe.Event.list",
+            side_effect=stripe.InvalidRequestError("No such event", "id"),
+        ):
+            sync_stripe_events()
+
+        self.assertEqual(
+            SyncState.objects.get(name=STRIPE_EVENTS_SYNC).cursor, ""
+        )
+
+
+class ApplyEventsTests(BaseTestCaseModel):
+    def setUp(self):
+        super().setUp()
+        self.payment = Payment.objects.create(
+            appointment=self.appointment,
+            payment_type=Payment.Type.CONSULTATION,
+            session_id="cs_1",
+            money_to_pay=Decimal("10.00"),
+        )
+
+    def status(self):
+        self.payment.refresh_from_db()
+        return self.payment.status
+
+    def test_async_payment_settles_after_unpaid_completion(self):
+        apply_events([
+            event(
+                "evt_1", "checkout.session.completed",
+                id="cs_1", payment_status="unpaid", payment_intent="pi_1",
+            ),
+        ])
+        self.assertEqual(self.status(), Payment.Status.PENDING)
+
+        apply_events([
+            event(
+                "evt_2", "checkout.session.async_payment_succeeded",
+                id="cs_1", payment_status="paid", payment_intent="pi_1",
+            ),
+        ])
+        self.assertEqual(self.status(), Payment.Status.PAID)
+        self.assertEqual(self.payment.stripe_payment_intent_id, "pi_1")
+
+    def test_async_payment_failure_expires_payment(self):
+        apply_events([
+            event("evt_1", "checkout.session.async_payment_failed", id="cs_1")
+        ])
+
+        self.assertEqual(self.status(), Payment.Status.EXPIRED)
+        self.assertEqual(
+            BalanceAccount.objects.get(user=self.patient).balance,
+            Decimal("0.00"),
+        )
+
+    def test_redelivered_and_stale_events_change_nothing(self):
+        paid = event(
+            "evt_1", "checkout.session.completed",
+            id="cs_1", payment_status="paid", payment_intent="pi_1",
+        )
+        refund = event(
+            "evt_2", "charge.refunded",
+            payment_intent="pi_1", amount=1000, amount_refunded=1000,
+        )
+        apply_events([paid, refund])
+        self.assertEqual(self.status(), Payment.Status.REFUNDED)
+
+        stale = event("evt_0", "checkout.session.expired", id="cs_1")
+        self.assertEqual(apply_events([refund, paid, stale]), [])
+        self.assertEqual(self.status(), Payment.Status.REFUNDED)
+        self.assertEqual(
+            BalanceAccount.objects.get(user=self.patient).balance,
+            Decimal("0.00"),
+        )
+
+    def test_session_id_is_unique(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Payment.objects.create(
+                appointment=self.appointment,
+                payment_type=Payment.Type.NO_SHOW_FEE,
+                session_id="cs_1",
+                money_to_pay=Decimal("10.00"),
+            )
+        Payment.objects.create(
+            appointment=self.appointment,
+            payment_type=Payment.Type.NO_SHOW_FEE,
+            money_to_pay=Decimal("10.00"),
+        )
@@ -0,0 +1,100 @@
+from unittest.mock import MagicMock, patch
+
+import stripe
+from django.test import TestCase, override_settings
+
+from payment.services import stripe_gateway
+from payment.services.stripe_gateway import CircuitBreaker, StripeUnavailable
+
+
+class StripeGatewayTests(TestCase):
+    def setUp(self):
+        stripe_gateway.reset_metrics()
+        self.breaker = CircuitBreaker(threshold=2, reset_timeout=30)
+        patcher = patch.object(stripe_gateway, "breaker", self.breaker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fail(self, error):
+        with self.assertRaises(type(error)):
+            stripe_gateway.call("op", MagicMock(side_effect=error))
+
+    @patch("payment.services.stripe_gateway.time.monotonic")
+    def test_outage_opens_circuit_until_trial_succeeds(self, mock_clock):
+        mock_clock.return_value = 100.0
+        func = MagicMock(return_value="ok")
+        self.fail(stripe.APIConnectionError("down"))
+        self.fail(stripe.APIError("502"))
+
+        with self.assertRaises(StripeUnavailable) as raised:
+            stripe_gateway.call("op", func)
+        self.assertEqual(raised.exception.retry_after, 30)
+        func.assert_not_called()
+
+        mock_clock.return_value = 131.0
+        self.assertEqual(stripe_gateway.call("op", func), "ok")
+        self.assertIsNone(self.breaker.opened_at)
+
+    @patch("payment.services.stripe_gateway.time.monotonic")
+    def test_failed_trial_keeps_circuit_open(self, mock_clock):
+        mock_clock.return_value = 100.0
+        self.fail(stripe.APIConnectionError("down"))
+        self.fail(stripe.APIConnectionError("down"))
+
+        mock_clock.return_value = 131.0
+        self.fail(stripe.APIConnectionError("still down"))
+
+        with self.assertRaises(StripeUnavailable):
+            stripe_gateway.call("op", MagicMock())
+
+    def test_refused_requests_do_not_open_circuit(self):
+        for _ in range(3):
+            self.fail(stripe.InvalidRequestError("No such session", "id"))
+
+        stripe_gateway.call("op", MagicMock())
+        self.assertIsNone(self.breaker.opened_at)
+
+    def test_refused_request_does_not_reset_outage_count(self):
+        self.fail(stripe.APIConnectionError("down"))
+        self.fail(stripe.InvalidRequestError("No such session", "id"))
+        self.fail(stripe.APIConnectionError("down"))
+
+        self.assertIsNotNone(self.breaker.opened_at)
+        with self.assertRaises(StripeUnavailable):
+            stripe_gateway.call("op", MagicMock())
+
+    @patch("stripe.checkout.Session.retrieve")
+    def test_counts_calls_errors_and_rejections(self, mock_retrieve):
+        stripe_gateway.retrieve_session("cs_1")
+        mock_retrieve.side_effect = stripe.APIConnectionError("down")
+        for _ in range(2):
+            with self.assertRaises(stripe.APIConnectionError):
+                stripe_gateway.retrieve_session("cs_1")
+        with self.assertRaises(StripeUnavailable):
+            stripe_gateway.retrieve_session("cs_1")
+
+        counters = stripe_gateway.metrics()["checkout.session.retrieve"]
+        self.assertEqual(
+            (counters["calls"], counters["errors"], counters["rejected"]),
+            (3, 2, 1),
+        )
+        self.assertGreaterEqual(counters["max_seconds"], 0)
+
+    @override_settings(
+        STRIPE_SECRET_KEY="sk_test",
+        STRIPE_CONNECT_TIMEOUT=3,
+        STRIPE_READ_TIMEOUT=10,
+        STRIPE_MAX_RETRIES=4,
+    )
+    def test_configure_sets_up_one_client(self):
+        with patch.object(stripe, "default_http_client"), \
+                patch.object(stripe, "max_network_retries"), \
+                patch.object(stripe, "api_key"):
+            stripe_gateway.configure()
+
+            self.assertEqual(stripe.api_key, "sk_test")
+            self.assertEqual(stripe.max_network_retries, 4)
+            self.assertIsInstance(
+                stripe.default_http_client, stripe.RequestsClient
+            )
+            self.assertEqual(stripe.default_http_client._timeout, (3, 10))
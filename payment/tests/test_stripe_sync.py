@@ -0,0 +1,133 @@
+import datetime
+import threading
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.utils import timezone
+
+from controller.models import OutboxMessage
+from payment.models import BalanceAccount, Payment, SyncState
+from payment.services.stripe_sync import (
+    PENDING_SESSIONS_SYNC,
+    RateLimiter,
+    apply_status_changes,
+    reconcile_pending_payments,
+)
+from payment.tests.base_set_up import BaseTestCaseModel
+
+
+class FakeStripe:
+    """Local stand-in for stripe.checkout.Session.retrieve"""
+
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.retrieved = []
+        self.lock = threading.Lock()
+
+    def retrieve(self, session_id):
+        with self.lock:
+            self.retrieved.append(session_id)
+        payment_status, status = self.sessions[session_id]
+        return type("Session", (), {
+            "payment_status": payment_status, "status": status,
+        })()
+
+
+class ReconcilePendingPaymentsTests(BaseTestCaseModel):
+    def setUp(self):
+        super().setUp()
+        self.payments = []
+        for number, payment_type in enumerate(Payment.Type.values):
+            self.payments.append(Payment.objects.create(
+                appointment=self.appointment,
+                payment_type=payment_type,
+                session_id=f"cs_{number}",
+                money_to_pay=Decimal("10.00"),
+            ))
+        Payment.objects.update(
+            created_at=timezone.now() - datetime.timedelta(hours=1)
+        )
+        OutboxMessage.objects.all().delete()
+        self.stripe = FakeStripe({
+            "cs_0": ("paid", "complete"),
+            "cs_1": ("unpaid", "expired"),
+            "cs_2": ("unpaid", "open"),
+        })
+
+    def reconcile(self, **kwargs):
+        with patch(
+            "stripe.checkout.Session.retrieve",
+            side_effect=self.stripe.retrieve,
+        ):
+            return reconcile_pending_payments(
+                workers=4, rate_limit=0, **kwargs
+            )
+
+    def test_settles_sessions_in_bulk(self):
+        stats = self.reconcile(chunk_size=2)
+
+        self.assertEqual(
+            [payment.status for payment in Payment.objects.order_by("id")],
+            [Payment.Status.PAID, Payment.Status.EXPIRED,
+             Payment.Status.PENDING],
+        )
+        self.assertCountEqual(self.stripe.retrieved, ["cs_0", "cs_1", "cs_2"])
+        self.assertEqual(
+            {key: stats[key] for key in ("checked", "paid", "expired")},
+            {"checked": 3, "paid": 1, "expired": 1},
+        )
+        self.assertTrue(stats["finished"])
+        # ledger and admin messages follow the bulk update
+        self.assertEqual(
+            BalanceAccount.objects.get(user=self.patient).balance,
+            Decimal("10.00"),
+        )
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+
+        state = SyncState.objects.get(name=PENDING_SESSIONS_SYNC)
+        self.assertEqual(state.watermark, 0)
+        self.assertEqual(state.stats["checked"], 3)
+
+    def test_run_over_time_budget_resumes_from_watermark(self):
+        stats = self.reconcile(chunk_size=2, time_budget=0)
+
+        self.assertFalse(stats["finished"])
+        self.assertEqual(self.stripe.retrieved, ["cs_0", "cs_1"])
+        self.assertEqual(
+            SyncState.objects.get(name=PENDING_SESSIONS_SYNC).watermark,
+            self.payments[1].id,
+        )
+
+        stats = self.reconcile(chunk_size=2, time_budget=0)
+
+        self.assertTrue(stats["finished"])
+        self.assertEqual(stats["resumed_from"], self.payments[1].id)
+        self.assertEqual(self.stripe.retrieved, ["cs_0", "cs_1", "cs_2"])
+
+    def test_payment_settled_meanwhile_is_left_alone(self):
+        refunded = self.payments[0]
+        Payment.objects.filter(id=refunded.id).update(
+            status=Payment.Status.REFUNDED
+        )
+
+        applied = apply_status_changes(
+            {refunded.id: {"status": Payment.Status.PAID}}
+        )
+
+        self.assertEqual(applied, [])
+        refunded.refresh_from_db()
+        self.assertEqual(refunded.status, Payment.Status.REFUNDED)
+
+
+class RateLimiterTests(BaseTestCaseModel):
+    @patch("payment.services.stripe_sync.time.sleep")
+    @patch("payment.services.stripe_sync.time.monotonic", return_value=100.0)
+    def test_calls_are_spaced_by_rate(self, mock_monotonic, mock_sleep):
+        limiter = RateLimiter(rate=4)
+
+        for _ in range(3):
+            limiter.wait()
+
+        self.assertEqual(
+            [call.args[0] for call in mock_sleep.call_args_list], [0.25, 0.5]
+        )
@@ -1,8 +1,10 @@
 from unittest.mock import patch, MagicMock
 
+from celery.exceptions import Retry
 from django.utils import timezone
 
 from payment.models import Payment
+from payment.services.stripe_gateway import StripeUnavailable
 from payment.tasks import create_stripe_payment_task, sync_pending_payments
 from payment.tests.base_set_up import BaseTestCaseModel
 import datetime
@@ -22,6 +24,20 @@ class CreateStripePaymentTaskTests(BaseTestCaseModel):
             payment_type=Payment.Type.CONSULTATION,
         )
 
+    @patch("payment.tasks.process_appointment_payment")
+    def test_task_skips_appointment_with_payment_of_type(self, mock_process):
+        Payment.objects.create(
+            appointment=self.appointment,
+            payment_type=Payment.Type.NO_SHOW_FEE,
+            money_to_pay=5,
+        )
+
+        create_stripe_payment_task(
+            self.appointment.id, Payment.Type.NO_SHOW_FEE
+        )
+
+        mock_process.assert_not_called()
+
     @patch("payment.tasks.logger.error")
     def test_task_logs_error_if_appointment_missing(self, mock_logger):
         create_stripe_payment_task(999999, Payment.Type.CONSULTATION)
@@ -38,6 +54,19 @@ class CreateStripePaymentTaskTests(BaseTestCaseModel):
 
         mock_process.assert_called_once()
 
+    @patch("payment.tasks.create_stripe_payment_task.retry")
+    @patch("payment.tasks.process_appointment_payment")
+    def test_task_waits_for_open_circuit(self, mock_process, mock_retry):
+        mock_process.side_effect = StripeUnavailable(25)
+        mock_retry.side_effect = Retry()
+
+        with self.assertRaises(Retry):
+            create_stripe_payment_task(
+                self.appointment.id, Payment.Type.CONSULTATION
+            )
+
+        self.assertEqual(mock_retry.call_args.kwargs["countdown"], 25)
+
 
 class FakeStripeSession:
     def __init__(self, payment_status=None, status=None):
@@ -50,7 +79,7 @@ class SyncPendingPaymentsTests(BaseTestCaseModel):
         super().setUp()
         self.old_time = timezone.now() - datetime.timedelta(hours=2)
 
-    @patch("payment.tasks.stripe.checkout.Session.retrieve")
+    @patch("stripe.checkout.Session.retrieve")
     def test_sync_marks_paid_when_stripe_paid(self, mock_retrieve):
         payment = Payment.objects.create(
             appointment=self.appointment,
@@ -71,7 +100,7 @@ class SyncPendingPaymentsTests(BaseTestCaseModel):
         payment.refresh_from_db()
         self.assertEqual(payment.status, Payment.Status.PAID)
 
-    @patch("payment.tasks.stripe.checkout.Session.retrieve")
+    @patch("stripe.checkout.Session.retrieve")
     def test_sync_marks_expired_when_stripe_expired(self, mock_retrieve):
         payment = Payment.objects.create(
             appointment=self.appointment,
@@ -1,4 +1,5 @@
 import datetime
+import json
 from decimal import Decimal
 from unittest.mock import patch
 
@@ -9,16 +10,11 @@ from rest_framework.test import APITestCase, APIClient
 
 from appointment.models import Appointment
 from doctor.models import DoctorSlot, Doctor
-from payment.models import Payment
+from payment.models import Payment, StripeEvent
+from payment.services.stripe_events import process_stripe_events
 from specializations.models import Specialization
 
 
-class FakeSession:
-    """Helper class to mimic Stripe session object"""
-    def __init__(self, id):
-        self.id = id
-
-
 class StripeWebhookTests(APITestCase):
     def setUp(self):
         self.client = APIClient()
@@ -68,31 +64,70 @@ class StripeWebhookTests(APITestCase):
 
         self.url = reverse("stripe-webhook")
 
-    @patch("stripe.Webhook.construct_event")
-    def test_webhook_checkout_session_completed(self, mock_construct):
-        fake_session = FakeSession("cs_test_123")
-        fake_session.payment_intent = "pi_test_999"
-        mock_construct.return_value = {
+    def post_event(self, event):
+        with patch("stripe.Webhook.construct_event", return_value=event):
+            return self.client.post(
+                self.url,
+                data=json.dumps(event),
+                content_type="application/json",
+                HTTP_STRIPE_SIGNATURE="fake_signature"
+            )
+
+    def test_webhook_checkout_session_completed(self):
+        event = {
+            "id": "evt_test_1",
             "type": "checkout.session.completed",
             "data": {
-                "object": fake_session
+                "object": {
+                    "id": "cs_test_123",
+                    "payment_status": "paid",
+                    "payment_intent": "pi_test_999",
+                }
             }
         }
 
-        response = self.client.post(
-            self.url,
-            data=b"{}",
-            content_type="application/json",
-            HTTP_STRIPE_SIGNATURE="fake_signature"
-        )
+        response = self.post_event(event)
 
         self.assertEqual(response.status_code, 200)
+        # acknowledged before anything is applied
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.PENDING)
+
+        self.assertEqual(self.post_event(event).status_code, 200)
+        self.assertEqual(StripeEvent.objects.count(), 1)
+
+        self.assertEqual(process_stripe_events(), 1)
 
         self.payment.refresh_from_db()
         self.appointment.refresh_from_db()
 
         self.assertEqual(self.payment.status, Payment.Status.PAID)
+        self.assertEqual(self.payment.stripe_payment_intent_id, "pi_test_999")
         self.assertEqual(self.appointment.status, "BOOKED")
+        self.assertEqual(process_stripe_events(), 0)
+
+    @patch("payment.services.stripe_events.apply_events")
+    def test_failing_event_is_retried_alone(self, mock_apply):
+        for number in range(2):
+            self.post_event({
+                "id": f"evt_test_{number}",
+                "type": "checkout.session.expired",
+                "data": {"object": {"id": f"cs_test_{number}"}},
+            })
+
+        def fail_on_first(events):
+            if any(event["id"] == "evt_test_0" for event in events):
+                raise ValueError("boom")
+
+        mock_apply.side_effect = fail_on_first
+
+        # full batches: the failed event waits for the next run
+        self.assertEqual(process_stripe_events(batch_size=1), 1)
+
+        failed = StripeEvent.objects.get(processed_at__isnull=True)
+        self.assertEqual(failed.event_id, "evt_test_0")
+        self.assertEqual(failed.error, "boom")
+        self.assertEqual(failed.attempts, 1)
 
     @patch("stripe.Webhook.construct_event")
     def test_webhook_invalid_signature(self, mock_construct):
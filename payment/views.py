@@ -1,3 +1,5 @@
+import json
+
 import stripe
 
 from django.conf import settings
@@ -20,9 +22,12 @@ from drf_spectacular.utils import (
     OpenApiResponse,
 )
 
+from controller.pagination import KeysetPagination
 from payment.models import Payment
 from payment.serializers import PaymentSerializer
 from payment.services.logic import renew_payment_session
+from payment.services.stripe_events import record_webhook_event
+from payment.services.stripe_gateway import StripeUnavailable
 
 
 @method_decorator(csrf_exempt, name="dispatch")
@@ -31,10 +36,16 @@ from payment.services.logic import renew_payment_session
     operation_id="payments_stripe_webhook",
     summary="Stripe webhook receiver",
     description=(
-        "Receives Stripe webhook events and updates Payment status.\n\n"
+        "Receives Stripe webhook events and stores them; Payment status "
+        "is updated by a background consumer.\n\n"
         "This endpoint is called by Stripe (server-to-server). "
         "It validates the `Stripe-Signature` header and processes events like:\n"
-        "- `checkout.session.completed`\n\n"
+        "- `checkout.session.completed`\n"
+        "- `checkout.session.async_payment_succeeded`\n"
+        "- `checkout.session.async_payment_failed`\n"
+        "- `checkout.session.expired`\n"
+        "- `charge.refunded`\n\n"
+        "A redelivered event (same Stripe event id) is accepted and ignored.\n\n"
         "Authentication is disabled here because Stripe signs requests."
     ),
     parameters=[
@@ -75,19 +86,8 @@ class StripeWebhookView(APIView):
         except ValueError:
             return HttpResponse(content="Invalid payload", status=400)
 
-        if event["type"] == "checkout.session.completed":
-            session = event["data"]["object"]
-
-            payment = Payment.objects.filter(session_id=session.id).first()
-            if payment:
-                payment.status = Payment.Status.PAID
-                payment.stripe_payment_intent_id = session.payment_intent
-                payment.save()
-
-                appointment = payment.appointment
-                appointment.status = "BOOKED"
-                appointment.save()
-
+        # applied by process_stripe_events, Stripe only waits for the insert
+        record_webhook_event(event, json.loads(payload))
         return HttpResponse(status=200)
 
 
@@ -116,6 +116,8 @@ class StripeWebhookView(APIView):
 class PaymentViewSet(ReadOnlyModelViewSet):
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
         user = self.request.user
@@ -294,6 +296,9 @@ class PaymentViewSet(ReadOnlyModelViewSet):
                 description="Cannot renew (paid or nothing to pay)"
             ),
             404: OpenApiResponse(description="Payment not found / not accessible"),
+            503: OpenApiResponse(
+                description="Stripe is unavailable, retry later"
+            ),
         },
     )
     @action(detail=True, methods=["post"], url_path="renew")
@@ -304,6 +309,11 @@ class PaymentViewSet(ReadOnlyModelViewSet):
             payment = renew_payment_session(payment)
         except ValueError as err:
             return Response({"detail": str(err)}, status=status.HTTP_400_BAD_REQUEST)
+        except StripeUnavailable as err:
+            return Response(
+                {"detail": str(err)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
         except Exception as err:
             return Response(
                 {"detail": f"Failed to renew payment session: {err}"},
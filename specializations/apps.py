@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SpecializationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "specializations"
+
+    def ready(self):
+        import specializations.signals  # noqa
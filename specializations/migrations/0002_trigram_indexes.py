@@ -0,0 +1,47 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:07
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ("controller", "0001_trigram_extension"),
+        ("specializations", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="specialization",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="spec_name_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="specialization",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("code"), name="gin_trgm_ops"
+                ),
+                name="spec_code_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="specialization",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("description"),
+                    name="gin_trgm_ops",
+                ),
+                name="spec_description_trgm",
+            ),
+        ),
+    ]
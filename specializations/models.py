@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 
 class Specialization(models.Model):
@@ -6,5 +8,14 @@ class Specialization(models.Model):
     code = models.SlugField(max_length=255, unique=True)
     description = models.TextField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            GinIndex(
+                OpClass(Upper(field), name="gin_trgm_ops"),
+                name=f"spec_{field}_trgm",
+            )
+            for field in ("name", "code", "description")
+        ]
+
     def __str__(self):
         return self.name
@@ -0,0 +1,24 @@
+from controller.cache import get_or_compute, make_key, model_namespace
+from specializations.models import Specialization
+
+CODE_MAP_CACHE_TIMEOUT = 60 * 60
+
+
+def specialization_ids_by_code():
+    """
+    {code: id} of all specializations, cached under the Specialization
+    namespace, so any save or delete of a specialization rebuilds it
+    """
+    return get_or_compute(
+        make_key(model_namespace(Specialization), "code-map"),
+        lambda: dict(Specialization.objects.values_list("code", "id")),
+        CODE_MAP_CACHE_TIMEOUT,
+    )
+
+
+def resolve_specialization_ids(ids, codes):
+    """Ids plus the ids of the known codes; unknown codes are dropped"""
+    by_code = specialization_ids_by_code() if codes else {}
+    return sorted(
+        {*ids, *(by_code[code] for code in codes if code in by_code)}
+    )
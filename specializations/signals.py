@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from controller.cache import bump_version, model_namespace
+from specializations.models import Specialization
+
+
+@receiver(post_save, sender=Specialization)
+@receiver(post_delete, sender=Specialization)
+def invalidate_specialization_cache_signal_handler(sender, **kwargs):
+    bump_version(model_namespace(Specialization))
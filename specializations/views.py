@@ -1,5 +1,6 @@
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.filters import SearchFilter
+from controller.filters import TrigramSearchFilter
+from controller.mixins import CachedListMixin, ConditionalGetMixin
 from user.permissions import IsAdminOrReadOnly
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
@@ -44,9 +45,12 @@ from .serializers import SpecializationSerializer
         description="Delete a medical specialization."
     ),
 )
-class SpecializationViewSet(ModelViewSet):
+class SpecializationViewSet(
+    ConditionalGetMixin, CachedListMixin, ModelViewSet
+):
     queryset = Specialization.objects.all()
     serializer_class = SpecializationSerializer
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [SearchFilter]
+    filter_backends = [TrigramSearchFilter]
     search_fields = ["name", "code", "description"]
+    cache_models = (Specialization,)
@@ -49,6 +49,7 @@ class PatientAdmin(admin.ModelAdmin):
         "total_unpaid_amount_display",
         "penalty_status",
     )
+    list_select_related = ("user__balance_account",)
     list_filter = ("gender",)
     search_fields = (
         "user__email",
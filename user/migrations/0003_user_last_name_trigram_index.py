@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:07
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without locking the table against writes.
+    atomic = False
+
+    dependencies = [
+        ("controller", "0001_trigram_extension"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("user", "0002_patient"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="user",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("last_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="user_last_name_trgm",
+            ),
+        ),
+    ]
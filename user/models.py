@@ -1,7 +1,10 @@
+from decimal import Decimal
+
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Sum
 
 
 class UserManager(BaseUserManager):
@@ -26,6 +29,13 @@ class UserManager(BaseUserManager):
         extra_fields.setdefault("is_superuser", True)
         return self._create_user(email, password, **extra_fields)
 
+    def with_penalty(self):
+        """
+        Users with their balance account joined, so has_penalty of a
+        listed or prefetched user costs no extra query
+        """
+        return self.get_queryset().select_related("balance_account")
+
 
 class User(AbstractUser):
     username = None
@@ -38,19 +48,42 @@ class User(AbstractUser):
 
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # serves TrigramSearchFilter over appointments by patient name
+            GinIndex(
+                OpClass(Upper("last_name"), name="gin_trgm_ops"),
+                name="user_last_name_trgm",
+            ),
+        ]
+
+    @property
+    def outstanding_balance(self):
+        """
+        Unpaid amount of the pending payments, read from the balance
+        ledger by primary key (no query if the account is already joined).
+        Local import prevents circular dependency.
+        """
+        from payment.models import BalanceAccount
+
+        related = type(self).balance_account.related
+        if related.is_cached(self):
+            account = related.get_cached_value(self)
+            balance = account.balance if account else None
+        else:
+            balance = BalanceAccount.objects.filter(
+                user_id=self.pk
+            ).values_list("balance", flat=True).first()
+        return balance if balance is not None else Decimal("0")
+
     @property
     def has_penalty(self):
         """
         Returns the total unpaid amount (Decimal) if pending payments exist,
-        otherwise returns False. Local import prevents circular dependency.
+        otherwise returns False.
         """
-        from payment.models import Payment
-
-        result = self.appointments.filter(
-            payments__status=Payment.Status.PENDING
-        ).aggregate(total=Sum("payments__money_to_pay"))
-        total = result["total"]
-        return total if total and total > 0 else False
+        total = self.outstanding_balance
+        return total if total > 0 else False
 
     def __str__(self):
         return self.email
@@ -69,6 +102,10 @@ class Patient(models.Model):
     phone_number = models.CharField(max_length=20, blank=True)
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES, blank=True)
 
+    @property
+    def total_unpaid_amount(self):
+        return self.user.outstanding_balance
+
     def __str__(self):
         return (
             f"{self.user.first_name} "